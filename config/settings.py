@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -97,6 +98,25 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -143,7 +163,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -153,7 +173,10 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "UPDATE_LAST_LOGIN": True,
+    # last_login записывается буфером users.last_login, см. LAST_LOGIN_*
+    "UPDATE_LAST_LOGIN": False,
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.ClaimsTokenRefreshSerializer",
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -180,3 +203,71 @@ SERVER_EMAIL = EMAIL_HOST_USER
 EMAIL_ADMIN = EMAIL_HOST_USER
 
 PASSWORD_RESET_CONFIRM_URL = f"{os.getenv('HOST')}" + "/users/reset_password_confirm/{uid}/{token}/"
+
+# Кэш ключей ответов тестов: LRU процесса и (необязательно) общий кэш из CACHES, токены версий - в кэше default.
+# Без REDIS_URL кэш default локален для процесса: другие процессы видят изменения ответов
+# с задержкой до ANSWER_KEY_CACHE_LOCAL_TIMEOUT секунд
+ANSWER_KEY_CACHE_SIZE = 1024
+ANSWER_KEY_CACHE_LOCAL_TIMEOUT = 300
+ANSWER_KEY_CACHE_ALIAS = 'default' if REDIS_URL else None
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Максимальное число элементов в пакетной проверке ответов
+CHECK_ANSWERS_BATCH_MAX_SIZE = 1000
+
+# Буферизованная запись попыток прохождения тестов
+ATTEMPTS_BATCH_SIZE = 100
+ATTEMPTS_FLUSH_INTERVAL = 1.0
+ATTEMPTS_MAX_PENDING = 1000
+ATTEMPTS_SPOOL_DIR = BASE_DIR / 'spool' / 'attempts'
+ATTEMPTS_BACKGROUND_FLUSH = True
+
+# Время жизни кэша дерева курса (секунды), кэш сбрасывается при изменении любого узла курса
+COURSE_TREE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время жизни кэша ответов list и retrieve (секунды), ответы сбрасываются сменой поколения модели
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Уменьшенные копии превью курсов, модулей и уроков: ширины (px), форматы и фоновый пул потоков
+THUMBNAIL_WIDTHS = (160, 320, 640)
+THUMBNAIL_FORMATS = ('webp', 'jpeg')
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_BACKGROUND = True
+# Пауза (секунды) перед повторной попыткой создать копии отсутствующего или поврежденного оригинала
+THUMBNAIL_FAILURE_TIMEOUT = 60 * 10
+
+# Срок кэширования файлов хранилища с адресацией по содержимому (секунды)
+CONTENT_STORAGE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Время жизни кэша сведений о пользователе для JWT-аутентификации (секунды): ограничивает задержку деактивации
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Буферизованная запись User.last_login: максимальное отставание (секунды) и размер буфера
+LAST_LOGIN_FLUSH_INTERVAL = 60
+LAST_LOGIN_MAX_PENDING = 10000
+LAST_LOGIN_BACKGROUND_FLUSH = True
+
+# Очередь исходящих писем: размер пачки на одно SMTP-соединение, повторы с экспоненциальной задержкой (секунды)
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_DELAY = 60 * 60
+OUTBOX_LEASE = 5 * 60
+OUTBOX_POLL_INTERVAL = 5
+# Срок хранения отправленных и не отправленных писем (секунды): в текстах есть ссылки сброса пароля
+OUTBOX_RETENTION = 60 * 60 * 24 * 7
+
+# Точный подсчет записей в списках админки больших таблиц выполняется, только если оценка меньше этого числа
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Размер пачки серверного курсора при потоковой выгрузке курсов и пользователей
+EXPORT_CHUNK_SIZE = 2000
+
+# Удаление курсов и модулей по уровням дерева: размер пачки DELETE, фоновый режим и срок хранения хода удаления
+DELETION_BATCH_SIZE = 5000
+DELETION_BACKGROUND = True
+DELETION_STATUS_TIMEOUT = 60 * 60 * 24
+
+# Размер пачки INSERT при записи группы студентов на курс
+ENROLLMENT_BATCH_SIZE = 5000
@@ -21,6 +21,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from config import settings
+from courses.storage import content_storage
+from courses.views import serve_content
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -43,4 +45,8 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
+    # В продакшене медиафайлы отдает веб-сервер или CDN, для courses/cas/ - с тем же заголовком immutable
+    urlpatterns += [
+        path(f'{settings.MEDIA_URL.lstrip("/")}{content_storage.prefix}/<path:path>', serve_content, name='content'),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,12 +1,119 @@
+import json
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from .models import Course, Module, Lesson, LessonTest, Question, Answer
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+from .deletion import count_tree, delete_tree
+from .models import Course, Module, Lesson, LessonTest, Question, Answer, TestAttempt, CourseProgress, Enrollment
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+def estimate_count(queryset):
+    """Оценка числа записей выборки планировщиком PostgreSQL без ее выполнения"""
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # Для таблицы без собранной статистики reltuples равен -1
+        if row and row[0] >= 0:
+            return int(row[0])
+    return int(json.loads(queryset.explain(format='json'))[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки для больших таблиц.
+
+    На PostgreSQL число записей берется из оценки планировщика, точный COUNT(*) выполняется,
+    только если оценка меньше ADMIN_EXACT_COUNT_LIMIT.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().count
+        estimate = estimate_count(queryset)
+        return super().count if estimate < settings.ADMIN_EXACT_COUNT_LIMIT else estimate
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Фильтр по связанной записи: запись ищется автодополнением, а не выбирается из списка всех записей"""
+    template = 'admin/courses/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.model_admin = model_admin
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        # Из связанной таблицы читается только выбранная запись
+        if not self.lookup_val:
+            return []
+        try:
+            return field.get_choices(include_blank=False, limit_choices_to={'pk__in': self.lookup_val})
+        except (ValueError, ValidationError):
+            return []
+
+    def has_output(self):
+        return True
+
+    def autocomplete_widget(self):
+        widget = AutocompleteSelect(self.field, self.model_admin.admin_site, attrs={'data-width': '100%'})
+        widget.choices = forms.ModelChoiceField(queryset=self.field.remote_field.model._default_manager.all()).choices
+        return widget.render(self.lookup_kwarg, self.lookup_choices[0][0] if self.lookup_choices else None)
+
+
+class LargeTableAdminMixin:
+    """Список записей большой таблицы: оценка числа записей и фильтры с автодополнением"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        fields = [self.model._meta.get_field(item[0]) for item in self.list_filter
+                  if isinstance(item, tuple) and issubclass(item[1], AutocompleteFilter)]
+        if not fields:
+            return super().media
+        return (super().media + AutocompleteSelect(fields[0], self.admin_site).media +
+                forms.Media(js=['courses/admin/autocomplete_filter.js']))
+
+
+class TreeDeleteAdminMixin:
+    """
+    Удаление записей со всем поддеревом запросами по уровням дерева.
+
+    Страница подтверждения показывает число удаляемых записей по моделям вместо списка
+    всех потомков, собранного в памяти.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        counts = count_tree(self.model, [obj.pk for obj in objs])
+        model_count = {level._meta.verbose_name_plural: count for level, count in counts.items() if count}
+        perms_needed = {
+            level._meta.verbose_name for level, count in counts.items()
+            if count and not request.user.has_perm(
+                f'{level._meta.app_label}.{get_permission_codename("delete", level._meta)}')
+        }
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            delete_tree(self.model, [obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            delete_tree(self.model, list(queryset.values_list('pk', flat=True)))
+
+
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(TreeDeleteAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'title', 'owner', 'created_at')
     list_filter = ('owner',)
     search_fields = ('title',)
@@ -19,7 +126,7 @@ class CourseAdmin(admin.ModelAdmin):
 
 
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(TreeDeleteAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'title', 'course', 'created_at')
     list_filter = ('course',)
     search_fields = ('title',)
@@ -28,7 +135,7 @@ class ModuleAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_staff:
             return qs
-        return qs.filter(course__owner=request.user)
+        return qs.filter(owner=request.user)
 
 
 @admin.register(Lesson)
@@ -41,7 +148,7 @@ class LessonAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_staff:
             return qs
-        return qs.filter(module__course__owner=request.user)
+        return qs.filter(owner=request.user)
 
 
 @admin.register(LessonTest)
@@ -49,35 +156,81 @@ class LessonTestAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'lesson')
     list_filter = ('lesson',)
     search_fields = ('title',)
+    # Порядок нужен и для постраничного автодополнения тестов в вопросах
+    ordering = ('-pk',)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_staff:
             return qs
-        return qs.filter(lesson__module__course__owner=request.user)
+        return qs.filter(owner=request.user)
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'lesson_test')
-    list_filter = ('lesson_test',)
+    list_filter = (('lesson_test', AutocompleteFilter),)
+    list_select_related = ('lesson_test',)
+    autocomplete_fields = ('lesson_test',)
     search_fields = ('text',)
+    ordering = ('-pk',)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_staff:
             return qs
-        return qs.filter(lesson_test__lesson__module__course__owner=request.user)
+        return qs.filter(owner=request.user)
 
 
 @admin.register(Answer)
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'question', 'is_correct')
-    list_filter = ('question',)
+    list_filter = (('question', AutocompleteFilter), 'is_correct')
+    list_select_related = ('question',)
+    autocomplete_fields = ('question',)
     search_fields = ('text',)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_staff:
             return qs
-        return qs.filter(question__lesson_test__lesson__module__course__owner=request.user)
+        return qs.filter(owner=request.user)
+
+
+@admin.register(TestAttempt)
+class TestAttemptAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'lesson_test', 'user', 'correct_answers', 'total_questions', 'created_at')
+    list_select_related = ('lesson_test', 'user')
+    raw_id_fields = ('lesson_test', 'user')
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_staff:
+            return qs
+        return qs.filter(lesson_test__owner=request.user)
+
+
+@admin.register(CourseProgress)
+class CourseProgressAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'course', 'user', 'completed_lessons', 'total_lessons', 'updated_at')
+    list_select_related = ('course', 'user')
+    raw_id_fields = ('course', 'user')
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_staff:
+            return qs
+        return qs.filter(course__owner=request.user)
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'course', 'user', 'created_at')
+    list_select_related = ('course', 'user')
+    raw_id_fields = ('course', 'user')
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_staff:
+            return qs
+        return qs.filter(course__owner=request.user)
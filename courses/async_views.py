@@ -0,0 +1,192 @@
+import json
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, AuthenticationFailed, NotFound, \
+    PermissionDenied, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from courses.attempts import arecord_attempt
+from courses.enrollment import scope_enrolled
+from courses.grading import answer_key_cache, grade_answers
+from courses.paginations import CustomPagination
+from courses.serializers import CourseSerializer, LessonSerializer
+from courses.models import LessonTest
+from courses.views import CourseViewSet, LessonViewSet
+from users.authentication import AsyncJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Базовое асинхронное представление API.
+
+    Аутентификация, чтение из базы и сериализация выполняются в цикле событий без
+    занятия потока на время запроса. Ответы и ошибки повторяют формат синхронных
+    представлений DRF. staff_only соответствует IsAdminUser, иначе IsAuthenticated.
+    Если задан course_field, студенту доступны только записи курсов, на которые он записан.
+    """
+    authentication = AsyncJWTAuthentication()
+    staff_only = True
+    queryset = None
+    course_field = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Аутентификация по заголовку Authorization, сессионные cookie не используются
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.check_access(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    async def check_access(self, request):
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated
+        request.user, request.auth = result
+        if self.staff_only and not request.user.is_staff:
+            raise PermissionDenied
+
+    def get_queryset(self, request):
+        queryset = self.queryset.all()
+        return queryset if self.course_field is None else scope_enrolled(queryset, request.user, self.course_field)
+
+    async def serialize(self, instance, request, many=False):
+        """
+        Сериализация в потоке синхронного кода: ссылки на превью проверяют наличие уменьшенных копий
+        в хранилище, и файловые операции не должны блокировать цикл событий.
+        """
+        return await sync_to_async(
+            lambda: self.serializer_class(instance, many=many, context={'request': request}).data
+        )()
+
+    def handle_exception(self, exc):
+        data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        response = self.render(data, status=exc.status_code)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(self.request)
+        return response
+
+    @staticmethod
+    def render(data, status=status.HTTP_200_OK):
+        return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncListView(AsyncAPIView):
+    """Асинхронный список с постраничной пагинацией CustomPagination"""
+    serializer_class = None
+    pagination_class = CustomPagination
+
+    async def get(self, request):
+        paginator = self.pagination_class()
+        try:
+            page_size = int(request.GET[paginator.page_size_query_param])
+        except (KeyError, ValueError):
+            page_size = paginator.page_size
+        page_size = min(page_size, paginator.max_page_size) if page_size > 0 else paginator.page_size
+        try:
+            page_number = int(request.GET.get(paginator.page_query_param, 1))
+        except ValueError:
+            raise NotFound(paginator.invalid_page_message)
+
+        queryset = self.get_queryset(request)
+        count = await queryset.acount()
+        num_pages = max(1, -(-count // page_size))
+        if not 1 <= page_number <= num_pages:
+            raise NotFound(paginator.invalid_page_message)
+
+        offset = (page_number - 1) * page_size
+        objects = [obj async for obj in queryset[offset:offset + page_size]]
+        url = request.build_absolute_uri()
+        next_link = replace_query_param(url, paginator.page_query_param, page_number + 1) \
+            if page_number < num_pages else None
+        if page_number == 1:
+            previous_link = None
+        elif page_number == 2:
+            previous_link = remove_query_param(url, paginator.page_query_param)
+        else:
+            previous_link = replace_query_param(url, paginator.page_query_param, page_number - 1)
+
+        return self.render({
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': await self.serialize(objects, request, many=True),
+        })
+
+
+class AsyncDetailView(AsyncAPIView):
+    """Асинхронный просмотр записи"""
+    serializer_class = None
+
+    async def get(self, request, pk):
+        try:
+            instance = await self.get_queryset(request).aget(pk=pk)
+        except self.queryset.model.DoesNotExist:
+            raise NotFound
+        return self.render(await self.serialize(instance, request))
+
+
+class AsyncCourseListView(AsyncListView):
+    """Асинхронное представление списка курсов"""
+    queryset = CourseViewSet.queryset
+    serializer_class = CourseSerializer
+    staff_only = False
+    course_field = 'pk'
+
+
+class AsyncCourseDetailView(AsyncDetailView):
+    """Асинхронное представление курса"""
+    queryset = CourseViewSet.queryset
+    serializer_class = CourseSerializer
+    staff_only = False
+    course_field = 'pk'
+
+
+class AsyncLessonListView(AsyncListView):
+    """Асинхронное представление списка уроков"""
+    queryset = LessonViewSet.queryset
+    serializer_class = LessonSerializer
+    staff_only = False
+    course_field = 'course'
+
+
+class AsyncLessonDetailView(AsyncDetailView):
+    """Асинхронное представление урока"""
+    queryset = LessonViewSet.queryset
+    serializer_class = LessonSerializer
+    staff_only = False
+    course_field = 'course'
+
+
+class AsyncCheckAnswersView(AsyncAPIView):
+    """Асинхронная проверка ответов на тест"""
+    staff_only = False
+
+    async def post(self, request, pk):
+        tests = scope_enrolled(LessonTest.objects.filter(pk=pk), request.user)
+        if not request.user.is_staff and not await tests.aexists():
+            raise NotFound
+        answer_key = await answer_key_cache.aget(pk)
+        if answer_key is None:
+            raise NotFound
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+        answers = data.get('answers', {}) if isinstance(data, dict) else None
+
+        if not isinstance(answers, dict):
+            return self.render(
+                {"detail": "Неверный формат для ответов. Должен быть словарь.."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        await arecord_attempt(request.user.pk, pk, answer_key, answers)
+        return self.render(grade_answers(answer_key, answers))
@@ -0,0 +1,248 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from courses.grading import mark_answers
+from courses.models import TestAttempt, AttemptAnswer
+
+logger = logging.getLogger(__name__)
+
+# Подкаталог spool_dir для попыток, которые база отклонила и повторная запись не поможет
+DEAD_LETTER_DIR = 'failed'
+
+
+def make_attempt(user_id, lesson_test_id, answer_key, answers):
+    """Запись о попытке в виде словаря, пригодного для буфера и файла отложенной записи"""
+    marks = mark_answers(answer_key, answers)
+    return {
+        'user_id': user_id,
+        'lesson_test_id': lesson_test_id,
+        'created_at': timezone.now().isoformat(),
+        'correct_answers': sum(is_correct for _, _, is_correct in marks),
+        'total_questions': len(marks),
+        'answers': [
+            [question_id, answer if answer is None or isinstance(answer, str) else json.dumps(answer), is_correct]
+            for question_id, answer, is_correct in marks
+        ],
+    }
+
+
+def write_attempts(attempts):
+    """Запись пачки попыток в одной транзакции: по одному bulk_create для попыток и для ответов"""
+    with transaction.atomic():
+        created = TestAttempt.objects.bulk_create([
+            TestAttempt(
+                user_id=attempt['user_id'],
+                lesson_test_id=attempt['lesson_test_id'],
+                created_at=parse_datetime(attempt['created_at']),
+                correct_answers=attempt['correct_answers'],
+                total_questions=attempt['total_questions'],
+            )
+            for attempt in attempts
+        ])
+        AttemptAnswer.objects.bulk_create([
+            AttemptAnswer(attempt=test_attempt, question_id=question_id, answer=answer, is_correct=is_correct)
+            for test_attempt, attempt in zip(created, attempts)
+            for question_id, answer, is_correct in attempt['answers']
+        ])
+    return created
+
+
+class AttemptWriter:
+    """
+    Буферизованная (write-behind) запись попыток прохождения тестов.
+
+    Попытки копятся в памяти и записываются пачками по batch_size, когда набралась пачка
+    или самая старая запись ждет дольше flush_interval секунд. При background=True запись
+    выполняет фоновый поток, иначе - вызывающий поток. Если в буфере max_pending записей,
+    вызывающий поток записывает их сам, поэтому при аварийном завершении процесса теряется
+    не больше max_pending попыток. Пачка, которую не удалось записать в базу, записывается
+    по одной попытке: отклоненные базой (нарушение ограничений) попадают в spool_dir/failed,
+    остальные сохраняются в spool_dir и дописываются командой flush_attempts.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=1.0, max_pending=1000, spool_dir=None, background=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.background = background
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, attempt):
+        with self._lock:
+            self._buffer.append((time.monotonic(), attempt))
+            pending = len(self._buffer)
+            due = pending >= self.batch_size or time.monotonic() - self._buffer[0][0] >= self.flush_interval
+
+        if pending >= self.max_pending or (due and not self.background):
+            self.flush()
+        elif self.background:
+            self._ensure_thread()
+            if due:
+                self._wakeup.set()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def _take_batch(self):
+        with self._lock:
+            return [self._buffer.popleft()[1] for _ in range(min(self.batch_size, len(self._buffer)))]
+
+    def flush(self):
+        """Запись всех накопленных попыток, возвращает число записанных"""
+        written = 0
+        with self._flush_lock:
+            while batch := self._take_batch():
+                batch_written, rejected, postponed = self._write(batch)
+                written += batch_written
+                self.dead_letter(rejected)
+                self.spool(postponed)
+        return written
+
+    def _write(self, batch):
+        """
+        Запись пачки, при ошибке - по одной попытке.
+
+        Возвращает число записанных попыток, отклоненные базой и не записанные из-за
+        других ошибок (например, потери соединения), которые стоит повторить позже.
+        """
+        try:
+            write_attempts(batch)
+        except Exception:
+            logger.exception('Не удалось записать пачку из %s попыток, запись по одной', len(batch))
+        else:
+            return len(batch), [], []
+        written, rejected, postponed = 0, [], []
+        for attempt in batch:
+            try:
+                write_attempts([attempt])
+            except (IntegrityError, DataError):
+                logger.exception('База отклонила попытку прохождения теста %s', attempt.get('lesson_test_id'))
+                rejected.append(attempt)
+            except Exception:
+                logger.exception('Не удалось записать попытку прохождения теста %s', attempt.get('lesson_test_id'))
+                postponed.append(attempt)
+            else:
+                written += 1
+        return written, rejected, postponed
+
+    @staticmethod
+    def _write_file(path, batch):
+        """
+        Атомарная запись пачки в файл.
+
+        Пачка пишется во временный файл *.tmp и переименовывается, поэтому flush_attempts
+        в другом процессе не прочитает недописанный *.json.
+        """
+        temporary = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        temporary.write_text(json.dumps(batch), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def _save(self, directory, batch):
+        directory.mkdir(parents=True, exist_ok=True)
+        self._write_file(directory / f'{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json', batch)
+
+    def spool(self, batch):
+        """Сохранение пачки в файл для повторной записи командой flush_attempts"""
+        if not batch:
+            return
+        if self.spool_dir is None:
+            logger.error('Каталог отложенной записи не задан, %s попыток потеряно', len(batch))
+            return
+        self._save(self.spool_dir, batch)
+
+    def dead_letter(self, batch):
+        """Сохранение отклоненных базой попыток в spool_dir/failed для ручного разбора"""
+        if not batch:
+            return
+        if self.spool_dir is None:
+            logger.error('Каталог отложенной записи не задан, %s отклоненных попыток потеряно', len(batch))
+            return
+        self._save(self.spool_dir / DEAD_LETTER_DIR, batch)
+
+    def drain_spool(self):
+        """
+        Запись сохраненных пачек в порядке их появления, возвращает число записанных попыток.
+
+        Ошибка в одном файле не останавливает обработку следующих: отклоненные базой попытки
+        переносятся в spool_dir/failed, остальные незаписанные остаются в файле до следующего запуска.
+        """
+        if self.spool_dir is None or not self.spool_dir.exists():
+            return 0
+        written = 0
+        for path in sorted(self.spool_dir.glob('*.json')):
+            try:
+                batch = json.loads(path.read_text(encoding='utf-8'))
+            except ValueError:
+                logger.exception('Поврежденный файл отложенной записи %s', path)
+                (self.spool_dir / DEAD_LETTER_DIR).mkdir(exist_ok=True)
+                path.rename(self.spool_dir / DEAD_LETTER_DIR / path.name)
+                continue
+            batch_written, rejected, postponed = self._write(batch)
+            written += batch_written
+            self.dead_letter(rejected)
+            if postponed:
+                self._write_file(path, postponed)
+            else:
+                path.unlink()
+        return written
+
+    def _ensure_thread(self):
+        # После fork фоновый поток родителя в дочернем процессе не работает
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='attempt-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+attempt_writer = AttemptWriter(
+    batch_size=settings.ATTEMPTS_BATCH_SIZE,
+    flush_interval=settings.ATTEMPTS_FLUSH_INTERVAL,
+    max_pending=settings.ATTEMPTS_MAX_PENDING,
+    spool_dir=settings.ATTEMPTS_SPOOL_DIR,
+    background=settings.ATTEMPTS_BACKGROUND_FLUSH,
+)
+
+
+def record_attempt(user_id, lesson_test_id, answer_key, answers):
+    """Постановка попытки в очередь на запись"""
+    attempt_writer.add(make_attempt(user_id, lesson_test_id, answer_key, answers))
+
+
+async def arecord_attempt(user_id, lesson_test_id, answer_key, answers):
+    """Асинхронный вариант record_attempt: если постановка в очередь запустит запись в базу, она идет в пуле потоков"""
+    writer = attempt_writer
+    if writer.background and len(writer) + 1 < writer.max_pending:
+        record_attempt(user_id, lesson_test_id, answer_key, answers)
+    else:
+        await sync_to_async(record_attempt)(user_id, lesson_test_id, answer_key, answers)
@@ -0,0 +1,114 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш в памяти процесса.
+
+    Хранит не более maxsize значений, при переполнении вытесняются давно не используемые.
+    Если задан timeout (в секундах), значения старше него считаются отсутствующими.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.timeout if self.timeout is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def get_versions(*names, alias='default'):
+    """
+    Токены версий по именам из кэша Django, отсутствующие создаются.
+
+    Токен входит в ключ кэшированного значения: смена токена делает недоступными
+    все значения, сохраненные под прежним, без удаления ключей по шаблону.
+    """
+    cache = caches[alias]
+    versions = cache.get_many(names)
+    for name in names:
+        if name not in versions:
+            cache.add(name, uuid.uuid4().hex, timeout=None)
+            versions[name] = cache.get(name)
+    return versions
+
+
+def bump_versions(*names, alias='default'):
+    """Смена токенов версий"""
+    caches[alias].set_many({name: uuid.uuid4().hex for name in names}, timeout=None)
+
+
+def generation_key(model):
+    return f'generation:{model._meta.label_lower}'
+
+
+def get_generations(*models):
+    """Поколения данных моделей: меняются при каждом изменении записей модели"""
+    keys = [generation_key(model) for model in models]
+    versions = get_versions(*keys)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_generations(*models):
+    """Смена поколений моделей, все ответы, закэшированные для прежних поколений, перестают читаться"""
+    bump_versions(*(generation_key(model) for model in models))
+
+
+RESPONSE_CACHE_STATS_KEYS = {True: 'response_cache:hits', False: 'response_cache:misses'}
+
+
+def record_response_cache_access(hit):
+    """Учет попаданий и промахов кэша ответов во всех процессах"""
+    cache = caches['default']
+    key = RESPONSE_CACHE_STATS_KEYS[hit]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def get_response_cache_stats():
+    stats = caches['default'].get_many(RESPONSE_CACHE_STATS_KEYS.values())
+    hits = stats.get(RESPONSE_CACHE_STATS_KEYS[True], 0)
+    misses = stats.get(RESPONSE_CACHE_STATS_KEYS[False], 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
@@ -0,0 +1,40 @@
+from django.db import transaction
+from courses.denormalization import DENORMALIZED_PARENTS
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses.signals import invalidate_responses
+
+# Уровни дерева курса: модель, поле родителя и копируемые поля
+CLONE_LEVELS = (
+    (Module, 'course', ('title', 'preview')),
+    (Lesson, 'module', ('title', 'content', 'preview', 'url')),
+    (LessonTest, 'lesson', ('title',)),
+    (Question, 'lesson_test', ('text',)),
+    (Answer, 'question', ('text', 'is_correct')),
+)
+CLONE_BATCH_SIZE = 2000
+
+
+def clone_course(course, owner_id, title=None):
+    """
+    Копирование курса со всем деревом в одной транзакции.
+
+    На каждый уровень дерева выполняется одно чтение и один bulk_create, ссылки на родителей
+    переназначаются в памяти по соответствию старых и новых ключей. Файлы превью не копируются:
+    копия ссылается на те же файлы хранилища с адресацией по содержимому.
+    """
+    with transaction.atomic():
+        clone = Course.objects.create(title=title or course.title, description=course.description,
+                                      preview=course.preview.name if course.preview else None, owner_id=owner_id)
+        new_ids = {course.pk: clone.pk}
+        for model, parent, fields in CLONE_LEVELS:
+            rows = list(model.objects.filter(course=course).order_by('pk').values_list('pk', f'{parent}_id', *fields))
+            # Денормализованные курс и владелец задаются сразу, сигналы при bulk_create не отправляются
+            keys = {'course_id': clone.pk, 'owner_id': owner_id} if model in DENORMALIZED_PARENTS else \
+                {'owner_id': owner_id}
+            objects = [model(**{f'{parent}_id': new_ids[row[1]]}, **keys, **dict(zip(fields, row[2:])))
+                       for row in rows]
+            model.objects.bulk_create(objects, batch_size=CLONE_BATCH_SIZE)
+            new_ids = {row[0]: instance.pk for row, instance in zip(rows, objects)}
+        # Списки скопированных моделей в кэше ответов сбрасываются явно
+        invalidate_responses(*(model for model, _, _ in CLONE_LEVELS))
+    return clone
@@ -0,0 +1,185 @@
+import logging
+import threading
+import uuid
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+from django.db.models import Q
+from courses.denormalization import DESCENDANT_PATHS
+from courses.models import (Course, Module, Lesson, LessonTest, Question, Answer, TestAttempt, AttemptAnswer,
+                            LessonCompletion, CourseProgress, Enrollment)
+from courses.progress import recalculate_progress
+from courses.signals import invalidate_answer_keys, invalidate_responses, release_preview
+from courses.tree import invalidate_course_trees
+
+logger = logging.getLogger(__name__)
+
+DELETION_STATUS_KEY = 'deletion:{}'
+# Модели дерева курса снизу вверх: порядок удаления
+DELETION_ORDER = (AttemptAnswer, TestAttempt, LessonCompletion, CourseProgress, Enrollment, Answer, Question,
+                  LessonTest, Lesson, Module, Course)
+PREVIEW_MODELS = (Course, Module, Lesson)
+# Данные пользователей не кэшируются в ответах списков
+USER_MODELS = (TestAttempt, AttemptAnswer, LessonCompletion, CourseProgress)
+
+_lock = threading.Lock()
+_executor = None
+
+
+def deletion_levels(model, ids):
+    """
+    Выборки удаляемых записей по уровням дерева снизу вверх: потомки записей ids модели model
+    (курса или модуля) и сами записи.
+    """
+    paths = {Module: 'course', **DESCENDANT_PATHS[Course]} if model is Course else dict(DESCENDANT_PATHS[model])
+    paths[model] = 'pk'
+    paths[TestAttempt] = f'lesson_test__{paths[LessonTest]}'
+    paths[LessonCompletion] = f'lesson__{paths[Lesson]}'
+    if model is Course:
+        paths[CourseProgress] = paths[Enrollment] = 'course'
+    levels = []
+    for level in DELETION_ORDER:
+        if level is AttemptAnswer:
+            condition = Q(**{f'attempt__{paths[TestAttempt]}__in': ids}) | \
+                Q(**{f'question__{paths[Question]}__in': ids})
+        elif level in paths:
+            condition = Q(**{f'{paths[level]}__in': ids})
+        else:
+            continue
+        levels.append((level, level.objects.filter(condition)))
+    return levels
+
+
+def count_tree(model, ids):
+    """Число удаляемых записей по моделям"""
+    return {level: queryset.count() for level, queryset in deletion_levels(model, ids)}
+
+
+def delete_tree(model, ids, batch_size=None, progress=None, atomic_batches=False):
+    """
+    Удаление курсов или модулей со всем поддеревом запросами DELETE ... WHERE по уровням.
+
+    В отличие от QuerySet.delete() записи не загружаются в память и сигналы не отправляются,
+    поэтому кэши и файлы превью освобождаются явно. Каждый уровень удаляется пачками
+    по batch_size записей, после каждой пачки вызывается progress(модель, удалено).
+    Транзакцией управляет вызывающий код, при atomic_batches=True каждая пачка фиксируется
+    отдельно. Прерванное удаление можно повторить с теми же ids: уровни удаляются снизу вверх,
+    поэтому оставшиеся записи по-прежнему связаны с удаляемыми курсами или модулями.
+    Возвращает число удаленных записей по моделям.
+    """
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    ids = list(ids)
+    levels = deletion_levels(model, ids)
+    course_ids = ids if model is Course else list(Module.objects.filter(pk__in=ids).values_list('course_id', flat=True))
+    test_ids = list(dict(levels)[LessonTest].values_list('pk', flat=True))
+
+    deleted = {}
+    try:
+        for level, queryset in levels:
+            deleted[level] = 0
+            while batch := list(queryset.values_list('pk', flat=True)[:batch_size]):
+                with transaction.atomic() if atomic_batches else nullcontext():
+                    rows = level.objects.filter(pk__in=batch)
+                    previews = set(rows.exclude(preview='').values_list('preview', flat=True).distinct()) \
+                        if level in PREVIEW_MODELS else ()
+                    # _raw_delete удаляет одним запросом без сборщика каскадов и сигналов
+                    deleted[level] += rows._raw_delete(DEFAULT_DB_ALIAS)
+                    # Файлы освобождаются после фиксации пачки, чтобы повтор удаления их не потерял
+                    for name in previews:
+                        release_preview(name)
+                if progress:
+                    progress(level, deleted[level])
+
+        if model is not Course:
+            # Прогресс по курсам с удаленными модулями пересчитывается по оставшимся урокам
+            recalculate_progress(course_ids)
+    finally:
+        # Кэши сбрасываются и после ошибки: зафиксированные пачки уже удалены
+        invalidate_responses(*(level for level in deleted if level not in USER_MODELS))
+        invalidate_course_trees(*course_ids)
+        invalidate_answer_keys(*test_ids)
+    return deleted
+
+
+def get_deletion_status(task_id):
+    return cache.get(DELETION_STATUS_KEY.format(task_id))
+
+
+def set_deletion_status(task_id, status):
+    cache.set(DELETION_STATUS_KEY.format(task_id), status, settings.DELETION_STATUS_TIMEOUT)
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='deletion')
+        return _executor
+
+
+def run_deletion(task_id, model, ids):
+    """
+    Удаление по задаче: каждая пачка фиксируется отдельно, ход удаления сохраняется в кэше.
+
+    При ошибке задача получает состояние failed с текстом ошибки и может быть продолжена
+    resume_deletion: счетчики удаленных записей продолжаются с достигнутых значений.
+    """
+    status = get_deletion_status(task_id)
+    try:
+        remaining = count_tree(model, ids)
+        done = status.get('deleted') or {}
+        status.update(state='running', error=None,
+                      total={level._meta.label: done.get(level._meta.label, 0) + count
+                             for level, count in remaining.items()},
+                      deleted={level._meta.label: done.get(level._meta.label, 0) for level in remaining})
+        set_deletion_status(task_id, status)
+        start = dict(status['deleted'])
+
+        def progress(level, count):
+            status['deleted'][level._meta.label] = start[level._meta.label] + count
+            set_deletion_status(task_id, status)
+
+        delete_tree(model, ids, progress=progress, atomic_batches=True)
+        status['state'] = 'done'
+    except Exception as exc:
+        logger.exception('Не удалось удалить %s %s', model._meta.label, ids)
+        status.update(state='failed', error=repr(exc))
+    finally:
+        set_deletion_status(task_id, status)
+
+
+def _run(task_id, model, ids):
+    try:
+        run_deletion(task_id, model, ids)
+    finally:
+        close_old_connections()
+
+
+def start_deletion(model, ids):
+    """Запуск удаления в фоне, возвращает идентификатор задачи для отслеживания хода удаления"""
+    task_id = uuid.uuid4().hex
+    set_deletion_status(task_id, {'model': model._meta.label, 'ids': list(ids), 'state': 'pending',
+                                  'total': {}, 'deleted': {}})
+    if settings.DELETION_BACKGROUND:
+        transaction.on_commit(lambda: get_executor().submit(_run, task_id, model, list(ids)))
+    else:
+        run_deletion(task_id, model, list(ids))
+    return task_id
+
+
+def resume_deletion(task_id):
+    """Повторный запуск задачи, завершившейся ошибкой; возвращает False, если продолжать нечего"""
+    status = get_deletion_status(task_id)
+    if status is None or status['state'] != 'failed':
+        return False
+    status['state'] = 'pending'
+    set_deletion_status(task_id, status)
+    model = apps.get_model(status['model'])
+    if settings.DELETION_BACKGROUND:
+        transaction.on_commit(lambda: get_executor().submit(_run, task_id, model, status['ids']))
+    else:
+        run_deletion(task_id, model, status['ids'])
+    return True
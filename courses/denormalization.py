@@ -0,0 +1,101 @@
+from django.db.models import F, OuterRef, Q, Subquery
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+
+# Модели с денормализованными курсом и владельцем курса и поле их родительской записи, порядок - сверху вниз
+DENORMALIZED_PARENTS = {
+    Lesson: 'module',
+    LessonTest: 'lesson',
+    Question: 'lesson_test',
+    Answer: 'question',
+}
+# Модели с денормализованным владельцем курса: у модуля курс - сам родитель, денормализован только владелец
+DENORMALIZED_OWNERS = (Module, *DENORMALIZED_PARENTS)
+
+# Пути от денормализованных моделей к записи дерева курса, при переносе которой меняется курс потомков
+DESCENDANT_PATHS = {
+    Course: {Module: 'course', Lesson: 'course', LessonTest: 'course', Question: 'course', Answer: 'course'},
+    Module: {Lesson: 'module', LessonTest: 'lesson__module', Question: 'lesson_test__lesson__module',
+             Answer: 'question__lesson_test__lesson__module'},
+    Lesson: {LessonTest: 'lesson', Question: 'lesson_test__lesson', Answer: 'question__lesson_test__lesson'},
+    LessonTest: {Question: 'lesson_test', Answer: 'question__lesson_test'},
+    Question: {Answer: 'question'},
+}
+
+
+def parent_model(model):
+    return model._meta.get_field(DENORMALIZED_PARENTS[model]).related_model
+
+
+def fill_course_keys(instance):
+    """Заполнение курса и владельца курса записи по ее родителю одним запросом"""
+    model = type(instance)
+    if model is Module:
+        instance.owner_id = Course.objects.filter(pk=instance.course_id).values_list('owner_id', flat=True).first()
+        return
+    parent = parent_model(model)
+    owner = 'course__owner_id' if parent is Module else 'owner_id'
+    parent_id = getattr(instance, f'{DENORMALIZED_PARENTS[model]}_id')
+    row = parent.objects.filter(pk=parent_id).values_list('course_id', owner).first() if parent_id else None
+    instance.course_id, instance.owner_id = row or (None, None)
+
+
+def update_descendants(node):
+    """
+    Перенос курса и владельца курса записи на всех ее потомков.
+
+    Вызывается после переноса записи в другой курс или смены владельца курса,
+    возвращает число обновленных строк.
+    """
+    if isinstance(node, Course):
+        course_id, owner_id = node.pk, node.owner_id
+    elif isinstance(node, Module):
+        course_id = node.course_id
+        owner_id = Course.objects.filter(pk=course_id).values_list('owner_id', flat=True).first()
+    else:
+        course_id, owner_id = node.course_id, node.owner_id
+    return sum(
+        model.objects.filter(**{path: node}).update(course_id=course_id, owner_id=owner_id)
+        for model, path in DESCENDANT_PATHS[type(node)].items()
+    )
+
+
+def course_mismatch(model):
+    """Условие на записи, чей курс расходится с курсом родителя"""
+    return Q(course__isnull=True) | ~Q(course_id=F(f'{DENORMALIZED_PARENTS[model]}__course_id'))
+
+
+def owner_mismatch(model):
+    """Условие на записи, чей владелец расходится с владельцем курса"""
+    return (
+        Q(owner__isnull=True, course__owner__isnull=False) |
+        Q(owner__isnull=False, course__owner__isnull=True) |
+        Q(owner__isnull=False, course__owner__isnull=False) & ~Q(owner_id=F('course__owner_id'))
+    )
+
+
+def find_mismatches(model):
+    condition = owner_mismatch(model)
+    if model in DENORMALIZED_PARENTS:
+        condition |= course_mismatch(model)
+    return model.objects.filter(condition)
+
+
+def repair(model):
+    """
+    Исправление курса и владельца курса по родителям, возвращает число исправленных значений.
+
+    Модели исправляются сверху вниз (в порядке DENORMALIZED_OWNERS), так как курс записи
+    берется у уже исправленного родителя.
+    """
+    fixed = 0
+    if model in DENORMALIZED_PARENTS:
+        parent = DENORMALIZED_PARENTS[model]
+        fixed += model.objects.filter(course_mismatch(model)).update(
+            course_id=Subquery(
+                parent_model(model).objects.filter(pk=OuterRef(f'{parent}_id')).values('course_id')[:1]
+            ),
+        )
+    fixed += model.objects.filter(owner_mismatch(model)).update(
+        owner_id=Subquery(Course.objects.filter(pk=OuterRef('course_id')).values('owner_id')[:1]),
+    )
+    return fixed
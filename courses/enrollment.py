@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from courses.models import LessonTest, Enrollment
+from courses.signals import invalidate_responses
+
+
+def enrolled(user, course_field='course'):
+    """Подзапрос EXISTS: пользователь записан на курс записи, курс берется из поля course_field"""
+    return Exists(Enrollment.objects.filter(user_id=user.pk, course_id=OuterRef(course_field)))
+
+
+def scope_enrolled(queryset, user, course_field='course'):
+    """
+    Записи курсов, на которые записан пользователь, персоналу все.
+
+    Отбор подзапросом EXISTS по уникальному индексу (user, course) не размножает строки,
+    в отличие от соединения с записями на курс, и не требует DISTINCT.
+    """
+    return queryset if user.is_staff else queryset.filter(enrolled(user, course_field))
+
+
+def is_enrolled(user, course_id):
+    """Доступ к курсу: персоналу всегда, остальным при записи на курс"""
+    return user.is_staff or Enrollment.objects.filter(user_id=user.pk, course_id=course_id).exists()
+
+
+def accessible_tests(user, test_ids):
+    """Идентификаторы тестов из test_ids, доступных пользователю, одним запросом для студента"""
+    if user.is_staff:
+        return set(test_ids)
+    return set(scope_enrolled(LessonTest.objects.filter(pk__in=test_ids), user).values_list('pk', flat=True))
+
+
+def enroll_users(course, user_ids):
+    """
+    Запись группы пользователей на курс пачками INSERT с пропуском уже записанных.
+
+    Несуществующие идентификаторы отбрасываются одним запросом. Возвращает число новых записей.
+    """
+    with transaction.atomic():
+        user_ids = list(get_user_model().objects.filter(pk__in=set(user_ids)).values_list('pk', flat=True))
+        before = Enrollment.objects.filter(course=course).count()
+        Enrollment.objects.bulk_create(
+            [Enrollment(user_id=user_id, course_id=course.pk) for user_id in user_ids],
+            batch_size=settings.ENROLLMENT_BATCH_SIZE, ignore_conflicts=True,
+        )
+        # bulk_create не отправляет сигналы, поэтому кэш списков сбрасывается явно
+        invalidate_responses(Enrollment)
+        return Enrollment.objects.filter(course=course).count() - before
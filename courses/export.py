@@ -0,0 +1,110 @@
+import csv
+import datetime
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from courses.models import (Module, Lesson, LessonTest, Question, Answer, TestAttempt, AttemptAnswer,
+                            LessonCompletion, CourseProgress, Enrollment)
+
+# Форматы выгрузки и их типы содержимого
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Служебные и секретные поля в выгрузку не попадают
+EXCLUDED_FIELDS = {'search_vector', 'password'}
+
+
+def scope_courses(queryset, user):
+    """Курсы, доступные пользователю для выгрузки: администратору все, остальным только свои"""
+    return queryset if user.is_superuser else queryset.filter(owner_id=user.pk)
+
+
+def course_sources(courses, attempts=False):
+    """
+    Выборки дерева курсов в порядке зависимостей моделей.
+
+    Потомки отбираются по денормализованному курсу, поэтому каждая выборка - один запрос
+    по индексу независимо от числа курсов.
+    """
+    course_ids = courses.values('pk')
+    sources = [
+        courses,
+        Module.objects.filter(course__in=course_ids),
+        Lesson.objects.filter(course__in=course_ids),
+        LessonTest.objects.filter(course__in=course_ids),
+        Question.objects.filter(course__in=course_ids),
+        Answer.objects.filter(course__in=course_ids),
+    ]
+    if attempts:
+        sources += [
+            TestAttempt.objects.filter(lesson_test__course__in=course_ids),
+            AttemptAnswer.objects.filter(attempt__lesson_test__course__in=course_ids),
+            LessonCompletion.objects.filter(lesson__course__in=course_ids),
+            CourseProgress.objects.filter(course__in=course_ids),
+            Enrollment.objects.filter(course__in=course_ids),
+        ]
+    return sources
+
+
+def export_fields(model):
+    return [field for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in EXCLUDED_FIELDS]
+
+
+def iter_rows(queryset):
+    """Строки выборки (pk, {поле: значение}) через серверный курсор без накопления в памяти"""
+    fields = export_fields(queryset.model)
+    names = [field.name for field in fields]
+    rows = queryset.order_by('pk').values_list('pk', *(field.attname for field in fields))
+    for row in rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield row[0], dict(zip(names, row[1:]))
+
+
+class Echo:
+    """Буфер для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def stream_export(sources, export_format):
+    """
+    Потоковая выгрузка выборок построчно.
+
+    NDJSON совместим с форматом dumpdata по строке на запись и загружается командой load_content.
+    В CSV каждая модель выгружается секцией со своей строкой заголовка.
+    """
+    writer = csv.writer(Echo())
+    for queryset in sources:
+        model = queryset.model
+        label = model._meta.label_lower
+        if export_format == 'csv':
+            yield writer.writerow(['model', 'pk', *(field.name for field in export_fields(model))])
+        for pk, fields in iter_rows(queryset):
+            if export_format == 'csv':
+                yield writer.writerow([label, pk, *(csv_value(value) for value in fields.values())])
+            else:
+                yield json.dumps({'model': label, 'pk': pk, 'fields': fields}, cls=DjangoJSONEncoder,
+                                 ensure_ascii=False) + '\n'
+
+
+def get_export_format(request):
+    """Формат выгрузки из параметра export_format (параметр format занят DRF)"""
+    export_format = request.query_params.get('export_format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError({'export_format': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}'})
+    return export_format
+
+
+def export_response(sources, export_format, filename):
+    response = StreamingHttpResponse(stream_export(sources, export_format), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
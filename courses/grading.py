@@ -0,0 +1,151 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import FilteredRelation, Q
+from courses.cache import LRUCache, get_versions, bump_versions
+from courses.models import LessonTest
+
+
+def build_answer_keys(test_ids):
+    """
+    Загрузка ключей ответов для набора тестов одним запросом.
+
+    Возвращает словарь {id теста: {id вопроса: текст правильного ответа или None}}.
+    Как и раньше, правильным считается первый (по id) ответ с is_correct=True,
+    вопрос без правильного ответа попадает в ключ со значением None.
+    Тесты, которых нет в базе, в результат не попадают.
+    """
+    rows = (
+        LessonTest.objects
+        .filter(pk__in=test_ids)
+        .annotate(correct=FilteredRelation('questions__answers',
+                                           condition=Q(questions__answers__is_correct=True)))
+        .order_by('pk', 'questions__id', 'correct__id')
+        .values_list('pk', 'questions__id', 'correct__text')
+    )
+
+    answer_keys = {}
+    for test_id, question_id, correct_text in rows:
+        answer_key = answer_keys.setdefault(test_id, {})
+        if question_id is not None and question_id not in answer_key:
+            answer_key[question_id] = correct_text
+    return answer_keys
+
+
+def build_answer_key(test_id):
+    """Ключ ответов одного теста, None если теста не существует"""
+    return build_answer_keys([test_id]).get(test_id)
+
+
+def mark_answers(answer_key, answers):
+    """Проверка каждого ответа по ключу: список (id вопроса, ответ пользователя, правильность)"""
+    marks = []
+    for question_id, correct_text in answer_key.items():
+        user_answer = answers.get(str(question_id))
+        marks.append((question_id, user_answer, correct_text is not None and user_answer == correct_text))
+    return marks
+
+
+def grade_answers(answer_key, answers):
+    """Подсчет результата прохождения теста по ключу ответов без обращения к базе"""
+    return {
+        "correct_answers": sum(is_correct for _, _, is_correct in mark_answers(answer_key, answers)),
+        "total_questions": len(answer_key),
+    }
+
+
+class AnswerKeyCache:
+    """
+    Двухуровневый кэш скомпилированных ключей ответов.
+
+    Первый уровень - LRU в памяти процесса, второй (необязательный) - кэш Django с псевдонимом
+    shared_alias, общий для всех процессов. Для каждого теста в кэше Django с псевдонимом
+    version_alias хранится токен версии, который сверяется при каждом чтении, в том числе
+    при попадании в LRU: инвалидация меняет токен, и записи с прежним токеном перестают
+    читаться во всех процессах, которые видят этот кэш.
+
+    Мгновенная инвалидация во всех процессах есть, только если кэш version_alias общий
+    (например, Redis при заданном REDIS_URL). С LocMemCache токены у каждого процесса свои:
+    инвалидация действует в текущем процессе, а остальные отдают прежний ключ ответов,
+    пока не истечет local_timeout, - это и есть гарантия свежести без общего кэша.
+    """
+    version_key = 'answer_key:version:{}'
+    value_key = 'answer_key:{}:{}'
+
+    def __init__(self, local_size=1024, local_timeout=None, shared_alias=None, shared_timeout=None,
+                 version_alias='default'):
+        self.local = LRUCache(maxsize=local_size, timeout=local_timeout)
+        self.shared_alias = shared_alias
+        self.shared_timeout = shared_timeout
+        self.version_alias = version_alias
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def _get_versions(self, test_ids):
+        """Текущие токены версий тестов"""
+        keys = {self.version_key.format(test_id): test_id for test_id in test_ids}
+        versions = get_versions(*keys, alias=self.version_alias)
+        return {test_id: versions[key] for key, test_id in keys.items()}
+
+    def get_many(self, test_ids):
+        """Ключи ответов тестов {id теста: ключ}, несуществующие тесты пропускаются"""
+        test_ids = list(dict.fromkeys(test_ids))
+        versions = self._get_versions(test_ids)
+        answer_keys = {}
+        missing = []
+
+        for test_id in test_ids:
+            cached = self.local.get(test_id)
+            if cached is not None and cached[0] == versions[test_id]:
+                answer_keys[test_id] = cached[1]
+            else:
+                missing.append(test_id)
+
+        shared = self.shared
+        if missing and shared is not None:
+            keys = {self.value_key.format(test_id, versions[test_id]): test_id for test_id in missing}
+            for key, answer_key in shared.get_many(keys).items():
+                test_id = keys[key]
+                answer_keys[test_id] = answer_key
+                self.local.set(test_id, (versions[test_id], answer_key))
+            missing = [test_id for test_id in missing if test_id not in answer_keys]
+
+        if missing:
+            loaded = build_answer_keys(missing)
+            for test_id, answer_key in loaded.items():
+                answer_keys[test_id] = answer_key
+                self.local.set(test_id, (versions[test_id], answer_key))
+            if shared is not None and loaded:
+                shared.set_many({self.value_key.format(test_id, versions[test_id]): answer_key
+                                 for test_id, answer_key in loaded.items()}, timeout=self.shared_timeout)
+
+        return answer_keys
+
+    def get(self, test_id):
+        """Ключ ответов теста, None если теста не существует"""
+        return self.get_many([test_id]).get(test_id)
+
+    async def aget(self, test_id):
+        """
+        Асинхронный вариант get.
+
+        Обращения к кэшу токенов, общему кэшу и базе выполняются в пуле потоков.
+        """
+        return await sync_to_async(self.get)(test_id)
+
+    def invalidate(self, test_id):
+        self.local.delete(test_id)
+        bump_versions(self.version_key.format(test_id), alias=self.version_alias)
+
+    def clear(self):
+        self.local.clear()
+
+
+answer_key_cache = AnswerKeyCache(
+    local_size=settings.ANSWER_KEY_CACHE_SIZE,
+    local_timeout=settings.ANSWER_KEY_CACHE_LOCAL_TIMEOUT,
+    shared_alias=settings.ANSWER_KEY_CACHE_ALIAS,
+    shared_timeout=settings.ANSWER_KEY_CACHE_TIMEOUT,
+)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+from django.core.management import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from courses.models import Course, Lesson, LessonTest
+from users.models import User
+
+
+async def read_response(reader):
+    """Чтение ответа HTTP/1.1 с Content-Length или chunked-телом, возвращает код ответа"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Соединение закрыто сервером')
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status_line.split()[1])
+
+
+async def run_client(host, port, requests, count, timings, errors):
+    """Клиент с постоянным соединением, отправляющий запросы по очереди"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            started = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            await writer.drain()
+            status = await read_response(reader)
+            timings.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def build_request(method, host, path, token, body=None):
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', f'Authorization: Bearer {token}',
+             'Connection: keep-alive']
+    payload = json.dumps(body).encode() if body is not None else b''
+    if body is not None:
+        lines += ['Content-Type: application/json', f'Content-Length: {len(payload)}']
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+
+class Command(BaseCommand):
+    """
+    Сравнение синхронных и асинхронных эндпоинтов под нагрузкой одновременных клиентов.
+
+    Запросы отправляются запущенному серверу (например, uvicorn config.asgi:application)
+    из асинхронных клиентов на сокетах asyncio, от имени указанного пользователя.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Адрес запущенного сервера')
+        parser.add_argument('--email', required=True, help='Email пользователя-администратора для JWT')
+        parser.add_argument('--clients', type=int, default=50, help='Число одновременных клиентов')
+        parser.add_argument('--requests', type=int, default=20, help='Запросов на одного клиента')
+
+    def get_endpoints(self):
+        course = Course.objects.order_by('pk').values_list('pk', flat=True).first()
+        lesson = Lesson.objects.order_by('pk').values_list('pk', flat=True).first()
+        test = LessonTest.objects.order_by('pk').values_list('pk', flat=True).first()
+        if None in (course, lesson, test):
+            raise CommandError('Для теста нужны хотя бы один курс, урок и тест урока')
+        for prefix in ('', 'async/'):
+            yield f'/{prefix}course/', 'GET', None
+            yield f'/{prefix}course/{course}/', 'GET', None
+            yield f'/{prefix}lesson/', 'GET', None
+            yield f'/{prefix}lesson/{lesson}/', 'GET', None
+            yield f'/{prefix}lesson_test/{test}/check_answers/', 'POST', {'answers': {}}
+
+    async def measure(self, host, port, request, clients, count):
+        timings, errors = [], []
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_client(host, port, [request], count, timings, errors) for _ in range(clients)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        failed = [result for result in results if isinstance(result, BaseException)]
+        return timings, len(errors) + len(failed), elapsed
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        host, port = url.hostname, url.port or 80
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["email"]} не найден')
+        token = AccessToken.for_user(user)
+
+        self.stdout.write(f'{"Эндпоинт":<45}{"Запросов":>10}{"Ошибок":>8}{"Запр./с":>10}{"p50, мс":>10}'
+                          f'{"p95, мс":>10}')
+        for path, method, body in self.get_endpoints():
+            request = build_request(method, url.netloc, path, token, body)
+            timings, errors, elapsed = asyncio.run(
+                self.measure(host, port, request, options['clients'], options['requests']))
+            if len(timings) >= 2:
+                p50 = statistics.median(timings) * 1000
+                p95 = statistics.quantiles(timings, n=20)[-1] * 1000
+            else:
+                p50 = p95 = 0
+            self.stdout.write(f'{method + " " + path:<45}{len(timings):>10}{errors:>8}'
+                              f'{len(timings) / elapsed:>10.1f}{p50:>10.1f}{p95:>10.1f}')
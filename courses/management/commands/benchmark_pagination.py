@@ -0,0 +1,71 @@
+import time
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses.paginations import CustomPagination, KeysetPagination
+from courses.views import AnswerViewSet
+
+
+class Command(BaseCommand):
+    """
+    Сравнение времени получения глубоких страниц ответов для CustomPagination и KeysetPagination.
+
+    Данные создаются во временной транзакции и удаляются после замеров.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Количество ответов')
+        parser.add_argument('--page-size', type=int, default=10, help='Размер страницы')
+        parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 1000, 5000], help='Номера страниц')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['rows'])
+            # Выборка и сортировка списка ответов API: по префиксу текста и pk, которые обслуживает индекс
+            queryset = AnswerViewSet.queryset.all()
+            self.stdout.write(f'{"Страница":>10} {"page number, мс":>16} {"keyset, мс":>12}')
+            for page in options['pages']:
+                page_number_time = self.measure(CustomPagination, queryset, {'page': page}, options)
+                cursor = self.get_cursor(queryset, page, options['page_size'])
+                keyset_time = self.measure(KeysetPagination, queryset, {'cursor': cursor} if cursor else {}, options)
+                self.stdout.write(f'{page:>10} {page_number_time:>16.2f} {keyset_time:>12.2f}')
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def seed(rows):
+        course = Course.objects.create(title='Benchmark', description='Benchmark')
+        module = Module.objects.create(title='Benchmark', course=course)
+        lesson = Lesson.objects.create(title='Benchmark', content='Benchmark', module=module)
+        lesson_test = LessonTest.objects.create(title='Benchmark', lesson=lesson)
+        question = Question.objects.create(text='Benchmark', lesson_test=lesson_test)
+        Answer.objects.bulk_create(
+            (Answer(question=question, course=course, text=f'Ответ {i % 1000:04}') for i in range(rows)),
+            batch_size=5000,
+        )
+
+    @staticmethod
+    def get_cursor(queryset, page, page_size):
+        """Курсор, указывающий на последнюю запись предыдущей страницы"""
+        if page <= 1:
+            return None
+        paginator = KeysetPagination()
+        paginator.ordering = paginator.get_ordering(queryset)
+        last = queryset.order_by(*paginator.ordering)[(page - 1) * page_size - 1]
+        return paginator.encode_cursor(paginator.get_position(last))
+
+    @staticmethod
+    def measure(pagination_class, queryset, params, options):
+        """Лучшее время получения страницы в миллисекундах"""
+        factory = APIRequestFactory()
+        timings = []
+        for _ in range(options['repeat']):
+            request = Request(factory.get('/answer/', {**params, 'page_size': options['page_size']}))
+            paginator = pagination_class()
+            paginator.page_size = options['page_size']
+            started = time.perf_counter()
+            paginator.paginate_queryset(queryset, request)
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
@@ -0,0 +1,25 @@
+from django.core.management import BaseCommand, CommandError
+from courses.denormalization import DENORMALIZED_OWNERS, find_mismatches, repair
+
+
+class Command(BaseCommand):
+    """
+    Проверка денормализованных курса и владельца курса у модулей, уроков, тестов, вопросов и ответов.
+
+    Расхождения возможны после изменений в обход сигналов (update, bulk_create, SQL).
+    С --fix они исправляются по родительским записям.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Исправить найденные расхождения')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in DENORMALIZED_OWNERS:
+            count = find_mismatches(model).count()
+            total += count
+            if count and options['fix']:
+                repair(model)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: расхождений {count}')
+        if total and not options['fix']:
+            raise CommandError(f'Найдено расхождений: {total}, для исправления запустите с --fix')
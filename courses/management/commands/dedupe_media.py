@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from courses.signals import PARENT_LOOKUPS, invalidate_responses, release_preview
+from courses.storage import content_storage
+from courses.tree import invalidate_course_trees
+
+
+class Command(BaseCommand):
+    """Перенос ранее загруженных превью в хранилище с адресацией по содержимому"""
+
+    def handle(self, *args, **options):
+        moved = 0
+        for model, field in content_storage.fields():
+            default = field.get_default() if field.has_default() else None
+            names = model._default_manager.exclude(**{f'{field.name}__in': ['', default]}).exclude(
+                **{f'{field.name}__startswith': f'{content_storage.prefix}/'}
+            ).values_list(field.name, flat=True).distinct()
+            for name in list(names):
+                if not content_storage.exists(name):
+                    self.stderr.write(f'Файл {name} не найден')
+                    continue
+                # Файл сохраняется в транзакции переноса ссылок: блокировка его имени не даст удалить
+                # файл, пока ссылки на него не записаны
+                with transaction.atomic(), content_storage.open(name) as file:
+                    new_name = content_storage.save(name, file)
+                    rows = model._default_manager.filter(**{field.name: name})
+                    course_ids = list(rows.values_list(PARENT_LOOKUPS[model]['course'], flat=True))
+                    # Смена updated_at меняет ETag: клиенты не сохранят ссылку на удаляемый файл по ответу 304
+                    moved += rows.update(**{field.name: new_name}, updated_at=timezone.now())
+                    # update() не отправляет сигналы, поэтому кэши сбрасываются явно
+                    invalidate_responses(model)
+                    invalidate_course_trees(*course_ids)
+                    release_preview(name)
+        self.stdout.write(f'Перенесено превью: {moved}')
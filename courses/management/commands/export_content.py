@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand, CommandError
+from courses.export import EXPORT_FORMATS, course_sources, stream_export
+from courses.models import Course
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Потоковая выгрузка курсов целиком или всех пользователей в NDJSON или CSV.
+
+    Записи читаются серверным курсором пачками, поэтому память не растет с объемом данных.
+    NDJSON загружается обратно командой load_content.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, nargs='+', help='Идентификаторы курсов, по умолчанию все')
+        parser.add_argument('--owner', help='Email владельца: выгрузить только его курсы')
+        parser.add_argument('--users', action='store_true', help='Выгрузить пользователей вместо курсов')
+        parser.add_argument('--attempts', action='store_true', help='Добавить попытки прохождения тестов')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='Файл выгрузки, по умолчанию стандартный вывод')
+
+    def handle(self, *args, **options):
+        if options['users']:
+            sources = [User.objects.all()]
+        else:
+            courses = Course.objects.all()
+            if options['course']:
+                courses = courses.filter(pk__in=options['course'])
+            if options['owner']:
+                owner = User.objects.filter(email=options['owner']).first()
+                if owner is None:
+                    raise CommandError(f'Пользователь {options["owner"]} не найден')
+                courses = courses.filter(owner=owner)
+            sources = course_sources(courses, options['attempts'])
+
+        chunks = stream_export(sources, options['format'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from courses import attempts
+
+
+class Command(BaseCommand):
+    """
+    Дозапись попыток прохождения тестов из файлов отложенной записи.
+
+    Буферы в памяти принадлежат процессам приложения и сбрасываются ими самими
+    (по размеру пачки, по времени и при завершении процесса), команде они недоступны.
+    Попытки, которые база отклонила, переносятся в подкаталог failed.
+    """
+
+    def handle(self, *args, **options):
+        written = attempts.attempt_writer.drain_spool()
+        self.stdout.write(f'Записано попыток: {written}')
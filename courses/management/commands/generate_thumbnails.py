@@ -0,0 +1,37 @@
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management import BaseCommand
+from courses.thumbnails import THUMBNAIL_DIR, generate_variants
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+
+
+def walk_images(directory):
+    """Изображения в папке хранилища и вложенных папках, кроме папок с уменьшенными копиями"""
+    directories, files = default_storage.listdir(directory)
+    for filename in sorted(files):
+        if posixpath.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+            yield posixpath.join(directory, filename)
+    for name in sorted(directories):
+        if name != THUMBNAIL_DIR:
+            yield from walk_images(posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    """Создание недостающих уменьшенных копий для уже загруженных превью"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='courses', help='Папка в хранилище медиафайлов')
+        parser.add_argument('--force', action='store_true', help='Пересоздать существующие копии')
+        parser.add_argument('--workers', type=int, default=settings.THUMBNAIL_WORKERS)
+
+    def handle(self, *args, **options):
+        if not default_storage.exists(options['path']):
+            self.stdout.write(f'Папка {options["path"]} не найдена')
+            return
+        names = list(walk_images(options['path']))
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            created = sum(map(len, executor.map(lambda name: generate_variants(name, force=options['force']), names)))
+        self.stdout.write(f'Обработано изображений: {len(names)}, создано копий: {created}')
@@ -0,0 +1,219 @@
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from itertools import islice
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from courses.denormalization import DENORMALIZED_OWNERS, repair
+from courses.models import Lesson, LessonCompletion, CourseProgress
+from courses.progress import create_missing_progress, recalculate_progress
+from courses.signals import invalidate_responses
+from courses.tree import invalidate_course_trees
+
+# Приложения, чьи модели загружаются, в порядке зависимостей
+APPS = ('users', 'courses')
+WHITESPACE = re.compile(r'[\s,]*')
+
+
+def iter_json_array(file, chunk_size=1 << 20):
+    """Потоковое чтение элементов JSON-массива без загрузки всего файла в память"""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив записей')
+    position = 1
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Запись не поместилась в буфер: дочитываем следующий фрагмент файла
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise CommandError('Файл обрывается или содержит некорректный JSON')
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield record
+        position = end
+
+
+def iter_records(path, file_format):
+    with open(path, encoding='utf-8') as file:
+        if file_format == 'json':
+            yield from iter_json_array(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def copy_value(value):
+    """Значение в текстовом формате COPY"""
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif isinstance(value, (bytes, memoryview)):
+        value = '\\x' + bytes(value).hex()
+    elif hasattr(value, 'dumps') and hasattr(value, 'adapted'):
+        value = value.dumps(value.adapted)
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def insert_rows(connection, table, columns, rows):
+    """Вставка строк через COPY на PostgreSQL или одним executemany на других базах"""
+    quote = connection.ops.quote_name
+    if connection.vendor == 'postgresql':
+        data = io.StringIO()
+        for row in rows:
+            data.write('\t'.join(copy_value(value) for value in row) + '\n')
+        data.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(table)} ({", ".join(quote(column) for column in columns)}) FROM STDIN', data,
+            )
+    else:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote(table)} ({", ".join(quote(column) for column in columns)}) '
+                f'VALUES ({", ".join(["%s"] * len(columns))})',
+                rows,
+            )
+
+
+class Command(BaseCommand):
+    """
+    Быстрая загрузка больших дампов пользователей и курсов в формате JSON (dumpdata) или NDJSON.
+
+    Записи читаются потоково и раскладываются по моделям во временные файлы, затем загружаются
+    пачками в порядке зависимостей (User → Course → Module → Lesson → LessonTest → Question → Answer)
+    через COPY на PostgreSQL или пакетный INSERT на других базах. Сигналы не отправляются:
+    после загрузки исправляются денормализованные поля, сдвигаются последовательности
+    первичных ключей и сбрасываются кэши. Все выполняется в одной транзакции.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Файлы .json или .jsonl/.ndjson')
+        parser.add_argument('--format', choices=['json', 'jsonl'], help='Формат файлов, по умолчанию по расширению')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.using = DEFAULT_DB_ALIAS
+        self.connection = connections[self.using]
+        models = [model for label in APPS for model in apps.get_app_config(label).get_models()]
+        labels = {model._meta.label_lower: model for model in models}
+        started = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as spool_dir:
+            counts = self.spool(options['paths'], options['format'], labels, spool_dir)
+            loaded, self.course_ids = [], set()
+            with transaction.atomic(using=self.using):
+                for model in models:
+                    if counts.get(model):
+                        self.load(model, os.path.join(spool_dir, model._meta.label_lower), options['batch_size'])
+                        loaded.append(model)
+                self.finish(loaded)
+
+        total = sum(counts.values())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Всего: {total} строк, {elapsed:.1f} с, {total / elapsed if elapsed else 0:.0f} строк/с')
+
+    def spool(self, paths, file_format, labels, spool_dir):
+        """Раскладка записей по файлам моделей: дамп может быть в любом порядке"""
+        counts, files = {}, {}
+        try:
+            for path in paths:
+                if not os.path.exists(path):
+                    raise CommandError(f'Файл {path} не найден')
+                path_format = file_format or ('json' if path.lower().endswith('.json') else 'jsonl')
+                for record in iter_records(path, path_format):
+                    model = labels.get(str(record.get('model')).lower())
+                    if model is None:
+                        raise CommandError(f'{path}: неизвестная модель {record.get("model")}')
+                    if model not in files:
+                        files[model] = open(os.path.join(spool_dir, model._meta.label_lower), 'w', encoding='utf-8')
+                    files[model].write(json.dumps(record, ensure_ascii=False) + '\n')
+                    counts[model] = counts.get(model, 0) + 1
+        except json.JSONDecodeError as exc:
+            raise CommandError(f'Некорректный JSON: {exc}')
+        finally:
+            for file in files.values():
+                file.close()
+        return counts
+
+    def load(self, model, spool_path, batch_size):
+        started, rows = time.perf_counter(), 0
+        with open(spool_path, encoding='utf-8') as file:
+            records = (json.loads(line) for line in file)
+            while batch := list(islice(records, batch_size)):
+                rows += self.insert_batch(model, batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{model._meta.label}: {rows} строк, {elapsed:.1f} с, '
+                          f'{rows / elapsed if elapsed else 0:.0f} строк/с')
+
+    def insert_batch(self, model, batch):
+        fields = model._meta.concrete_fields
+        rows, m2m_rows = [], {}
+        try:
+            for record, deserialized in zip(batch, Deserializer(batch, using=self.using, ignorenonexistent=True)):
+                instance = deserialized.object
+                if instance.pk is None:
+                    raise CommandError(f'{model._meta.label}: записи без pk не поддерживаются')
+                present = set(record.get('fields', {})) | {model._meta.pk.name}
+                # Значения из дампа сохраняются как есть, недостающие заполняются как при создании записи
+                rows.append([
+                    field.get_db_prep_save(
+                        getattr(instance, field.attname) if field.name in present else field.pre_save(instance, True),
+                        self.connection,
+                    )
+                    for field in fields
+                ])
+                for name, values in (deserialized.m2m_data or {}).items():
+                    m2m_rows.setdefault(name, []).extend((instance.pk, value) for value in values)
+                self.remember_course(model, instance)
+        except DeserializationError as exc:
+            raise CommandError(f'{model._meta.label}: {exc}')
+
+        insert_rows(self.connection, model._meta.db_table, [field.column for field in fields], rows)
+        for name, pairs in m2m_rows.items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through._meta
+            insert_rows(self.connection, through.db_table, [field.m2m_column_name(), field.m2m_reverse_name()], pairs)
+        return len(rows)
+
+    def remember_course(self, model, instance):
+        if model._meta.label_lower == 'courses.course':
+            self.course_ids.add(instance.pk)
+        elif hasattr(instance, 'course_id'):
+            self.course_ids.add(instance.course_id)
+
+    def finish(self, loaded):
+        """Сигналы при загрузке не отправлялись, поэтому зависимые данные обновляются явно"""
+        for model in DENORMALIZED_OWNERS:
+            if model in loaded:
+                repair(model)
+        if {Lesson, LessonCompletion, CourseProgress} & set(loaded):
+            create_missing_progress()
+            recalculate_progress()
+
+        through = [field.remote_field.through for model in loaded for field in model._meta.local_many_to_many]
+        statements = self.connection.ops.sequence_reset_sql(no_style(), loaded + through)
+        if statements:
+            with self.connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+        invalidate_responses(*[model for model in loaded if model._meta.app_label == 'courses'])
+        invalidate_course_trees(*self.course_ids)
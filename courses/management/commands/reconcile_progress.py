@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from courses.progress import create_missing_progress, recalculate_progress
+
+
+class Command(BaseCommand):
+    """
+    Сверка счетчиков прогресса по курсам с уроками и отметками о прохождении.
+
+    Счетчики обновляются сигналами и расходятся после изменений в обход них (update, bulk_create, SQL).
+    Недостающие строки прогресса создаются, расходящиеся пересчитываются.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, nargs='+', help='Идентификаторы курсов, по умолчанию все')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = create_missing_progress(options['course'])
+            fixed = recalculate_progress(options['course'])
+        self.stdout.write(f'Создано строк прогресса: {created}, исправлено: {fixed}')
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('correct_answers', models.PositiveIntegerField(verbose_name='Правильных ответов')),
+                ('total_questions', models.PositiveIntegerField(verbose_name='Всего вопросов')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата и время прохождения')),
+                ('lesson_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='courses.lessontest', verbose_name='Тест')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='test_attempts', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Попытка прохождения теста',
+                'verbose_name_plural': 'Попытки прохождения тестов',
+            },
+        ),
+        migrations.CreateModel(
+            name='AttemptAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.TextField(blank=True, null=True, verbose_name='Ответ пользователя')),
+                ('is_correct', models.BooleanField(verbose_name='Правильность ответа')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_answers', to='courses.question', verbose_name='Вопрос')),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='courses.testattempt', verbose_name='Попытка')),
+            ],
+            options={
+                'verbose_name': 'Ответ в попытке',
+                'verbose_name_plural': 'Ответы в попытках',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='testattempt',
+            index=models.Index(fields=['user', 'created_at'], name='courses_tes_user_id_7e05e4_idx'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# Поисковый вектор поддерживается триггером, поэтому он актуален и для bulk_create/update()
+SEARCH_VECTOR_SOURCES = {
+    'courses_course': ('title', 'description'),
+    'courses_lesson': ('title', 'content'),
+    'courses_question': ('text',),
+}
+WEIGHTS = 'ABCD'
+
+
+def vector_expression(columns, prefix=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('russian', coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in zip(columns, WEIGHTS)
+    )
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in SEARCH_VECTOR_SOURCES.items():
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector_expression(columns, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        schema_editor.execute(f"UPDATE {table} SET search_vector = {vector_expression(columns)}")
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_VECTOR_SOURCES:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_test_attempts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='courses_cou_search__e2a3ab_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='courses_les_search__7b3ff1_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='courses_que_search__7e4ba8_gin'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
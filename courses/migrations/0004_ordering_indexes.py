@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:10
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы больших таблиц строятся без блокировки записи. Текст вопросов и ответов индексируется
+    # по префиксу: строка btree-индекса ограничена ~2.7 КБ
+    atomic = False
+
+    dependencies = [
+        ('courses', '0003_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='answer',
+            index=models.Index(django.db.models.functions.text.Left('text', 255), models.F('id'),
+                               name='courses_ans_text_prefix_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='answer',
+            index=models.Index(fields=['question', 'is_correct'], name='courses_ans_questio_15ab48_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='course',
+            index=models.Index(fields=['title', 'id'], name='courses_cou_title_974ba1_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='course',
+            index=models.Index(fields=['owner', 'title'], name='courses_cou_owner_i_f42462_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lesson',
+            index=models.Index(fields=['title', 'id'], name='courses_les_title_9d7140_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lessontest',
+            index=models.Index(fields=['title', 'id'], name='courses_les_title_68925b_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='module',
+            index=models.Index(fields=['title', 'id'], name='courses_mod_title_4a5b83_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='question',
+            index=models.Index(django.db.models.functions.text.Left('text', 255), models.F('id'),
+                               name='courses_que_text_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+        migrations.AddField(
+            model_name='lessontest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения'),
+        ),
+    ]
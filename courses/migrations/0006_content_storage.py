@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:21
+
+import courses.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='preview',
+            field=models.ImageField(blank=True, default='courses/course/course_example.jpg', null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='courses/course/', verbose_name='Превью'),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='preview',
+            field=models.ImageField(blank=True, default='courses/lesson/lesson_example.jpg', null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='courses/lesson/', verbose_name='Превью'),
+        ),
+        migrations.AlterField(
+            model_name='module',
+            name='preview',
+            field=models.ImageField(blank=True, default='courses/module/module_example.jpg', null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='courses/module/', verbose_name='Превью'),
+        ),
+    ]
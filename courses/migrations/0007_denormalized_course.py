@@ -0,0 +1,96 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Модели с денормализованным курсом и поле их родителя, сверху вниз
+PARENTS = (
+    ('lesson', 'module', 'module'),
+    ('lessontest', 'lesson', 'lesson'),
+    ('question', 'lesson_test', 'lessontest'),
+    ('answer', 'question', 'question'),
+)
+
+
+def fill_course_keys(apps, schema_editor):
+    """Заполнение курса и владельца курса существующих записей по одному UPDATE на поле"""
+    course_model = apps.get_model('courses', 'course')
+    for model_name, parent_field, parent_name in PARENTS:
+        model = apps.get_model('courses', model_name)
+        parent = apps.get_model('courses', parent_name)
+        model.objects.update(
+            course_id=Subquery(parent.objects.filter(pk=OuterRef(f'{parent_field}_id')).values('course_id')[:1]),
+        )
+        model.objects.update(
+            owner_id=Subquery(course_model.objects.filter(pk=OuterRef('course_id')).values('owner_id')[:1]),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_content_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='course',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Курс'),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Владелец курса'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='course',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Курс'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Владелец курса'),
+        ),
+        migrations.AddField(
+            model_name='lessontest',
+            name='course',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Курс'),
+        ),
+        migrations.AddField(
+            model_name='lessontest',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Владелец курса'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='course',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Курс'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Владелец курса'),
+        ),
+        migrations.RunPython(fill_course_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['owner', 'id'], name='courses_ans_owner_i_97d6d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['owner', 'id'], name='courses_les_owner_i_98b0d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessontest',
+            index=models.Index(fields=['owner', 'id'], name='courses_les_owner_i_99e6d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['owner', 'id'], name='courses_que_owner_i_2a7e0d_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_denormalized_course'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_lessons', models.PositiveIntegerField(default=0, verbose_name='Пройдено уроков')),
+                ('total_lessons', models.PositiveIntegerField(default=0, verbose_name='Всего уроков')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.course', verbose_name='Курс')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_progress', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Прогресс по курсу',
+                'verbose_name_plural': 'Прогресс по курсам',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата и время прохождения')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='courses.lesson', verbose_name='Урок')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_completions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Пройденный урок',
+                'verbose_name_plural': 'Пройденные уроки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='courseprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'course'), name='unique_course_progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='lessoncompletion',
+            constraint=models.UniqueConstraint(fields=('user', 'lesson'), name='unique_lesson_completion'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:39
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы для проверки ссылок на файл перед удалением превью, строятся без блокировки записи в таблицы
+    atomic = False
+
+    dependencies = [
+        ('courses', '0009_enrollment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='course',
+            index=models.Index(fields=['preview'], name='courses_cou_preview_386c96_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lesson',
+            index=models.Index(fields=['preview'], name='courses_les_preview_37ea30_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='module',
+            index=models.Index(fields=['preview'], name='courses_mod_preview_bc3bb1_idx'),
+        ),
+    ]
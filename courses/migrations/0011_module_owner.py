@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_owner(apps, schema_editor):
+    """Заполнение владельца курса у существующих модулей одним UPDATE"""
+    course_model = apps.get_model('courses', 'course')
+    apps.get_model('courses', 'module').objects.update(
+        owner_id=Subquery(course_model.objects.filter(pk=OuterRef('course_id')).values('owner_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_preview_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='module',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Владелец курса'),
+        ),
+        migrations.RunPython(fill_owner, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['owner', 'id'], name='courses_mod_owner_i_82acd7_idx'),
+        ),
+    ]
@@ -0,0 +1,207 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from courses.cache import get_generations, record_response_cache_access
+from courses.deletion import delete_tree, start_deletion
+from courses.enrollment import scope_enrolled
+from courses.models import Enrollment
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы (ETag/If-None-Match, Last-Modified/If-Modified-Since) для list и retrieve.
+
+    ETag вычисляется по версиям строк (pk и updated_at) без чтения остальных столбцов
+    и без сериализации, поэтому ответ 304 не запускает сериализатор. Для списка версия
+    включает обертку пагинатора (число записей, ссылки) и строки запрошенной страницы.
+    Last-Modified отдается только для отдельной записи: у страницы списка он не меняется
+    при удалении строк.
+    """
+    version_field = 'updated_at'
+
+    def make_etag(self, version):
+        request = self.request
+        digest = hashlib.sha1(repr((
+            self.queryset.model._meta.label, request.build_absolute_uri(), request.user.is_staff, version,
+        )).encode()).hexdigest()
+        return quote_etag(digest)
+
+    def conditional_response(self, etag, last_modified=None):
+        """Ответ 304, если версия у клиента совпадает с текущей, иначе None"""
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if not_modified is None or not_modified.status_code != status.HTTP_304_NOT_MODIFIED:
+            return None
+        return self.with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+    @staticmethod
+    def with_validators(response, etag, last_modified=None):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            version = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list('pk', self.version_field).first()
+        except (TypeError, ValueError):
+            version = None
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self.make_etag(version)
+        last_modified = version[1]
+        return self.conditional_response(etag, last_modified) or self.with_validators(
+            super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Аннотации сортировки (например, префикс текста) вычисляются запросом, в only() передаются только поля
+        ordering = [field.lstrip('-') for field in queryset.query.order_by
+                    if field.lstrip('-') not in queryset.query.annotations]
+        versions_queryset = queryset.only('pk', self.version_field, *ordering)
+
+        page = self.paginate_queryset(versions_queryset)
+        rows = versions_queryset if page is None else page
+        versions = [(obj.pk, getattr(obj, self.version_field)) for obj in rows]
+        if page is not None:
+            # Обертка пагинатора (count, next, previous) с версиями строк вместо данных
+            versions = self.get_paginated_response(versions).data
+
+        etag = self.make_etag(versions)
+        return self.conditional_response(etag) or self.with_validators(
+            super().list(request, *args, **kwargs), etag)
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов list и retrieve.
+
+    Ключ включает адрес с отсортированными параметрами запроса, роль пользователя
+    и поколения моделей из cache_models (по умолчанию модель queryset). Поколение
+    меняется сигналами при каждом изменении записей, поэтому устаревший ответ не читается,
+    а удалять ключи по шаблону не нужно: старые записи вытесняются по таймауту.
+    Вместе с данными сохраняются ETag и Last-Modified, и на попадании условный запрос
+    обрабатывается без обращения к базе. Миксин ставится перед ConditionalGetMixin.
+    """
+    cache_models = None
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def get_cache_role(self):
+        """Группа пользователей, которые видят одинаковые данные: студенту видны только его курсы"""
+        user = self.request.user
+        return getattr(user, 'role', None) or 'anonymous', user.is_staff, None if user.is_staff else user.pk
+
+    def get_response_cache_key(self):
+        request = self.request
+        query = sorted(request.query_params.lists())
+        digest = hashlib.sha1(repr((
+            self.action, request.build_absolute_uri(request.path), query, self.get_cache_role(),
+            get_generations(*self.get_cache_models()),
+        )).encode()).hexdigest()
+        return f'response_cache:{self.queryset.model._meta.label_lower}:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key()
+        cached = cache.get(key)
+        record_response_cache_access(cached is not None)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {name: response[name] for name in self.cached_headers if response.has_header(name)}
+                cache.set(key, (response.data, headers), settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        data, headers = cached
+        not_modified = get_conditional_response(
+            request, etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None,
+        )
+        if not_modified is not None and not_modified.status_code == status.HTTP_304_NOT_MODIFIED:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class EnrolledReadMixin:
+    """
+    Чтение list и retrieve любым пользователем в пределах курсов, на которые он записан.
+
+    Изменение записей остается за permission_classes представления. Курс записи берется
+    из поля course_field, отбор выполняется подзапросом EXISTS. Миксин ставится перед
+    CachedResponseMixin, чтобы записи на курсы входили в поколения кэша ответов.
+    """
+    course_field = 'course'
+    read_actions = ('list', 'retrieve')
+
+    def get_permissions(self):
+        if self.action in self.read_actions:
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def get_queryset(self):
+        return scope_enrolled(super().get_queryset(), self.request.user, self.course_field)
+
+    def get_cache_models(self):
+        return (*super().get_cache_models(), Enrollment)
+
+
+class AtomicSaveMixin:
+    """
+    Создание и изменение записи в одной транзакции с сохранением загруженных файлов.
+
+    Блокировка имени файла в хранилище превью держится до вставки строки со ссылкой на него,
+    поэтому параллельное удаление того же файла дождется ссылки (см. ContentAddressedStorage).
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+
+class TreeDestroyMixin:
+    """
+    Удаление записи со всем поддеревом запросами по уровням дерева вместо сборщика каскадов Django.
+
+    С параметром ?async=true удаление выполняется в фоне, а ответ 202 содержит ссылку на ход удаления.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        model = type(instance)
+        if request.query_params.get('async') == 'true':
+            task_id = start_deletion(model, [instance.pk])
+            return Response({'task_id': task_id,
+                             'status_url': reverse('courses:deletion_status', args=[task_id], request=request)},
+                            status=status.HTTP_202_ACCEPTED)
+        with transaction.atomic():
+            delete_tree(model, [instance.pk])
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,18 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Left
+from django.utils import timezone
 from config import settings
+from courses.storage import content_storage
 
 NULLABLE = {"blank": True, "null": True}
+# Длина префикса текста вопросов и ответов в индексах сортировки: строка btree-индекса ограничена ~2.7 КБ
+TEXT_PREFIX_LENGTH = 255
+
+
+def text_prefix():
+    return Left('text', TEXT_PREFIX_LENGTH)
 
 
 class Course(models.Model):
@@ -9,10 +20,12 @@ class Course(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название курса')
     description = models.TextField(verbose_name='Описание')
     preview = models.ImageField(upload_to="courses/course/", default='courses/course/course_example.jpg', **NULLABLE,
-                                verbose_name="Превью")
+                                storage=content_storage, verbose_name="Превью")
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='courses', on_delete=models.SET_NULL, **NULLABLE,
                               verbose_name='Создатель')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата и время создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
+    search_vector = SearchVectorField(**NULLABLE, editable=False, verbose_name='Поисковый вектор')
 
     def __str__(self):
         return self.title
@@ -20,15 +33,25 @@ class Course(models.Model):
     class Meta:
         verbose_name = 'Курс'
         verbose_name_plural = 'Курсы'
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            models.Index(fields=['title', 'id']),
+            models.Index(fields=['owner', 'title']),
+            models.Index(fields=['preview']),
+        ]
 
 
 class Module(models.Model):
     """Модель модуля курса"""
     title = models.CharField(max_length=200, verbose_name='Название модуля')
     course = models.ForeignKey(Course, related_name='modules', on_delete=models.CASCADE, verbose_name='Курс')
+    # Владелец курса, денормализованный для фильтрации без соединений (см. courses.denormalization)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.SET_NULL, **NULLABLE,
+                              editable=False, db_index=False, verbose_name='Владелец курса')
     preview = models.ImageField(upload_to="courses/module/", default='courses/module/module_example.jpg', **NULLABLE,
-                                verbose_name="Превью")
+                                storage=content_storage, verbose_name="Превью")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата и время создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
 
     def __str__(self):
         return self.title
@@ -36,6 +59,11 @@ class Module(models.Model):
     class Meta:
         verbose_name = 'Модуль'
         verbose_name_plural = 'Модули'
+        indexes = [
+            models.Index(fields=['title', 'id']),
+            models.Index(fields=['preview']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
 
 class Lesson(models.Model):
@@ -43,10 +71,17 @@ class Lesson(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название урока')
     content = models.TextField(verbose_name="Контент")
     preview = models.ImageField(upload_to="courses/lesson/", default='courses/lesson/lesson_example.jpg', **NULLABLE,
-                                verbose_name="Превью")
+                                storage=content_storage, verbose_name="Превью")
     url = models.CharField(max_length=200, **NULLABLE, verbose_name="Ссылка на видео")
     module = models.ForeignKey(Module, related_name='lessons', on_delete=models.CASCADE, verbose_name='Модуль')
+    # Курс и его владелец, денормализованные для фильтрации без соединений (см. courses.denormalization)
+    course = models.ForeignKey(Course, related_name='+', on_delete=models.CASCADE, **NULLABLE, editable=False,
+                               verbose_name='Курс')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.SET_NULL, **NULLABLE,
+                              editable=False, db_index=False, verbose_name='Владелец курса')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата и время создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
+    search_vector = SearchVectorField(**NULLABLE, editable=False, verbose_name='Поисковый вектор')
 
     def __str__(self):
         return self.title
@@ -54,12 +89,24 @@ class Lesson(models.Model):
     class Meta:
         verbose_name = 'Урок'
         verbose_name_plural = 'Уроки'
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            models.Index(fields=['title', 'id']),
+            models.Index(fields=['owner', 'id']),
+            models.Index(fields=['preview']),
+        ]
 
 
 class LessonTest(models.Model):
     """Модель теста для урока"""
     title = models.CharField(max_length=200, verbose_name='Название теста')
     lesson = models.ForeignKey(Lesson, related_name='lessons_test', on_delete=models.CASCADE, verbose_name='Материал')
+    # Курс и его владелец, денормализованные для фильтрации без соединений (см. courses.denormalization)
+    course = models.ForeignKey(Course, related_name='+', on_delete=models.CASCADE, **NULLABLE, editable=False,
+                               verbose_name='Курс')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.SET_NULL, **NULLABLE,
+                              editable=False, db_index=False, verbose_name='Владелец курса')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
 
     def __str__(self):
         return self.title
@@ -67,12 +114,23 @@ class LessonTest(models.Model):
     class Meta:
         verbose_name = 'Тест'
         verbose_name_plural = 'Тесты'
+        indexes = [
+            models.Index(fields=['title', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
 
 class Question(models.Model):
     """Модель вопроса для теста"""
     text = models.TextField(verbose_name='Текст вопроса')
     lesson_test = models.ForeignKey(LessonTest, related_name='questions', on_delete=models.CASCADE, verbose_name='Тест')
+    # Курс и его владелец, денормализованные для фильтрации без соединений (см. courses.denormalization)
+    course = models.ForeignKey(Course, related_name='+', on_delete=models.CASCADE, **NULLABLE, editable=False,
+                               verbose_name='Курс')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.SET_NULL, **NULLABLE,
+                              editable=False, db_index=False, verbose_name='Владелец курса')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
+    search_vector = SearchVectorField(**NULLABLE, editable=False, verbose_name='Поисковый вектор')
 
     def __str__(self):
         return self.text
@@ -80,13 +138,24 @@ class Question(models.Model):
     class Meta:
         verbose_name = 'Вопрос'
         verbose_name_plural = 'Вопросы'
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            models.Index(text_prefix(), 'id', name='courses_que_text_prefix_idx'),
+            models.Index(fields=['owner', 'id']),
+        ]
 
 
 class Answer(models.Model):
     """Модель ответа на вопрос"""
     question = models.ForeignKey(Question, related_name='answers', on_delete=models.CASCADE, verbose_name='Вопрос')
+    # Курс и его владелец, денормализованные для фильтрации без соединений (см. courses.denormalization)
+    course = models.ForeignKey(Course, related_name='+', on_delete=models.CASCADE, **NULLABLE, editable=False,
+                               verbose_name='Курс')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.SET_NULL, **NULLABLE,
+                              editable=False, db_index=False, verbose_name='Владелец курса')
     text = models.TextField(verbose_name="Текст ответа")
     is_correct = models.BooleanField(default=False, verbose_name='Правильность ответа')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
 
     def __str__(self):
         return self.text
@@ -94,3 +163,107 @@ class Answer(models.Model):
     class Meta:
         verbose_name = 'Ответ'
         verbose_name_plural = 'Ответы'
+        indexes = [
+            models.Index(text_prefix(), 'id', name='courses_ans_text_prefix_idx'),
+            models.Index(fields=['question', 'is_correct']),
+            models.Index(fields=['owner', 'id']),
+        ]
+
+
+class TestAttempt(models.Model):
+    """Модель попытки прохождения теста"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='test_attempts', on_delete=models.SET_NULL,
+                             **NULLABLE, verbose_name='Пользователь')
+    lesson_test = models.ForeignKey(LessonTest, related_name='attempts', on_delete=models.CASCADE,
+                                    verbose_name='Тест')
+    correct_answers = models.PositiveIntegerField(verbose_name='Правильных ответов')
+    total_questions = models.PositiveIntegerField(verbose_name='Всего вопросов')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Дата и время прохождения')
+
+    def __str__(self):
+        return f'{self.lesson_test_id}: {self.correct_answers}/{self.total_questions}'
+
+    class Meta:
+        verbose_name = 'Попытка прохождения теста'
+        verbose_name_plural = 'Попытки прохождения тестов'
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+
+class AttemptAnswer(models.Model):
+    """Модель ответа пользователя в попытке прохождения теста"""
+    attempt = models.ForeignKey(TestAttempt, related_name='answers', on_delete=models.CASCADE,
+                                verbose_name='Попытка')
+    question = models.ForeignKey(Question, related_name='attempt_answers', on_delete=models.CASCADE,
+                                 verbose_name='Вопрос')
+    answer = models.TextField(**NULLABLE, verbose_name='Ответ пользователя')
+    is_correct = models.BooleanField(verbose_name='Правильность ответа')
+
+    def __str__(self):
+        return f'{self.question_id}: {self.answer}'
+
+    class Meta:
+        verbose_name = 'Ответ в попытке'
+        verbose_name_plural = 'Ответы в попытках'
+
+
+class LessonCompletion(models.Model):
+    """Модель отметки о прохождении урока пользователем"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='lesson_completions', on_delete=models.CASCADE,
+                             verbose_name='Пользователь')
+    lesson = models.ForeignKey(Lesson, related_name='completions', on_delete=models.CASCADE, verbose_name='Урок')
+    completed_at = models.DateTimeField(default=timezone.now, verbose_name='Дата и время прохождения')
+
+    def __str__(self):
+        return f'{self.user_id}: {self.lesson_id}'
+
+    class Meta:
+        verbose_name = 'Пройденный урок'
+        verbose_name_plural = 'Пройденные уроки'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'lesson'], name='unique_lesson_completion'),
+        ]
+
+
+class CourseProgress(models.Model):
+    """Модель прогресса пользователя по курсу: счетчики обновляются при прохождении, добавлении и удалении уроков"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='course_progress', on_delete=models.CASCADE,
+                             verbose_name='Пользователь')
+    course = models.ForeignKey(Course, related_name='progress', on_delete=models.CASCADE, verbose_name='Курс')
+    completed_lessons = models.PositiveIntegerField(default=0, verbose_name='Пройдено уроков')
+    total_lessons = models.PositiveIntegerField(default=0, verbose_name='Всего уроков')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата и время изменения')
+
+    def __str__(self):
+        return f'{self.user_id}: {self.course_id} {self.completed_lessons}/{self.total_lessons}'
+
+    @property
+    def percent(self):
+        return round(100 * self.completed_lessons / self.total_lessons) if self.total_lessons else 0
+
+    class Meta:
+        verbose_name = 'Прогресс по курсу'
+        verbose_name_plural = 'Прогресс по курсам'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course'], name='unique_course_progress'),
+        ]
+
+
+class Enrollment(models.Model):
+    """Модель записи пользователя на курс"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='enrollments', on_delete=models.CASCADE,
+                             verbose_name='Пользователь')
+    course = models.ForeignKey(Course, related_name='enrollments', on_delete=models.CASCADE, verbose_name='Курс')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата и время записи')
+
+    def __str__(self):
+        return f'{self.user_id}: {self.course_id}'
+
+    class Meta:
+        verbose_name = 'Запись на курс'
+        verbose_name_plural = 'Записи на курсы'
+        # Уникальный индекс (user, course) обслуживает и подзапросы EXISTS при отборе курсов пользователя
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course'], name='unique_enrollment'),
+        ]
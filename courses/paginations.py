@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
@@ -6,3 +14,161 @@ class CustomPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 10
+
+
+class KeysetPagination(BasePagination):
+    """
+    Класс пагинатор по ключу (keyset).
+
+    Страница выбирается условием "после последней записи предыдущей страницы" по полям
+    сортировки queryset с первичным ключом в качестве уникального дополнительного поля,
+    поэтому глубина страницы не влияет на время запроса, а COUNT(*) не выполняется.
+    Позиция передается в непрозрачном курсоре.
+    """
+    page_size = CustomPagination.page_size
+    page_size_query_param = CustomPagination.page_size_query_param
+    max_page_size = CustomPagination.max_page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        position, self.reverse = self.decode_cursor(request)
+        ordering = [self.invert(field) for field in self.ordering] if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or self.reverse:
+                self.next_position = self.get_position(results[-1])
+            if position is not None and (has_more or not self.reverse):
+                self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    @staticmethod
+    def get_ordering(queryset):
+        """Поля сортировки queryset, дополненные первичным ключом для уникальности позиции"""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        pk_names = {'pk', queryset.model._meta.pk.name}
+        if not any(field.lstrip('-') in pk_names for field in ordering):
+            ordering.append('pk')
+        return ordering
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def get_position_filter(ordering, position):
+        """
+        Условие "строго после позиции" для сортировки (f1, f2, ..., pk).
+
+        Дополнительное условие f1 >= значение позволяет базе начать просмотр индекса
+        сразу с нужной позиции.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first = ordering[0]
+        range_lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{range_lookup}': position[0]}) & condition
+
+    def get_position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse=False):
+        data = json.dumps({'p': position, 'r': reverse}, cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = data['p'], bool(data['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def get_next_link(self):
+        return self.get_link(self.next_position, False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_position, True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class SelectablePagination(BasePagination):
+    """
+    Класс пагинатор с выбором режима в запросе.
+
+    Режим по умолчанию задается атрибутом представления pagination_mode ('page' или 'keyset'),
+    в запросе его можно переопределить параметром ?pagination=. Запрос с курсором
+    всегда обрабатывается KeysetPagination.
+    """
+    mode_query_param = 'pagination'
+    page_number_class = CustomPagination
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.mode_query_param) or getattr(view, 'pagination_mode', 'page')
+        use_keyset = mode == 'keyset' or self.keyset_class.cursor_query_param in request.query_params
+        self.paginator = self.keyset_class() if use_keyset else self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_number_class().get_schema_operation_parameters(view)
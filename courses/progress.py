@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from courses.models import Lesson, LessonCompletion, CourseProgress
+
+
+def lessons_total(course_id):
+    return Lesson.objects.filter(course_id=course_id).count()
+
+
+def lessons_completed(user_id, course_id):
+    return LessonCompletion.objects.filter(user_id=user_id, lesson__course_id=course_id).count()
+
+
+def complete_lesson(user_id, lesson):
+    """
+    Отметка урока пройденным и увеличение счетчика прогресса по курсу.
+
+    Повторная отметка того же урока ничего не меняет. Строка прогресса создается при первом
+    пройденном уроке курса, дальше счетчик увеличивается атомарно. Возвращает прогресс по курсу.
+    """
+    with transaction.atomic():
+        _, completed = LessonCompletion.objects.get_or_create(user_id=user_id, lesson_id=lesson.pk)
+        progress, created = CourseProgress.objects.get_or_create(
+            user_id=user_id, course_id=lesson.course_id,
+            defaults={'total_lessons': lambda: lessons_total(lesson.course_id),
+                      'completed_lessons': lambda: lessons_completed(user_id, lesson.course_id)},
+        )
+        if completed and not created:
+            CourseProgress.objects.filter(pk=progress.pk).update(completed_lessons=F('completed_lessons') + 1)
+            progress.completed_lessons += 1
+    return progress
+
+
+def get_course_progress(user_id, course_id):
+    """Прогресс пользователя по курсу одной строкой по уникальному индексу (user, course)"""
+    progress = CourseProgress.objects.filter(user_id=user_id, course_id=course_id).first()
+    if progress is None:
+        progress = CourseProgress(user_id=user_id, course_id=course_id, total_lessons=lessons_total(course_id))
+    return progress
+
+
+def lesson_added(course_id):
+    """Увеличение числа уроков в прогрессе всех пользователей курса"""
+    if course_id is not None:
+        CourseProgress.objects.filter(course_id=course_id).update(total_lessons=F('total_lessons') + 1)
+
+
+def actual_counters():
+    """Подзапросы с фактическим числом уроков курса и пройденных пользователем уроков"""
+    total = Lesson.objects.filter(course_id=OuterRef('course_id')).order_by().values('course_id') \
+        .annotate(count=Count('pk')).values('count')
+    completed = LessonCompletion.objects.filter(
+        user_id=OuterRef('user_id'), lesson__course_id=OuterRef('course_id'),
+    ).order_by().values('user_id').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(total), 0), Coalesce(Subquery(completed), 0)
+
+
+def create_missing_progress(course_ids=None):
+    """Создание строк прогресса для пользователей с пройденными уроками курса, но без прогресса по нему"""
+    completions = LessonCompletion.objects.filter(lesson__course__isnull=False)
+    if course_ids is not None:
+        completions = completions.filter(lesson__course_id__in=course_ids)
+    pairs = completions.filter(~Exists(CourseProgress.objects.filter(
+        user_id=OuterRef('user_id'), course_id=OuterRef('lesson__course_id'),
+    ))).values_list('user_id', 'lesson__course_id').distinct()
+    created = CourseProgress.objects.bulk_create(
+        [CourseProgress(user_id=user_id, course_id=course_id) for user_id, course_id in pairs],
+        ignore_conflicts=True,
+    )
+    return len(created)
+
+
+def recalculate_progress(course_ids=None):
+    """
+    Пересчет счетчиков прогресса по урокам и отметкам о прохождении одним UPDATE.
+
+    Обновляются только строки, расходящиеся с фактическими значениями, возвращается их число.
+    """
+    course_ids = [course_id for course_id in course_ids if course_id is not None] if course_ids is not None else None
+    if course_ids == []:
+        return 0
+    rows = CourseProgress.objects.all()
+    if course_ids is not None:
+        rows = rows.filter(course_id__in=course_ids)
+    total, completed = actual_counters()
+    drifted = rows.annotate(actual_total=total, actual_completed=completed).exclude(
+        total_lessons=F('actual_total'), completed_lessons=F('actual_completed'),
+    )
+    total, completed = actual_counters()
+    return CourseProgress.objects.filter(pk__in=drifted.values('pk')).update(
+        total_lessons=total, completed_lessons=completed,
+    )
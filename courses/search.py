@@ -0,0 +1,33 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Value, CharField
+from courses.enrollment import scope_enrolled
+from courses.models import Course, Lesson, Question
+
+# Конфигурация полнотекстового поиска PostgreSQL, ею же строятся векторы в триггерах (миграция 0003)
+SEARCH_CONFIG = 'russian'
+
+
+def search_content(text, user):
+    """
+    Поиск по курсам, урокам и вопросам, отсортированный по релевантности.
+
+    Каждая часть выборки использует GIN-индекс по search_vector, результаты объединяются
+    одним запросом UNION ALL. Курс урока и вопроса берется из денормализованного поля без соединений.
+    Студенту доступны только курсы, на которые он записан.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    sources = (
+        (scope_enrolled(Course.objects.all(), user, 'pk'), 'course', F('title'), F('pk')),
+        (scope_enrolled(Lesson.objects.all(), user), 'lesson', F('title'), F('course_id')),
+        (scope_enrolled(Question.objects.all(), user), 'question', F('text'), F('course_id')),
+    )
+    querysets = [
+        queryset.filter(search_vector=query).annotate(
+            type=Value(kind, output_field=CharField()),
+            label=label,
+            course_key=course_id,
+            rank=SearchRank(F('search_vector'), query),
+        ).values('pk', 'type', 'label', 'course_key', 'rank')
+        for queryset, kind, label, course_id in sources
+    ]
+    return querysets[0].union(*querysets[1:], all=True).order_by('-rank', 'type', 'pk')
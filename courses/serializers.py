@@ -1,36 +1,50 @@
 from rest_framework import serializers
-from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer, CourseProgress
+from courses.thumbnails import variant_urls
+
+
+class PreviewVariantsField(serializers.ReadOnlyField):
+    """Ссылки на уменьшенные копии превью по формату и ширине"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'preview')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value.name if value else None, self.context.get('request'))
 
 
 class CourseSerializer(serializers.ModelSerializer):
     """Сериализатор курса"""
+    preview_variants = PreviewVariantsField()
 
     class Meta:
         model = Course
-        fields = '__all__'
+        exclude = ['search_vector']
         read_only_fields = ['owner', 'created_at']
 
     def create(self, validated_data):
         """Автоматически устанавливаем текущего пользователя как владельца курса"""
-        user = self.context['request'].user
-        validated_data['owner'] = user
+        validated_data['owner_id'] = self.context['request'].user.pk
         return super().create(validated_data)
 
 
 class ModuleSerializer(serializers.ModelSerializer):
     """Сериализатор модуля"""
+    preview_variants = PreviewVariantsField()
 
     class Meta:
         model = Module
-        fields = '__all__'
+        exclude = ['owner']
 
 
 class LessonSerializer(serializers.ModelSerializer):
     """Сериализатор урока"""
+    preview_variants = PreviewVariantsField()
 
     class Meta:
         model = Lesson
-        fields = '__all__'
+        exclude = ['search_vector', 'course', 'owner']
 
 
 class LessonTestSerializer(serializers.ModelSerializer):
@@ -38,7 +52,7 @@ class LessonTestSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = LessonTest
-        fields = '__all__'
+        exclude = ['course', 'owner']
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -46,7 +60,7 @@ class QuestionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Question
-        fields = '__all__'
+        exclude = ['search_vector', 'course', 'owner']
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -54,4 +68,84 @@ class AnswerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Answer
-        fields = '__all__'
+        exclude = ['course', 'owner']
+
+
+class CourseProgressSerializer(serializers.ModelSerializer):
+    """Сериализатор прогресса пользователя по курсу"""
+    percent = serializers.ReadOnlyField()
+
+    class Meta:
+        model = CourseProgress
+        fields = ['course', 'completed_lessons', 'total_lessons', 'percent', 'updated_at']
+
+
+class AnswerTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор ответа в дереве курса, правильность ответа видна только персоналу"""
+
+    class Meta:
+        model = Answer
+        fields = ['id', 'text', 'is_correct']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not self.context.get('show_correct'):
+            data.pop('is_correct')
+        return data
+
+
+class QuestionTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор вопроса в дереве курса"""
+    answers = AnswerTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'answers']
+
+
+class LessonTestTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор теста в дереве курса"""
+    questions = QuestionTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = LessonTest
+        fields = ['id', 'title', 'questions']
+
+
+class LessonTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор урока в дереве курса"""
+    preview_variants = PreviewVariantsField()
+    tests = LessonTestTreeSerializer(source='lessons_test', many=True, read_only=True)
+
+    class Meta:
+        model = Lesson
+        fields = ['id', 'title', 'content', 'preview', 'preview_variants', 'url', 'created_at', 'tests']
+
+
+class ModuleTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор модуля в дереве курса"""
+    preview_variants = PreviewVariantsField()
+    lessons = LessonTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Module
+        fields = ['id', 'title', 'preview', 'preview_variants', 'created_at', 'lessons']
+
+
+class CourseTreeSerializer(serializers.ModelSerializer):
+    """Сериализатор курса со всеми модулями, уроками, тестами, вопросами и ответами"""
+    preview_variants = PreviewVariantsField()
+    modules = ModuleTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'description', 'preview', 'preview_variants', 'owner', 'created_at', 'modules']
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Сериализатор результата поиска"""
+    type = serializers.CharField()
+    id = serializers.IntegerField(source='pk')
+    title = serializers.CharField(source='label')
+    course_id = serializers.IntegerField(source='course_key')
+    rank = serializers.FloatField()
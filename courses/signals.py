@@ -0,0 +1,155 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.utils import timezone
+from courses.cache import bump_generations
+from courses.denormalization import DENORMALIZED_OWNERS, DESCENDANT_PATHS, fill_course_keys, update_descendants
+from courses.grading import answer_key_cache
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer, Enrollment
+from courses.progress import lesson_added, recalculate_progress
+from courses.storage import content_storage
+from courses.thumbnails import schedule_variants, delete_variants, variants_created
+from courses.tree import invalidate_course_trees
+
+# Пути от записи к тесту и курсу, чьи кэши зависят от ее содержимого, и превью записи
+PARENT_LOOKUPS = {
+    Course: {'course': 'pk', 'owner': 'owner_id', 'preview': 'preview'},
+    Module: {'course': 'course_id', 'preview': 'preview'},
+    Lesson: {'course': 'course_id', 'preview': 'preview'},
+    LessonTest: {'lesson_test': 'pk', 'course': 'course_id'},
+    Question: {'lesson_test': 'lesson_test_id', 'course': 'course_id'},
+    Answer: {'lesson_test': 'question__lesson_test_id', 'course': 'course_id'},
+}
+
+
+def get_parents(model, pk):
+    """Тест и курс, к которым относится запись, одним запросом"""
+    lookups = PARENT_LOOKUPS[model]
+    row = model.objects.filter(pk=pk).values_list(*lookups.values()).first() if pk else None
+    return dict(zip(lookups, row)) if row else {}
+
+
+def invalidate_answer_keys(*test_ids):
+    """
+    Сброс кэша ключей ответов тестов.
+
+    Сбрасываем сразу и повторно после фиксации транзакции, чтобы параллельный запрос
+    не успел положить в кэш ключ, прочитанный до фиксации изменений.
+    """
+    test_ids = {test_id for test_id in test_ids if test_id is not None}
+    for test_id in test_ids:
+        answer_key_cache.invalidate(test_id)
+
+    def invalidate():
+        for test_id in test_ids:
+            answer_key_cache.invalidate(test_id)
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_parents(*parents):
+    invalidate_answer_keys(*(item.get('lesson_test') for item in parents))
+    invalidate_course_trees(*(item.get('course') for item in parents))
+
+
+def invalidate_responses(*models):
+    """Смена поколений моделей для кэша ответов сразу и после фиксации транзакции"""
+    bump_generations(*models)
+    transaction.on_commit(lambda: bump_generations(*models))
+
+
+def release_preview(name):
+    """Удаление превью и его уменьшенных копий после фиксации транзакции, если на файл больше нет ссылок"""
+    if not name:
+        return
+
+    def release():
+        if content_storage.delete(name):
+            delete_variants(name)
+
+    transaction.on_commit(release)
+
+
+def remember_parents(sender, instance, **kwargs):
+    """Запоминаем прежние тест и курс записи, чтобы при переносе или удалении сбросить их кэши"""
+    instance._previous_parents = get_parents(sender, instance.pk)
+
+
+def course_keys_saving(sender, instance, raw=False, **kwargs):
+    """Курс и владелец курса берутся у родителя при создании и при переносе записи"""
+    if not raw:
+        fill_course_keys(instance)
+
+
+def content_saved(sender, instance, created=False, raw=False, **kwargs):
+    invalidate_responses(sender)
+    previous = getattr(instance, '_previous_parents', {})
+    # При переносе в другой курс или смене владельца курса денормализованные поля потомков обновляются
+    if previous and sender in DESCENDANT_PATHS:
+        key, value = ('owner', instance.owner_id) if sender is Course else ('course', instance.course_id)
+        if previous[key] != value:
+            update_descendants(instance)
+    # Новый урок увеличивает счетчики прогресса курса, перенос урока или модуля пересчитывает оба курса
+    if sender is Lesson and created and not raw:
+        lesson_added(instance.course_id)
+    elif sender in (Module, Lesson) and previous and previous['course'] != instance.course_id:
+        recalculate_progress([previous['course'], instance.course_id])
+    invalidate_parents(get_parents(sender, instance.pk), previous)
+    if previous.get('preview') and previous['preview'] != getattr(instance, 'preview', None):
+        release_preview(previous['preview'])
+
+
+def content_deleted(sender, instance, **kwargs):
+    invalidate_responses(sender)
+    previous = getattr(instance, '_previous_parents', {})
+    invalidate_parents(previous)
+    release_preview(previous.get('preview'))
+    if sender is Lesson:
+        recalculate_progress([previous.get('course')])
+
+
+def preview_variants_created(sender, name, **kwargs):
+    """
+    Сброс кэшей записей с превью name после создания его уменьшенных копий.
+
+    Пока копий не было, в ответы, деревья курсов и тела под ETag попадали ссылки на оригинал.
+    Смена updated_at меняет ETag и Last-Modified, смена поколений и версий деревьев сбрасывает кэши.
+    """
+    changed, course_ids = [], set()
+    for model in (Course, Module, Lesson):
+        rows = model.objects.filter(preview=name)
+        course_ids.update(rows.values_list(PARENT_LOOKUPS[model]['course'], flat=True))
+        if rows.update(updated_at=timezone.now()):
+            changed.append(model)
+    if changed:
+        invalidate_responses(*changed)
+        invalidate_course_trees(*course_ids)
+
+
+def enrollment_changed(sender, **kwargs):
+    """Запись на курс и отписка меняют видимые студенту курсы"""
+    invalidate_responses(Enrollment)
+
+
+def preview_saved(sender, instance, **kwargs):
+    """Создание уменьшенных копий загруженного превью после фиксации транзакции"""
+    if instance.preview:
+        name = instance.preview.name
+        transaction.on_commit(lambda: schedule_variants(name))
+
+
+for model in PARENT_LOOKUPS:
+    pre_save.connect(remember_parents, sender=model)
+    pre_delete.connect(remember_parents, sender=model)
+    post_save.connect(content_saved, sender=model)
+    post_delete.connect(content_deleted, sender=model)
+
+for model in DENORMALIZED_OWNERS:
+    pre_save.connect(course_keys_saving, sender=model)
+
+for model in (Course, Module, Lesson):
+    post_save.connect(preview_saved, sender=model)
+
+variants_created.connect(preview_variants_created)
+
+post_save.connect(enrollment_changed, sender=Enrollment)
+post_delete.connect(enrollment_changed, sender=Enrollment)
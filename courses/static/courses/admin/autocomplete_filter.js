@@ -0,0 +1,15 @@
+'use strict';
+// Переход к списку, отфильтрованному по записи, выбранной в фильтре с автодополнением
+{
+    const $ = django.jQuery;
+    $(document).on('change', '.autocomplete-filter select', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('p');
+        if (this.value) {
+            params.set(this.name, this.value);
+        } else {
+            params.delete(this.name);
+        }
+        window.location.search = params.toString();
+    });
+}
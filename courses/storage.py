@@ -0,0 +1,92 @@
+import hashlib
+import os
+import posixpath
+import uuid
+from django.apps import apps
+from django.db import connection, transaction
+from django.core.files.storage import FileSystemStorage
+from django.db.models import FileField
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище медиафайлов с адресацией по содержимому.
+
+    Файл сохраняется под именем из SHA-256 содержимого (courses/cas/ab/<хэш>.<расширение>),
+    поэтому одинаковые загрузки занимают место на диске один раз, а имя файла никогда
+    не меняет содержимое и его можно кэшировать бессрочно. Файл удаляется, только когда
+    на него не ссылается ни одна запись и он не является значением по умолчанию поля.
+
+    Проверка ссылок с удалением и сохранение файла выполняются под блокировкой его имени
+    до конца транзакции: загрузка того же содержимого, сохраненная в одной транзакции
+    с записью, которая на него ссылается, не может попасть между проверкой и удалением.
+    """
+    prefix = 'courses/cas'
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        extension = posixpath.splitext(name)[1].lower()
+        hexdigest = digest.hexdigest()
+        return posixpath.join(self.prefix, hexdigest[:2], f'{hexdigest}{extension}')
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save, проверять занятость исходного имени не нужно
+        return name
+
+    def lock(self, name):
+        """Блокировка имени файла до конца текущей транзакции"""
+        # В SQLite пишущие транзакции и так выполняются по одной, рекомендательных блокировок нет
+        if connection.vendor != 'postgresql':
+            return
+        key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], 'big', signed=True)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        self.lock(name)
+        if self.exists(name):
+            return name
+        # Запись во временный файл и атомарное переименование: параллельная загрузка того же
+        # содержимого перезапишет файл идентичными данными вместо создания копии с суффиксом
+        temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+    def is_content_name(self, name):
+        return name.startswith(f'{self.prefix}/')
+
+    def fields(self):
+        """Поля моделей, которые хранят файлы в этом хранилище"""
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, FileField) and field.storage is self:
+                    yield model, field
+
+    def is_referenced(self, name):
+        for model, field in self.fields():
+            if field.has_default() and field.get_default() == name:
+                return True
+            if model._default_manager.filter(**{field.name: name}).exists():
+                return True
+        return False
+
+    def delete(self, name):
+        """Удаление файла, если на него больше нет ссылок; возвращает True, если файл удален"""
+        if not name:
+            return False
+        with transaction.atomic():
+            self.lock(name)
+            if self.is_referenced(name):
+                return False
+            super().delete(name)
+        return True
+
+
+content_storage = ContentAddressedStorage()
@@ -0,0 +1,172 @@
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.dispatch import Signal
+from PIL import Image, ImageOps, UnidentifiedImageError
+from courses.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# Имена уже созданных вариантов, чтобы не проверять файлы в хранилище на каждом запросе
+_existing = LRUCache(maxsize=4096)
+# Оригиналы, для которых не удалось создать варианты: до истечения записи они не ставятся в очередь повторно
+_failed = LRUCache(maxsize=4096, timeout=settings.THUMBNAIL_FAILURE_TIMEOUT)
+_pending = set()
+_lock = threading.Lock()
+_executor = None
+
+# Отправляется после создания вариантов изображения с аргументом name (имя оригинала): ответы и деревья
+# курсов, закэшированные со ссылками на оригинал вместо вариантов, должны быть сброшены
+variants_created = Signal()
+
+
+def variant_name(name, width, fmt):
+    """Имя варианта изображения: <папка>/thumbnails/<имя>-<ширина>.<расширение>"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, THUMBNAIL_DIR, f'{stem}-{width}.{FORMAT_EXTENSIONS[fmt]}')
+
+
+def variant_names(name):
+    return {
+        (fmt, width): variant_name(name, width, fmt)
+        for fmt in settings.THUMBNAIL_FORMATS for width in settings.THUMBNAIL_WIDTHS
+    }
+
+
+def variant_exists(variant, storage=default_storage):
+    if _existing.get(variant):
+        return True
+    if storage.exists(variant):
+        _existing.set(variant, True)
+        return True
+    return False
+
+
+def render_variant(image, width, fmt):
+    """Уменьшенная копия изображения заданной ширины (без увеличения) в указанном формате"""
+    if image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=settings.THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+def generate_variants(name, force=False, storage=default_storage):
+    """
+    Создание вариантов изображения, которых еще нет в хранилище.
+
+    Возвращает имена созданных файлов. Отсутствующий или поврежденный оригинал
+    пропускается с записью в журнал.
+    """
+    missing = {
+        key: variant for key, variant in variant_names(name).items()
+        if force or not variant_exists(variant, storage)
+    }
+    if not missing:
+        return []
+    try:
+        with storage.open(name) as file, Image.open(file) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            created = []
+            for (fmt, width), variant in missing.items():
+                content = render_variant(image, width, fmt)
+                if storage.exists(variant):
+                    storage.delete(variant)
+                created.append(storage.save(variant, ContentFile(content)))
+                _existing.set(variant, True)
+    except (OSError, UnidentifiedImageError):
+        logger.exception('Не удалось создать превью для %s', name)
+        _failed.set(name, True)
+        return []
+    _failed.delete(name)
+    if created:
+        variants_created.send(sender=None, name=name)
+    return created
+
+
+def delete_variants(name, storage=default_storage):
+    """Удаление всех вариантов изображения"""
+    for variant in variant_names(name).values():
+        storage.delete(variant)
+        _existing.delete(variant)
+
+
+def _run(name):
+    try:
+        generate_variants(name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS,
+                                           thread_name_prefix='thumbnails')
+        return _executor
+
+
+def schedule_variants(name):
+    """
+    Создание вариантов в фоновом пуле потоков.
+
+    Повторная постановка того же файла игнорируется, как и файла, для которого создать
+    варианты не удалось меньше THUMBNAIL_FAILURE_TIMEOUT секунд назад.
+    """
+    if not name or _failed.get(name):
+        return
+    if not settings.THUMBNAIL_BACKGROUND:
+        generate_variants(name)
+        return
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    get_executor().submit(_run, name)
+
+
+def variant_urls(name, request=None, storage=default_storage):
+    """
+    Ссылки на варианты изображения по формату и ширине.
+
+    Вместо отсутствующего варианта отдается ссылка на оригинал, а сам вариант
+    ставится в очередь на создание.
+    """
+    if not name:
+        return None
+    urls = {}
+    missing = False
+    for (fmt, width), variant in variant_names(name).items():
+        if not variant_exists(variant, storage):
+            missing = True
+            variant = name
+        url = storage.url(variant)
+        urls.setdefault(fmt, {})[str(width)] = request.build_absolute_uri(url) if request else url
+    if missing:
+        schedule_variants(name)
+    return urls
+
+
+def clear():
+    """Сброс сведений о созданных вариантах и неудачных попытках"""
+    _existing.clear()
+    _failed.clear()
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from courses.cache import get_versions, bump_versions
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses.serializers import CourseTreeSerializer
+
+TREE_VERSION_KEY = 'course_tree:version:{}'
+
+
+def course_tree_queryset():
+    """Курсы с предзагруженным деревом: по одному запросу на каждый уровень"""
+    return Course.objects.prefetch_related(
+        Prefetch('modules', queryset=Module.objects.order_by('pk')),
+        Prefetch('modules__lessons', queryset=Lesson.objects.order_by('pk')),
+        Prefetch('modules__lessons__lessons_test', queryset=LessonTest.objects.order_by('pk')),
+        Prefetch('modules__lessons__lessons_test__questions', queryset=Question.objects.order_by('pk')),
+        Prefetch('modules__lessons__lessons_test__questions__answers', queryset=Answer.objects.order_by('pk')),
+    )
+
+
+def get_course_tree(course_id, request):
+    """
+    Дерево курса из кэша или из базы, None если курса не существует.
+
+    Ключ кэша включает токен версии курса, роль (персонал видит правильные ответы)
+    и адрес сайта, от которого зависят абсолютные ссылки на превью.
+    """
+    show_correct = request.user.is_staff
+    version_key = TREE_VERSION_KEY.format(course_id)
+    version = get_versions(version_key)[version_key]
+    cache_key = 'course_tree:{}:{}:{}:{}'.format(course_id, version, 'staff' if show_correct else 'student',
+                                                 request.build_absolute_uri('/'))
+
+    data = cache.get(cache_key)
+    if data is None:
+        course = course_tree_queryset().filter(pk=course_id).first()
+        if course is None:
+            return None
+        data = CourseTreeSerializer(course, context={'request': request, 'show_correct': show_correct}).data
+        cache.set(cache_key, data, settings.COURSE_TREE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_course_trees(*course_ids):
+    """Сброс кэша деревьев курсов сразу и после фиксации транзакции"""
+    version_keys = [TREE_VERSION_KEY.format(course_id) for course_id in set(course_ids) if course_id is not None]
+    if not version_keys:
+        return
+    bump_versions(*version_keys)
+    transaction.on_commit(lambda: bump_versions(*version_keys))
@@ -1,7 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from courses.apps import CoursesConfig
-from courses.views import CourseViewSet, ModuleViewSet, LessonViewSet, LessonTestViewSet, QuestionViewSet, AnswerViewSet
+from courses.async_views import AsyncCourseListView, AsyncCourseDetailView, AsyncLessonListView, \
+    AsyncLessonDetailView, AsyncCheckAnswersView
+from courses.views import CourseViewSet, ModuleViewSet, LessonViewSet, LessonTestViewSet, QuestionViewSet, \
+    AnswerViewSet, SearchAPIView, ResponseCacheStatsAPIView, DeletionStatusAPIView, CourseProgressListAPIView
 
 app_name = CoursesConfig.name
 
@@ -17,4 +20,16 @@ urlpatterns = [
     path('', include(router.urls)),
     path('lesson_test/<int:pk>/check_answers/', LessonTestViewSet.as_view({'post': 'check_answers'}),
          name='lesson_test-check_answers'),
+    path('lesson_test/check_answers_batch/', LessonTestViewSet.as_view({'post': 'check_answers_batch'}),
+         name='lesson_test-check_answers_batch'),
+    path('search/', SearchAPIView.as_view(), name='search'),
+    path('progress/', CourseProgressListAPIView.as_view(), name='progress'),
+    path('cache_stats/', ResponseCacheStatsAPIView.as_view(), name='cache_stats'),
+    path('deletion/<str:task_id>/', DeletionStatusAPIView.as_view(), name='deletion_status'),
+    path('async/course/', AsyncCourseListView.as_view(), name='async-course-list'),
+    path('async/course/<int:pk>/', AsyncCourseDetailView.as_view(), name='async-course-detail'),
+    path('async/lesson/', AsyncLessonListView.as_view(), name='async-lesson-list'),
+    path('async/lesson/<int:pk>/', AsyncLessonDetailView.as_view(), name='async-lesson-detail'),
+    path('async/lesson_test/<int:pk>/check_answers/', AsyncCheckAnswersView.as_view(),
+         name='async-lesson_test-check_answers'),
 ]
@@ -1,47 +1,162 @@
-from rest_framework import viewsets, status
+from django.conf import settings
+from django.http import Http404
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
-from courses.paginations import CustomPagination
+from rest_framework.views import APIView
+from courses.attempts import record_attempt
+from courses.cache import get_response_cache_stats
+from courses.cloning import clone_course
+from courses.deletion import get_deletion_status, resume_deletion
+from courses.enrollment import accessible_tests, enroll_users, enrolled, is_enrolled, scope_enrolled
+from courses.export import course_sources, export_response, get_export_format, scope_courses
+from courses.grading import answer_key_cache, grade_answers
+from courses.mixins import AtomicSaveMixin, CachedResponseMixin, ConditionalGetMixin, EnrolledReadMixin, \
+    TreeDestroyMixin
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer, CourseProgress, text_prefix
+from courses.paginations import CustomPagination, KeysetPagination, SelectablePagination
+from courses.progress import complete_lesson, get_course_progress
+from courses.search import search_content
+from courses.storage import content_storage
 from courses.serializers import CourseSerializer, ModuleSerializer, LessonSerializer, LessonTestSerializer, \
-    QuestionSerializer, AnswerSerializer
+    QuestionSerializer, AnswerSerializer, SearchResultSerializer, CourseProgressSerializer
+from courses.tree import get_course_tree
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+def parse_pk(pk):
+    """Первичный ключ из адреса: нечисловой ключ означает отсутствующую запись"""
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        raise Http404
+
+
+class CourseViewSet(TreeDestroyMixin, AtomicSaveMixin, EnrolledReadMixin, CachedResponseMixin, ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     """Представление курсов"""
     serializer_class = CourseSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAdminUser]
     queryset = Course.objects.all().order_by('title')
+    course_field = 'pk'
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def tree(self, request, pk=None):
+        """Курс целиком: модули, уроки, тесты, вопросы и ответы"""
+        try:
+            data = get_course_tree(int(pk), request) if is_enrolled(request.user, int(pk)) else None
+        except (TypeError, ValueError):
+            data = None
+        if data is None:
+            raise Http404
+        return Response(data)
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Копия курса со всеми модулями, уроками, тестами, вопросами и ответами для нового потока"""
+        course = scope_courses(Course.objects.filter(pk=parse_pk(pk)), request.user).first()
+        if course is None:
+            raise Http404
+        title = request.data.get('title')
+        max_length = Course._meta.get_field('title').max_length
+        if title is not None and (not isinstance(title, str) or not title.strip() or len(title) > max_length):
+            raise ValidationError({'title': f'Название курса должно быть непустой строкой до {max_length} символов.'})
+        clone = clone_course(course, request.user.pk, title)
+        return Response(self.get_serializer(clone).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Потоковая выгрузка дерева курса в NDJSON или CSV, преподавателю доступны только свои курсы"""
+        export_format = get_export_format(request)
+        courses = scope_courses(Course.objects.filter(pk=parse_pk(pk)), request.user)
+        if not courses.exists():
+            raise Http404
+        attempts = request.query_params.get('attempts') == 'true'
+        return export_response(course_sources(courses, attempts), export_format, f'course-{pk}')
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_all(self, request):
+        """Потоковая выгрузка всех доступных пользователю курсов"""
+        export_format = get_export_format(request)
+        courses = scope_courses(Course.objects.all(), request.user)
+        attempts = request.query_params.get('attempts') == 'true'
+        return export_response(course_sources(courses, attempts), export_format, 'courses')
 
-class ModuleViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='my', permission_classes=[IsAuthenticated],
+            pagination_class=KeysetPagination)
+    def my(self, request):
+        """Курсы, на которые записан пользователь: один запрос с EXISTS и пагинацией по ключу без COUNT"""
+        courses = Course.objects.filter(enrolled(request.user, 'pk')).order_by('title')
+        page = self.paginate_queryset(courses)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def enroll(self, request, pk=None):
+        """Запись группы пользователей на курс по списку идентификаторов, уже записанные пропускаются"""
+        course = scope_courses(Course.objects.filter(pk=parse_pk(pk)), request.user).first()
+        if course is None:
+            raise Http404
+        user_ids = request.data.get('users')
+        if not isinstance(user_ids, list) or not all(
+                isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids):
+            raise ValidationError({'users': 'Должен быть список идентификаторов пользователей.'})
+        return Response({'enrolled': enroll_users(course, user_ids)})
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def progress(self, request, pk=None):
+        """Прогресс пользователя по курсу: одна строка счетчиков без подсчета уроков"""
+        course_id = parse_pk(pk)
+        if not scope_enrolled(Course.objects.filter(pk=course_id), request.user, 'pk').exists():
+            raise Http404
+        return Response(CourseProgressSerializer(get_course_progress(request.user.pk, course_id)).data)
+
+
+class ModuleViewSet(TreeDestroyMixin, AtomicSaveMixin, EnrolledReadMixin, CachedResponseMixin, ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     """Представление модулей"""
     serializer_class = ModuleSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAdminUser]
     queryset = Module.objects.all().order_by('title')
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(AtomicSaveMixin, EnrolledReadMixin, CachedResponseMixin, ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     """Представление уроков"""
     serializer_class = LessonSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAdminUser]
     queryset = Lesson.objects.all().order_by('title')
 
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def complete(self, request, pk=None):
+        """Отметка урока пройденным, возвращает прогресс по курсу"""
+        lesson = scope_enrolled(Lesson.objects.filter(pk=parse_pk(pk), course__isnull=False), request.user) \
+            .only('pk', 'course_id').first()
+        if lesson is None:
+            raise Http404
+        return Response(CourseProgressSerializer(complete_lesson(request.user.pk, lesson)).data)
+
 
-class LessonTestViewSet(viewsets.ModelViewSet):
+class LessonTestViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Представление теста уроков"""
     serializer_class = LessonTestSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAdminUser]
     queryset = LessonTest.objects.all().order_by('title')
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def check_answers(self, request, pk=None):
-        test = self.get_object()
+        try:
+            answer_key = answer_key_cache.get(int(pk)) if accessible_tests(request.user, [int(pk)]) else None
+        except (TypeError, ValueError):
+            answer_key = None
+        if answer_key is None:
+            raise Http404
         answers = request.data.get('answers', {})
 
         if not isinstance(answers, dict):
@@ -50,32 +165,130 @@ class LessonTestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        correct_answers = 0
-        total_questions = test.questions.count()
+        record_attempt(request.user.pk, int(pk), answer_key, answers)
+        return Response(grade_answers(answer_key, answers))
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def check_answers_batch(self, request):
+        """
+        Проверка пакета ответов по нескольким тестам за один запрос.
+
+        Ключи ответов всех тестов пакета загружаются вместе, результаты возвращаются в порядке
+        отправки. Ошибка в одном элементе пакета не влияет на проверку остальных.
+        """
+        submissions = request.data.get('submissions')
+
+        if not isinstance(submissions, list):
+            return Response(
+                {"detail": "Неверный формат пакета. Поле submissions должно быть списком."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(submissions) > settings.CHECK_ANSWERS_BATCH_MAX_SIZE:
+            return Response(
+                {"detail": f"Пакет не может содержать больше {settings.CHECK_ANSWERS_BATCH_MAX_SIZE} элементов."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        test_ids = []
+        for submission in submissions:
+            test_id = submission.get('test_id') if isinstance(submission, dict) else None
+            test_ids.append(test_id if isinstance(test_id, int) and not isinstance(test_id, bool) else None)
+
+        allowed = accessible_tests(request.user, {test_id for test_id in test_ids if test_id is not None})
+        answer_keys = answer_key_cache.get_many(list(allowed))
 
-        for question in test.questions.all():
-            correct_answer = question.answers.filter(is_correct=True).first()
-            user_answer = answers.get(str(question.id))
-            if correct_answer and user_answer == correct_answer.text:
-                correct_answers += 1
+        results = []
+        for test_id, submission in zip(test_ids, submissions):
+            if test_id is None:
+                results.append({"test_id": None, "detail": "Не указан идентификатор теста."})
+                continue
+            answer_key = answer_keys.get(test_id)
+            if answer_key is None:
+                results.append({"test_id": test_id, "detail": "Тест не найден."})
+                continue
+            answers = submission.get('answers', {})
+            if not isinstance(answers, dict):
+                results.append({"test_id": test_id, "detail": "Неверный формат для ответов. Должен быть словарь.."})
+                continue
+            record_attempt(request.user.pk, test_id, answer_key, answers)
+            results.append({"test_id": test_id, **grade_answers(answer_key, answers)})
 
-        return Response({
-            "correct_answers": correct_answers,
-            "total_questions": total_questions
-        })
+        return Response({"results": results})
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class QuestionViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Представление вопросов"""
     serializer_class = QuestionSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAdminUser]
-    queryset = Question.objects.all().order_by('text')
+    # Сортировка по префиксу текста с индексом (text_prefix, id), см. courses.models.text_prefix
+    queryset = Question.objects.annotate(text_prefix=text_prefix()).order_by('text_prefix', 'pk')
 
 
-class AnswerViewSet(viewsets.ModelViewSet):
+class AnswerViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Представление ответов"""
     serializer_class = AnswerSerializer
+    pagination_class = SelectablePagination
+    permission_classes = [IsAdminUser]
+    queryset = Answer.objects.annotate(text_prefix=text_prefix()).order_by('text_prefix', 'pk')
+
+
+class SearchAPIView(generics.ListAPIView):
+    """Представление полнотекстового поиска по курсам, урокам и вопросам"""
+    serializer_class = SearchResultSerializer
+    pagination_class = CustomPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({"q": "Не указан поисковый запрос."})
+        return search_content(text, self.request.user)
+
+
+class CourseProgressListAPIView(generics.ListAPIView):
+    """Прогресс текущего пользователя по всем начатым курсам"""
+    serializer_class = CourseProgressSerializer
     pagination_class = CustomPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # request.user при аутентификации по токену - ClaimsUser, а не экземпляр модели
+        return CourseProgress.objects.filter(user_id=self.request.user.pk).order_by('-updated_at', '-pk')
+
+
+class ResponseCacheStatsAPIView(APIView):
+    """Счетчики попаданий и промахов кэша ответов"""
     permission_classes = [IsAdminUser]
-    queryset = Answer.objects.all().order_by('text')
+
+    def get(self, request):
+        return Response(get_response_cache_stats())
+
+
+class DeletionStatusAPIView(APIView):
+    """
+    Ход фонового удаления курса или модуля: число удаленных и всего записей по моделям.
+
+    POST продолжает удаление, завершившееся ошибкой.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, task_id):
+        progress = get_deletion_status(task_id)
+        if progress is None:
+            raise Http404
+        return Response(progress)
+
+    def post(self, request, task_id):
+        if get_deletion_status(task_id) is None:
+            raise Http404
+        if not resume_deletion(task_id):
+            return Response({'detail': 'Удаление не завершилось ошибкой'}, status=status.HTTP_409_CONFLICT)
+        return Response(get_deletion_status(task_id), status=status.HTTP_202_ACCEPTED)
+
+
+def serve_content(request, path):
+    """Отдача файлов хранилища с адресацией по содержимому: имя меняется вместе с содержимым, поэтому кэш бессрочный"""
+    response = serve(request, path, document_root=content_storage.path(content_storage.prefix))
+    patch_cache_control(response, public=True, max_age=settings.CONTENT_STORAGE_MAX_AGE, immutable=True)
+    return response
@@ -0,0 +1,86 @@
+import pytest
+from django.core.cache import cache
+from courses import attempts, thumbnails
+from courses.grading import answer_key_cache
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кэши живут дольше транзакции теста, поэтому очищаем их перед каждым тестом"""
+    cache.clear()
+    answer_key_cache.clear()
+    thumbnails.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Медиафайлы во временной папке, уменьшенные копии создаются синхронно"""
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.THUMBNAIL_BACKGROUND = False
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture(autouse=True)
+def inline_deletion(settings):
+    """Удаление с ?async=true выполняется сразу в потоке теста"""
+    settings.DELETION_BACKGROUND = False
+
+
+@pytest.fixture(autouse=True)
+def attempt_writer(monkeypatch, tmp_path):
+    """Буфер попыток без фонового потока: в тестах записи сбрасываются явно"""
+    writer = attempts.AttemptWriter(batch_size=100, flush_interval=60, max_pending=1000,
+                                    spool_dir=tmp_path / 'attempts', background=False)
+    monkeypatch.setattr(attempts, 'attempt_writer', writer)
+    return writer
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(email='testuser@gmail.com', user_name='testuser', first_name='First', last_name='Last',
+                               role='professor', password='testpass', is_staff=True, is_active=True)
+
+
+@pytest.fixture
+def another_user():
+    return User.objects.create(email='anotheruser@gmail.com', user_name='anotheruser', first_name='First',
+                               last_name='Last', role='professor', password='anotherpass', is_staff=True,
+                               is_active=True)
+
+
+@pytest.fixture
+def authenticated_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def course(user):
+    return Course.objects.create(title='Test Course', description='Course description', owner=user)
+
+
+@pytest.fixture
+def module(course):
+    return Module.objects.create(title='Test Module', course=course)
+
+
+@pytest.fixture
+def lesson(module):
+    return Lesson.objects.create(title='Test Lesson', content='Lesson content', module=module)
+
+
+@pytest.fixture
+def lesson_test(lesson):
+    return LessonTest.objects.create(title='Test Lesson Test', lesson=lesson)
+
+
+@pytest.fixture
+def question(lesson_test):
+    return Question.objects.create(text='Test Question?', lesson_test=lesson_test)
+
+
+@pytest.fixture
+def answer(question):
+    return Answer.objects.create(text='Test Answer', question=question, is_correct=True)
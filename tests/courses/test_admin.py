@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from courses.admin import EstimatedCountPaginator
+from courses.models import Answer
+
+
+@pytest.fixture
+def admin_client(client, user_admin):
+    client.force_login(user_admin)
+    return client
+
+
+@pytest.mark.django_db
+class TestLargeTableAdmin:
+
+    def changelist_queries(self, admin_client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    def test_answer_changelist_queries_do_not_grow(self, admin_client, question):
+        url = reverse('admin:courses_answer_changelist')
+        Answer.objects.bulk_create(Answer(text='Ответ', question=question) for _ in range(2))
+        few = self.changelist_queries(admin_client, url)
+        Answer.objects.bulk_create(Answer(text='Ответ', question=question) for _ in range(20))
+
+        assert self.changelist_queries(admin_client, url) == few
+
+    def test_question_filter_does_not_list_all_tests(self, admin_client, lesson_test, question):
+        url = reverse('admin:courses_question_changelist')
+
+        response = admin_client.get(url)
+        assert response.context['cl'].filter_specs[0].lookup_choices == []
+        assert 'autocomplete_filter.js' in response.content.decode()
+
+        response = admin_client.get(url, {'lesson_test__id__exact': lesson_test.pk})
+        assert list(response.context['cl'].result_list) == [question]
+        assert response.context['cl'].filter_specs[0].lookup_choices == [(lesson_test.pk, lesson_test.title)]
+
+    def test_filter_ignores_invalid_value(self, admin_client, question):
+        response = admin_client.get(reverse('admin:courses_question_changelist'), {'lesson_test__id__exact': 'x'})
+
+        assert response.status_code == 302
+
+    def test_filter_autocomplete(self, admin_client, lesson_test):
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'app_label': 'courses', 'model_name': 'question', 'field_name': 'lesson_test', 'term': lesson_test.title,
+        })
+
+        assert response.json()['results'] == [{'id': str(lesson_test.pk), 'text': lesson_test.title}]
+
+    def test_change_form_uses_autocomplete(self, admin_client, answer):
+        response = admin_client.get(reverse('admin:courses_answer_change', args=[answer.pk]))
+
+        assert 'admin-autocomplete' in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+
+    def test_exact_count_below_limit(self, question):
+        Answer.objects.bulk_create(Answer(text='Ответ', question=question) for _ in range(3))
+
+        assert EstimatedCountPaginator(Answer.objects.order_by('pk'), 10).count == 3
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql', reason='Оценка числа записей есть только на PostgreSQL')
+    def test_estimate_above_limit(self, settings, question):
+        settings.ADMIN_EXACT_COUNT_LIMIT = 0
+        Answer.objects.bulk_create(Answer(text='Ответ', question=question) for _ in range(3))
+
+        with CaptureQueriesContext(connection) as queries:
+            EstimatedCountPaginator(Answer.objects.filter(question=question).order_by('pk'), 10).count
+        assert not any('COUNT(' in query['sql'] for query in queries)
@@ -0,0 +1,98 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from courses import models
+from courses.models import Lesson
+
+
+def auth_headers(user=None):
+    return {'Authorization': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+
+
+def get(url, data=None, user=None, headers=None):
+    return async_to_sync(AsyncClient().get)(url, data, headers=headers or auth_headers(user))
+
+
+def post(url, data, user):
+    return async_to_sync(AsyncClient().post)(url, data, content_type='application/json', headers=auth_headers(user))
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+
+    @pytest.mark.parametrize('name', ['course', 'lesson'])
+    def test_list_matches_sync(self, authenticated_client, user, module, lesson, name):
+        Lesson.objects.create(title='Другой урок', content='Контент', module=module)
+        params = {'page': 2, 'page_size': 1} if name == 'lesson' else {}
+
+        response = get(reverse(f'courses:async-{name}-list'), params, user)
+        expected = authenticated_client.get(reverse(f'courses:{name}-list'), params).json()
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        for link in ('next', 'previous'):
+            if expected[link]:
+                expected[link] = expected[link].replace(f'/{name}/', f'/async/{name}/')
+        assert data == expected
+
+    @pytest.mark.parametrize('name, fixture', [('course', 'course'), ('lesson', 'lesson')])
+    def test_detail_matches_sync(self, request, authenticated_client, user, name, fixture):
+        obj = request.getfixturevalue(fixture)
+        response = get(reverse(f'courses:async-{name}-detail', args=[obj.pk]), user=user)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == authenticated_client.get(reverse(f'courses:{name}-detail', args=[obj.pk])).json()
+
+    def test_not_found(self, user):
+        assert get(reverse('courses:async-course-detail', args=[0]), user=user).status_code == \
+               status.HTTP_404_NOT_FOUND
+        assert get(reverse('courses:async-course-list'), {'page': 5}, user).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_authentication(self, user_student):
+        url = reverse('courses:async-course-list')
+        response = get(url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'].startswith('Bearer')
+
+        response = get(url, headers={'Authorization': 'Bearer invalid'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()['code'] == 'token_not_valid'
+
+        response = get(url, user=user_student)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == []
+
+    @pytest.mark.parametrize('name', ['course', 'lesson'])
+    def test_student_scoped_to_enrollments(self, api_client, user_student, user, course, lesson, name):
+        other = models.Course.objects.create(title='Другой курс', description='Описание', owner=user)
+        other_lesson = Lesson.objects.create(title='Чужой урок', content='Контент',
+                                             module=models.Module.objects.create(title='Модуль', course=other))
+        models.Enrollment.objects.create(user=user_student, course=course)
+        api_client.force_authenticate(user_student)
+
+        response = get(reverse(f'courses:async-{name}-list'), user=user_student)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == api_client.get(reverse(f'courses:{name}-list')).json()
+        assert len(response.json()['results']) == 1
+
+        hidden = other if name == 'course' else other_lesson
+        assert get(reverse(f'courses:async-{name}-detail', args=[hidden.pk]), user=user_student).status_code == \
+               status.HTTP_404_NOT_FOUND
+
+    def test_check_answers(self, user_student, attempt_writer, lesson_test, question, answer):
+        url = reverse('courses:async-lesson_test-check_answers', args=[lesson_test.id])
+        assert post(url, {'answers': {}}, user_student).status_code == status.HTTP_404_NOT_FOUND
+        models.Enrollment.objects.create(user=user_student, course_id=lesson_test.course_id)
+
+        response = post(url, {'answers': {str(question.id): 'Test Answer'}}, user_student)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'correct_answers': 1, 'total_questions': 1}
+        attempt_writer.flush()
+        assert models.TestAttempt.objects.get().user == user_student
+
+        response = post(url, {'answers': []}, user_student)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = post(reverse('courses:async-lesson_test-check_answers', args=[0]), {'answers': {}}, user_student)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,117 @@
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from courses import models
+from courses.attempts import DEAD_LETTER_DIR, make_attempt
+
+
+@pytest.mark.django_db
+class TestAttempts:
+
+    def test_check_answers_records_attempt(self, authenticated_client, user, attempt_writer, lesson_test, question,
+                                           answer):
+        url = reverse('courses:lesson_test-check_answers', args=[lesson_test.id])
+        response = authenticated_client.post(url, {'answers': {str(question.id): 'Test Answer'}}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(attempt_writer) == 1
+        assert not models.TestAttempt.objects.exists()
+
+        assert attempt_writer.flush() == 1
+        attempt = models.TestAttempt.objects.get()
+        assert (attempt.user, attempt.lesson_test, attempt.correct_answers, attempt.total_questions) == \
+               (user, lesson_test, 1, 1)
+        assert list(attempt.answers.values_list('question_id', 'answer', 'is_correct')) == \
+               [(question.id, 'Test Answer', True)]
+
+    def test_flush_by_size_keeps_order(self, user, attempt_writer, lesson_test, question, answer):
+        attempt_writer.batch_size = 3
+        answer_key = {question.id: 'Test Answer'}
+        for i in range(5):
+            attempt_writer.add(make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): str(i)}))
+
+        assert len(attempt_writer) == 2
+        attempt_writer.flush()
+        answers = models.AttemptAnswer.objects.order_by('attempt_id').values_list('answer', flat=True)
+        assert list(answers) == ['0', '1', '2', '3', '4']
+
+    def test_flush_by_time(self, user, attempt_writer, lesson_test, question, answer):
+        attempt_writer.flush_interval = 0
+        attempt_writer.add(make_attempt(user.pk, lesson_test.pk, {question.id: 'Test Answer'}, {}))
+
+        assert len(attempt_writer) == 0
+        assert models.TestAttempt.objects.count() == 1
+
+    def test_max_pending_bounds_buffer(self, user, attempt_writer, lesson_test, question, answer):
+        attempt_writer.max_pending = 10
+        attempt_writer.background = True
+        attempt_writer._ensure_thread = lambda: None
+        for _ in range(attempt_writer.max_pending):
+            attempt_writer.add(make_attempt(user.pk, lesson_test.pk, {question.id: 'Test Answer'}, {}))
+
+        assert len(attempt_writer) == 0
+        assert models.TestAttempt.objects.count() == attempt_writer.max_pending
+
+    def test_crash_mid_batch(self, monkeypatch, user, attempt_writer, lesson_test, question, answer):
+        answer_key = {question.id: 'Test Answer'}
+        attempt_writer.add(make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'first'}))
+        attempt_writer.add(make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'second'}))
+
+        def crash(*args, **kwargs):
+            raise RuntimeError('connection lost')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(models.AttemptAnswer.objects, 'bulk_create', crash)
+            assert attempt_writer.flush() == 0
+
+        assert not models.TestAttempt.objects.exists()
+        assert len(list(attempt_writer.spool_dir.glob('*.json'))) == 1
+
+        attempt_writer.add(make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'third'}))
+        call_command('flush_attempts')
+        assert len(attempt_writer) == 1
+        attempt_writer.flush()
+
+        assert not list(attempt_writer.spool_dir.glob('*.json'))
+        answers = models.AttemptAnswer.objects.values_list('answer', flat=True)
+        assert sorted(answers) == ['first', 'second', 'third']
+
+    def test_failed_batch_written_by_row(self, user, attempt_writer, lesson_test, question, answer):
+        answer_key = {question.id: 'Test Answer'}
+        for value in ('first', 'broken', 'third'):
+            attempt_writer.add(make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): value}))
+        attempt_writer._buffer[1][1]['correct_answers'] = None
+
+        assert attempt_writer.flush() == 2
+
+        assert sorted(models.AttemptAnswer.objects.values_list('answer', flat=True)) == ['first', 'third']
+        assert not list(attempt_writer.spool_dir.glob('*.json'))
+        [dead] = (attempt_writer.spool_dir / DEAD_LETTER_DIR).glob('*.json')
+        assert [attempt['answers'][0][1] for attempt in json.loads(dead.read_text())] == ['broken']
+
+    def test_drain_continues_after_failed_file(self, user, attempt_writer, lesson_test, question, answer):
+        answer_key = {question.id: 'Test Answer'}
+        broken = make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'broken'})
+        broken['correct_answers'] = None
+        attempt_writer.spool([broken, make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'first'})])
+        (attempt_writer.spool_dir / '0-corrupted.json').write_text('{', encoding='utf-8')
+        attempt_writer.spool([make_attempt(user.pk, lesson_test.pk, answer_key, {str(question.id): 'second'})])
+
+        assert attempt_writer.drain_spool() == 2
+
+        assert sorted(models.AttemptAnswer.objects.values_list('answer', flat=True)) == ['first', 'second']
+        assert not list(attempt_writer.spool_dir.glob('*.json'))
+        assert len(list((attempt_writer.spool_dir / DEAD_LETTER_DIR).glob('*.json'))) == 2
+
+    def test_drain_skips_unfinished_files(self, user, attempt_writer, lesson_test, question, answer):
+        attempt_writer.spool([make_attempt(user.pk, lesson_test.pk, {question.id: 'Test Answer'}, {})])
+        unfinished = attempt_writer.spool_dir / '0-writing.json.0123.tmp'
+        unfinished.write_text('[{"user_id"', encoding='utf-8')
+
+        assert attempt_writer.drain_spool() == 1
+
+        assert unfinished.exists()
+        assert not (attempt_writer.spool_dir / DEAD_LETTER_DIR).exists()
+        assert [path.name for path in attempt_writer.spool_dir.iterdir()] == [unfinished.name]
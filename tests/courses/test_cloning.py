@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from courses.denormalization import DENORMALIZED_OWNERS, find_mismatches
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+
+
+@pytest.fixture
+def course_tree(course, module, lesson, lesson_test):
+    """Курс с несколькими вопросами и ответами на каждый"""
+    for i in range(3):
+        question = Question.objects.create(text=f'Вопрос {i}', lesson_test=lesson_test)
+        for j in range(2):
+            Answer.objects.create(text=f'Ответ {i}.{j}', question=question, is_correct=j == 0)
+    return course
+
+
+def tree(course):
+    return [
+        list(Module.objects.filter(course=course).order_by('pk').values_list('title', 'preview')),
+        list(Lesson.objects.filter(course=course).order_by('pk').values_list('title', 'module__title', 'preview')),
+        list(LessonTest.objects.filter(course=course).order_by('pk').values_list('title', 'lesson__title')),
+        list(Question.objects.filter(course=course).order_by('pk').values_list('text', 'lesson_test__title')),
+        list(Answer.objects.filter(course=course).order_by('pk').values_list('text', 'is_correct', 'question__text')),
+    ]
+
+
+@pytest.mark.django_db
+class TestCloneCourse:
+
+    def test_clone_copies_subtree(self, api_client, another_user, course_tree):
+        api_client.force_authenticate(another_user)
+        course_tree.owner = another_user
+        course_tree.save()
+
+        response = api_client.post(reverse('courses:course-clone', args=[course_tree.pk]), {'title': 'Весна'})
+
+        assert response.status_code == 201
+        clone = Course.objects.get(pk=response.data['id'])
+        assert clone.title == 'Весна'
+        assert clone.owner == another_user
+        assert clone.preview.name == course_tree.preview.name
+        assert tree(clone) == tree(course_tree)
+        assert Answer.objects.filter(course=clone).count() == 6
+        assert not any(find_mismatches(model).exists() for model in DENORMALIZED_OWNERS)
+
+    def test_clone_query_count_does_not_grow(self, authenticated_client, course_tree, lesson_test):
+        url = reverse('courses:course-clone', args=[course_tree.pk])
+        with CaptureQueriesContext(connection) as small:
+            authenticated_client.post(url)
+        for i in range(20):
+            question = Question.objects.create(text=f'Еще вопрос {i}', lesson_test=lesson_test)
+            Answer.objects.create(text='Ответ', question=question)
+        with CaptureQueriesContext(connection) as large:
+            authenticated_client.post(url)
+
+        assert len(large) == len(small)
+
+    def test_foreign_course_not_found(self, api_client, another_user, course_tree):
+        api_client.force_authenticate(another_user)
+
+        response = api_client.post(reverse('courses:course-clone', args=[course_tree.pk]))
+
+        assert response.status_code == 404
+
+    def test_non_numeric_pk(self, authenticated_client):
+        assert authenticated_client.post(reverse('courses:course-clone', args=['abc'])).status_code == 404
+
+    def test_invalid_title(self, authenticated_client, course_tree):
+        response = authenticated_client.post(reverse('courses:course-clone', args=[course_tree.pk]), {'title': ' '})
+
+        assert response.status_code == 400
+        assert Course.objects.count() == 1
+
+    def test_clone_list_is_not_stale(self, authenticated_client, course_tree):
+        authenticated_client.get(reverse('courses:answer-list'))
+
+        authenticated_client.post(reverse('courses:course-clone', args=[course_tree.pk]))
+
+        assert authenticated_client.get(reverse('courses:answer-list')).data['count'] == 12
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from courses.models import Lesson
+from courses.serializers import LessonSerializer
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_detail_etag(self, monkeypatch, authenticated_client, lesson):
+        url = reverse('courses:lesson-detail', args=[lesson.id])
+        response = authenticated_client.get(url)
+        etag = response['ETag']
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Last-Modified']
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Сериализатор не должен вызываться')
+
+        # Без кэша ответов версия читается из базы
+        cache.clear()
+        with monkeypatch.context() as patch, CaptureQueriesContext(connection) as queries:
+            patch.setattr(LessonSerializer, 'to_representation', fail)
+            response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert len(queries) == 1
+        assert 'content' not in queries[0]['sql']
+
+        lesson.content = 'New content'
+        lesson.save()
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_detail_last_modified(self, authenticated_client, lesson):
+        url = reverse('courses:lesson-detail', args=[lesson.id])
+        response = authenticated_client.get(url)
+
+        response = authenticated_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_not_found(self, authenticated_client):
+        response = authenticated_client.get(reverse('courses:lesson-detail', args=[0]), HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('params', [{}, {'pagination': 'keyset'}])
+    def test_list_etag(self, authenticated_client, module, lesson, params):
+        url = reverse('courses:lesson-list')
+        response = authenticated_client.get(url, params)
+        etag = response['ETag']
+        assert 'Last-Modified' not in response
+
+        response = authenticated_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        other = Lesson.objects.create(title='Другой урок', content='Контент', module=module)
+        response = authenticated_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response['ETag']
+
+        other.delete()
+        response = authenticated_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_etag_depends_on_query(self, authenticated_client, lesson):
+        url = reverse('courses:lesson-list')
+        etag = authenticated_client.get(url)['ETag']
+
+        response = authenticated_client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
@@ -1,63 +1,7 @@
 import pytest
 from rest_framework import status
-from rest_framework.test import APIClient
 from django.urls import reverse
 from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
-from users.models import User
-
-
-@pytest.fixture
-def api_client():
-    return APIClient()
-
-
-@pytest.fixture
-def user():
-    return User.objects.create(email='testuser@gmail.com', user_name='testuser', first_name='First', last_name='Last',
-                               role='professor', password='testpass', is_staff=True, is_active=True)
-
-
-@pytest.fixture
-def another_user():
-    return User.objects.create(email='anotheruser@gmail.com', user_name='anotheruser', first_name='First',
-                               last_name='Last', role='professor', password='anotherpass', is_staff=True,
-                               is_active=True)
-
-
-@pytest.fixture
-def authenticated_client(api_client, user):
-    api_client.force_authenticate(user=user)
-    return api_client
-
-
-@pytest.fixture
-def course(user):
-    return Course.objects.create(title='Test Course', description='Course description', owner=user)
-
-
-@pytest.fixture
-def module(course):
-    return Module.objects.create(title='Test Module', course=course)
-
-
-@pytest.fixture
-def lesson(module):
-    return Lesson.objects.create(title='Test Lesson', content='Lesson content', module=module)
-
-
-@pytest.fixture
-def lesson_test(lesson):
-    return LessonTest.objects.create(title='Test Lesson Test', lesson=lesson)
-
-
-@pytest.fixture
-def question(lesson_test):
-    return Question.objects.create(text='Test Question?', lesson_test=lesson_test)
-
-
-@pytest.fixture
-def answer(question):
-    return Answer.objects.create(text='Test Answer', question=question, is_correct=True)
 
 
 @pytest.mark.django_db
@@ -0,0 +1,140 @@
+import pytest
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from courses.grading import answer_key_cache
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses import models
+
+
+def add_questions(lesson_test, count):
+    for i in range(count):
+        question = Question.objects.create(text=f'Вопрос {i}', lesson_test=lesson_test)
+        Answer.objects.create(text='Ответ', question=question, is_correct=True)
+
+
+@pytest.mark.django_db
+class TestTreeDeletion:
+
+    def test_delete_course_removes_subtree(self, authenticated_client, user, course, lesson_test, question, answer):
+        attempt = models.TestAttempt.objects.create(user=user, lesson_test=lesson_test, correct_answers=1,
+                                                    total_questions=1)
+        models.AttemptAnswer.objects.create(attempt=attempt, question=question, answer='Ответ', is_correct=True)
+
+        response = authenticated_client.delete(reverse('courses:course-detail', args=[course.pk]))
+
+        assert response.status_code == 204
+        for model in (Course, Module, Lesson, LessonTest, Question, Answer, models.TestAttempt,
+                      models.AttemptAnswer):
+            assert not model.objects.exists()
+
+    def test_delete_query_count_does_not_grow(self, authenticated_client, user, lesson_test):
+        add_questions(lesson_test, 2)
+        other = Course.objects.create(title='Другой', description='Описание', owner=user)
+        other_test = LessonTest.objects.create(title='Тест', lesson=Lesson.objects.create(
+            title='Урок', content='Контент', module=Module.objects.create(title='Модуль', course=other)))
+        add_questions(other_test, 30)
+
+        with CaptureQueriesContext(connection) as small:
+            authenticated_client.delete(reverse('courses:course-detail', args=[lesson_test.course_id]))
+        with CaptureQueriesContext(connection) as large:
+            authenticated_client.delete(reverse('courses:course-detail', args=[other.pk]))
+
+        assert len(large) == len(small)
+
+    def test_delete_module_keeps_siblings(self, authenticated_client, course, module, answer):
+        sibling = Module.objects.create(title='Соседний модуль', course=course)
+
+        response = authenticated_client.delete(reverse('courses:module-detail', args=[module.pk]))
+
+        assert response.status_code == 204
+        assert list(Module.objects.all()) == [sibling]
+        assert Course.objects.exists()
+        assert not Answer.objects.exists()
+
+    def test_delete_invalidates_caches(self, authenticated_client, course, lesson_test, answer):
+        assert answer_key_cache.get(lesson_test.pk) is not None
+        assert authenticated_client.get(reverse('courses:course-tree', args=[course.pk])).status_code == 200
+        authenticated_client.get(reverse('courses:answer-list'))
+
+        authenticated_client.delete(reverse('courses:course-detail', args=[course.pk]))
+
+        assert answer_key_cache.get(lesson_test.pk) is None
+        assert authenticated_client.get(reverse('courses:course-tree', args=[course.pk])).status_code == 404
+        assert authenticated_client.get(reverse('courses:answer-list')).data['count'] == 0
+
+    def test_async_delete_reports_progress(self, authenticated_client, course, lesson_test):
+        add_questions(lesson_test, 3)
+
+        response = authenticated_client.delete(reverse('courses:course-detail', args=[course.pk]) + '?async=true')
+
+        assert response.status_code == 202
+        progress = authenticated_client.get(response.data['status_url']).data
+        assert progress['state'] == 'done'
+        assert progress['total']['courses.Answer'] == 3
+        assert progress['deleted'] == progress['total']
+        assert not Course.objects.exists()
+
+    def test_failed_async_delete_resumes(self, authenticated_client, monkeypatch, course, lesson_test):
+        add_questions(lesson_test, 3)
+        raw_delete = QuerySet._raw_delete
+
+        def fail_on_modules(queryset, using):
+            if queryset.model is Module:
+                raise DatabaseError('connection lost')
+            return raw_delete(queryset, using)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(QuerySet, '_raw_delete', fail_on_modules)
+            response = authenticated_client.delete(reverse('courses:course-detail', args=[course.pk]) + '?async=true')
+        status_url = response.data['status_url']
+
+        progress = authenticated_client.get(status_url).data
+        assert progress['state'] == 'failed'
+        assert 'connection lost' in progress['error']
+        assert progress['deleted']['courses.Answer'] == 3
+        assert not Answer.objects.exists()
+        assert Module.objects.exists()
+
+        assert authenticated_client.post(status_url).status_code == 202
+        progress = authenticated_client.get(status_url).data
+        assert progress['state'] == 'done'
+        assert progress['total']['courses.Answer'] == 3
+        assert progress['deleted'] == progress['total']
+        assert not Course.objects.exists()
+        assert authenticated_client.post(status_url).status_code == 409
+
+    def test_unknown_task(self, authenticated_client):
+        response = authenticated_client.get(reverse('courses:deletion_status', args=['missing']))
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestAdminTreeDeletion:
+
+    def test_admin_delete_course(self, client, user_admin, course, answer):
+        client.force_login(user_admin)
+        url = reverse('admin:courses_course_delete', args=[course.pk])
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert dict(response.context['model_count']) == {
+            'Курсы': 1, 'Модули': 1, 'Уроки': 1, 'Тесты': 1, 'Вопросы': 1, 'Ответы': 1,
+        }
+
+        response = client.post(url, {'post': 'yes'})
+        assert response.status_code == 302
+        assert not Course.objects.exists()
+        assert not Answer.objects.exists()
+
+    def test_admin_delete_selected_modules(self, client, user_admin, course, module, answer):
+        client.force_login(user_admin)
+
+        client.post(reverse('admin:courses_module_changelist'),
+                    {'action': 'delete_selected', '_selected_action': [module.pk], 'post': 'yes'})
+
+        assert not Module.objects.exists()
+        assert not Answer.objects.exists()
+        assert Course.objects.exists()
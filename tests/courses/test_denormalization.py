@@ -0,0 +1,76 @@
+import pytest
+from django.contrib import admin
+from django.core.management import call_command, CommandError
+from django.test import RequestFactory
+from courses.denormalization import DENORMALIZED_OWNERS, find_mismatches
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+
+
+def course_keys(*instances):
+    return [type(item).objects.values_list('course_id', 'owner_id').get(pk=item.pk) for item in instances]
+
+
+@pytest.mark.django_db
+class TestDenormalizedCourse:
+
+    def test_create_fills_course_and_owner(self, course, module, lesson, lesson_test, question, answer):
+        assert course_keys(module, lesson, lesson_test, question, answer) == [(course.pk, course.owner_id)] * 5
+
+    def test_move_module_updates_descendants(self, another_user, module, lesson, lesson_test, question, answer):
+        other = Course.objects.create(title='Other', description='Other', owner=another_user)
+        module.course = other
+        module.save()
+
+        assert course_keys(module, lesson, lesson_test, question, answer) == [(other.pk, another_user.pk)] * 5
+
+    def test_reparent_lesson_updates_descendants(self, another_user, lesson, lesson_test, question, answer):
+        other = Course.objects.create(title='Other', description='Other', owner=another_user)
+        lesson.module = Module.objects.create(title='Other', course=other)
+        lesson.save()
+
+        assert course_keys(lesson, lesson_test, question, answer) == [(other.pk, another_user.pk)] * 4
+
+    def test_owner_change_updates_descendants(self, another_user, course, module, lesson, lesson_test, question,
+                                              answer):
+        course.owner = another_user
+        course.save()
+
+        assert course_keys(module, lesson, lesson_test, question, answer) == [(course.pk, another_user.pk)] * 5
+
+    def test_owner_delete_clears_owner(self, user, lesson, answer):
+        user.delete()
+
+        assert course_keys(lesson, answer) == [(lesson.course_id, None)] * 2
+
+    def test_admin_filters_by_owner(self, user, another_user, answer):
+        request = RequestFactory().get('/admin/')
+        request.user = another_user
+        request.user.is_staff = False
+        assert not admin.site._registry[Answer].get_queryset(request).exists()
+
+        request.user = user
+        request.user.is_staff = False
+        assert list(admin.site._registry[Answer].get_queryset(request)) == [answer]
+
+
+@pytest.mark.django_db
+class TestCheckDenormalizedCommand:
+
+    def test_consistent(self, answer, capsys):
+        call_command('check_denormalized')
+
+        assert 'расхождений 0' in capsys.readouterr().out
+
+    def test_finds_and_fixes_mismatches(self, course, lesson, lesson_test, question, answer):
+        Question.objects.bulk_create([Question(text='Без курса', lesson_test=lesson_test)])
+        Lesson.objects.filter(pk=lesson.pk).update(owner=None)
+        Module.objects.filter(pk=lesson.module_id).update(owner=None)
+        LessonTest.objects.filter(pk=lesson_test.pk).update(course=None, owner=None)
+
+        with pytest.raises(CommandError):
+            call_command('check_denormalized')
+        call_command('check_denormalized', '--fix')
+
+        assert not any(find_mismatches(model).exists() for model in DENORMALIZED_OWNERS)
+        assert set(Question.objects.values_list('course_id', 'owner_id')) == {(course.pk, course.owner_id)}
+        call_command('check_denormalized')
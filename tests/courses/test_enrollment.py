@@ -0,0 +1,142 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from courses.models import Course, Module, Enrollment
+from tests.conftest import UserFactory
+
+
+@pytest.fixture
+def student_client(api_client, user_student):
+    api_client.force_authenticate(user_student)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestBulkEnrollment:
+
+    def test_enroll_cohort(self, authenticated_client, course, user_student):
+        students = UserFactory.create_batch(3)
+        Enrollment.objects.create(user=user_student, course=course)
+
+        response = authenticated_client.post(reverse('courses:course-enroll', args=[course.pk]), {
+            'users': [student.pk for student in students] + [user_student.pk, 0],
+        }, format='json')
+
+        assert response.status_code == 200
+        assert response.data == {'enrolled': 3}
+        assert set(course.enrollments.values_list('user_id', flat=True)) == \
+            {user_student.pk, *(student.pk for student in students)}
+
+    def test_enroll_query_count_does_not_grow(self, authenticated_client, course):
+        url = reverse('courses:course-enroll', args=[course.pk])
+        small, large = UserFactory.create_batch(2), UserFactory.create_batch(20)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            authenticated_client.post(url, {'users': [student.pk for student in small]}, format='json')
+        with CaptureQueriesContext(connection) as large_queries:
+            authenticated_client.post(url, {'users': [student.pk for student in large]}, format='json')
+
+        assert len(large_queries) == len(small_queries)
+
+    def test_foreign_course(self, api_client, another_user, course, user_student):
+        api_client.force_authenticate(another_user)
+
+        response = api_client.post(reverse('courses:course-enroll', args=[course.pk]), {'users': [user_student.pk]},
+                                   format='json')
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('users', [None, 'all', [1, 'x'], [True]])
+    def test_invalid_users(self, authenticated_client, course, users):
+        response = authenticated_client.post(reverse('courses:course-enroll', args=[course.pk]), {'users': users},
+                                             format='json')
+
+        assert response.status_code == 400
+
+    def test_non_numeric_pk(self, authenticated_client):
+        response = authenticated_client.post(reverse('courses:course-enroll', args=['abc']), {'users': []},
+                                             format='json')
+
+        assert response.status_code == 404
+
+    def test_student_cannot_enroll(self, student_client, course, user_student):
+        response = student_client.post(reverse('courses:course-enroll', args=[course.pk]),
+                                       {'users': [user_student.pk]}, format='json')
+
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestEnrolledScope:
+
+    def test_student_sees_only_enrolled_courses(self, student_client, user_student, user, course, module):
+        other = Course.objects.create(title='Другой курс', description='Описание', owner=user)
+        Module.objects.create(title='Чужой модуль', course=other)
+        Enrollment.objects.create(user=user_student, course=course)
+
+        courses = student_client.get(reverse('courses:course-list')).data['results']
+        modules = student_client.get(reverse('courses:module-list')).data['results']
+
+        assert [item['id'] for item in courses] == [course.pk]
+        assert [item['id'] for item in modules] == [module.pk]
+        assert student_client.get(reverse('courses:course-detail', args=[other.pk])).status_code == 404
+
+    def test_student_cannot_modify(self, student_client, user_student, course):
+        Enrollment.objects.create(user=user_student, course=course)
+
+        response = student_client.patch(reverse('courses:course-detail', args=[course.pk]), {'title': 'Новое'})
+
+        assert response.status_code == 403
+
+    def test_cached_list_per_student(self, api_client, user_student, course, lesson):
+        other_student = UserFactory.create()
+        Enrollment.objects.create(user=user_student, course=course)
+        url = reverse('courses:lesson-list')
+
+        api_client.force_authenticate(user_student)
+        assert len(api_client.get(url).data['results']) == 1
+        api_client.force_authenticate(other_student)
+        assert api_client.get(url).data['results'] == []
+
+        Enrollment.objects.create(user=other_student, course=course)
+        assert len(api_client.get(url).data['results']) == 1
+
+    def test_staff_sees_everything(self, authenticated_client, course):
+        assert [item['id'] for item in authenticated_client.get(reverse('courses:course-list')).data['results']] == \
+            [course.pk]
+
+    def test_check_answers_requires_enrollment(self, student_client, user_student, lesson_test, question, answer):
+        url = reverse('courses:lesson_test-check_answers', args=[lesson_test.pk])
+        assert student_client.post(url, {'answers': {}}, format='json').status_code == 404
+
+        Enrollment.objects.create(user=user_student, course_id=lesson_test.course_id)
+
+        assert student_client.post(url, {'answers': {}}, format='json').status_code == 200
+
+
+@pytest.mark.django_db
+class TestMyCourses:
+
+    def test_single_query(self, student_client, user_student, user):
+        for i in range(3):
+            course = Course.objects.create(title=f'Курс {i}', description='Описание', owner=user)
+            Enrollment.objects.create(user=user_student, course=course)
+        Course.objects.create(title='Курс без записи', description='Описание', owner=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = student_client.get(reverse('courses:course-my'), {'page_size': 2})
+
+        assert len(queries) == 1
+        assert [item['title'] for item in response.data['results']] == ['Курс 0', 'Курс 1']
+        assert [item['title'] for item in student_client.get(response.data['next']).data['results']] == ['Курс 2']
+
+    def test_staff_gets_own_enrollments(self, authenticated_client, course):
+        assert authenticated_client.get(reverse('courses:course-my')).data['results'] == []
+
+    def test_course_deletion_removes_enrollments(self, authenticated_client, user_student, course):
+        Enrollment.objects.create(user=user_student, course=course)
+
+        authenticated_client.delete(reverse('courses:course-detail', args=[course.pk]))
+
+        assert not Enrollment.objects.exists()
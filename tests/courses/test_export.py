@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from courses.models import Course, Module, Answer
+from courses import models
+
+
+def read_ndjson(response):
+    assert response.streaming
+    return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+
+@pytest.mark.django_db
+class TestCourseExport:
+
+    def test_export_course_tree(self, authenticated_client, course, answer):
+        response = authenticated_client.get(reverse('courses:course-export', args=[course.pk]))
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = read_ndjson(response)
+        assert [record['model'] for record in records] == [
+            'courses.course', 'courses.module', 'courses.lesson', 'courses.lessontest', 'courses.question',
+            'courses.answer',
+        ]
+        assert records[-1] == {'model': 'courses.answer', 'pk': answer.pk, 'fields': {
+            'question': answer.question_id, 'course': course.pk, 'owner': course.owner_id, 'text': answer.text,
+            'is_correct': answer.is_correct, 'updated_at': records[-1]['fields']['updated_at'],
+        }}
+        assert 'search_vector' not in records[0]['fields']
+
+    def test_export_with_attempts(self, authenticated_client, user, course, lesson_test, question):
+        attempt = models.TestAttempt.objects.create(user=user, lesson_test=lesson_test, correct_answers=0,
+                                                    total_questions=1)
+        models.AttemptAnswer.objects.create(attempt=attempt, question=question, answer='Ответ', is_correct=False)
+
+        response = authenticated_client.get(reverse('courses:course-export', args=[course.pk]), {'attempts': 'true'})
+
+        assert [record['model'] for record in read_ndjson(response)][-2:] == [
+            'courses.testattempt', 'courses.attemptanswer',
+        ]
+
+    def test_professor_cannot_export_foreign_course(self, api_client, another_user, course):
+        api_client.force_authenticate(another_user)
+
+        response = api_client.get(reverse('courses:course-export', args=[course.pk]))
+
+        assert response.status_code == 404
+
+    def test_admin_exports_any_course(self, api_client, user_admin, course):
+        api_client.force_authenticate(user_admin)
+
+        response = api_client.get(reverse('courses:course-export', args=[course.pk]))
+
+        assert [record['pk'] for record in read_ndjson(response)] == [course.pk]
+
+    def test_export_all_scoped_to_owner(self, authenticated_client, another_user, course):
+        Course.objects.create(title='Чужой курс', description='Описание', owner=another_user)
+
+        response = authenticated_client.get(reverse('courses:course-export-all'))
+
+        assert [record['pk'] for record in read_ndjson(response)] == [course.pk]
+
+    def test_export_csv(self, authenticated_client, course, module):
+        response = authenticated_client.get(reverse('courses:course-export', args=[course.pk]),
+                                            {'export_format': 'csv'})
+
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert rows[0][:3] == ['model', 'pk', 'title']
+        assert rows[1][:3] == ['courses.course', str(course.pk), course.title]
+        assert rows[2][:2] == ['model', 'pk']
+        assert rows[3][:3] == ['courses.module', str(module.pk), module.title]
+
+    def test_non_numeric_pk(self, authenticated_client):
+        assert authenticated_client.get(reverse('courses:course-export', args=['abc'])).status_code == 404
+
+    def test_invalid_format(self, authenticated_client, course):
+        response = authenticated_client.get(reverse('courses:course-export', args=[course.pk]),
+                                            {'export_format': 'xml'})
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestUserExport:
+
+    def test_export_users_without_passwords(self, api_client, user_admin, user_student):
+        api_client.force_authenticate(user_admin)
+
+        records = read_ndjson(api_client.get(reverse('users:user_export')))
+
+        assert {record['fields']['email'] for record in records} == {user_admin.email, user_student.email}
+        assert all('password' not in record['fields'] for record in records)
+
+    def test_student_forbidden(self, api_client, user_student):
+        api_client.force_authenticate(user_student)
+
+        assert api_client.get(reverse('users:user_export')).status_code == 403
+
+
+@pytest.mark.django_db
+class TestExportContentCommand:
+
+    def test_round_trip_with_load_content(self, tmp_path, course, answer):
+        path = tmp_path / 'course.jsonl'
+        call_command('export_content', '--course', str(course.pk), '--output', str(path))
+        Course.objects.all().delete()
+
+        call_command('load_content', str(path))
+
+        assert Module.objects.get().course_id == course.pk
+        assert Answer.objects.get().text == answer.text
+
+    def test_owner_scope(self, capsys, another_user, course):
+        call_command('export_content', '--owner', another_user.email)
+
+        assert capsys.readouterr().out == ''
@@ -0,0 +1,181 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from courses.grading import build_answer_key, build_answer_keys, grade_answers, answer_key_cache, AnswerKeyCache
+from courses.models import LessonTest, Question, Answer
+
+
+def create_questions(lesson_test, count):
+    """Создание вопросов с одним правильным и одним неправильным ответом"""
+    questions = Question.objects.bulk_create(
+        Question(text=f'Вопрос {i}', lesson_test=lesson_test) for i in range(count)
+    )
+    Answer.objects.bulk_create(
+        answer
+        for question in questions
+        for answer in (Answer(question=question, text='Верно', is_correct=True),
+                       Answer(question=question, text='Неверно', is_correct=False))
+    )
+    return questions
+
+
+@pytest.mark.django_db
+class TestGrading:
+
+    def test_answer_key(self, lesson_test, question, answer):
+        Answer.objects.create(text='Wrong Answer', question=question, is_correct=False)
+        empty_question = Question.objects.create(text='No correct answer?', lesson_test=lesson_test)
+
+        assert build_answer_key(lesson_test.pk) == {question.pk: 'Test Answer', empty_question.pk: None}
+
+    def test_answer_key_first_correct_answer(self, question, answer):
+        Answer.objects.create(text='Second Answer', question=question, is_correct=True)
+
+        assert build_answer_key(question.lesson_test_id) == {question.pk: 'Test Answer'}
+
+    def test_answer_keys_missing_and_empty_tests(self, lesson, lesson_test, question, answer):
+        empty_test = LessonTest.objects.create(title='Empty', lesson=lesson)
+
+        answer_keys = build_answer_keys([lesson_test.pk, empty_test.pk, 0])
+
+        assert answer_keys == {lesson_test.pk: {question.pk: 'Test Answer'}, empty_test.pk: {}}
+
+    def test_grade_answers(self):
+        answer_key = {1: 'a', 2: 'b', 3: None}
+
+        result = grade_answers(answer_key, {'1': 'a', '2': 'c', '3': None})
+
+        assert result == {'correct_answers': 1, 'total_questions': 3}
+
+    @pytest.mark.parametrize('questions_count', [1, 10, 50])
+    def test_check_answers_constant_queries(self, authenticated_client, lesson_test, questions_count):
+        questions = create_questions(lesson_test, questions_count)
+        url = reverse('courses:lesson_test-check_answers', args=[lesson_test.id])
+        data = {'answers': {str(question.pk): 'Верно' for question in questions}}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'correct_answers': questions_count, 'total_questions': questions_count}
+        assert len(queries) == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.post(url, data, format='json')
+
+        assert response.data == {'correct_answers': questions_count, 'total_questions': questions_count}
+        assert len(queries) == 0
+
+    def test_check_answers_not_found(self, authenticated_client):
+        url = reverse('courses:lesson_test-check_answers', args=[0])
+        response = authenticated_client.post(url, {'answers': {}}, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestAnswerKeyCache:
+
+    def test_question_changes_invalidate(self, lesson, lesson_test, question, answer):
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+
+        new_question = Question.objects.create(text='New?', lesson_test=lesson_test)
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Test Answer', new_question.pk: None}
+
+        other_test = LessonTest.objects.create(title='Other', lesson=lesson)
+        assert answer_key_cache.get(other_test.pk) == {}
+        new_question.lesson_test = other_test
+        new_question.save()
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+        assert answer_key_cache.get(other_test.pk) == {new_question.pk: None}
+
+        new_question.delete()
+        assert answer_key_cache.get(other_test.pk) == {}
+
+    def test_answer_changes_invalidate(self, lesson_test, question, answer):
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+
+        answer.text = 'Changed'
+        answer.save()
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Changed'}
+
+        answer.delete()
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: None}
+
+    def test_lesson_test_delete_invalidates(self, lesson_test, question, answer):
+        test_id = lesson_test.pk
+        assert answer_key_cache.get(test_id) is not None
+
+        lesson_test.delete()
+        assert answer_key_cache.get(test_id) is None
+
+    def test_admin_edit_invalidates(self, client, user_admin, lesson_test, question, answer):
+        client.force_login(user_admin)
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+
+        url = reverse('admin:courses_answer_change', args=[answer.pk])
+        response = client.post(url, {'question': question.pk, 'text': 'Admin Answer', 'is_correct': 'on'})
+
+        assert response.status_code == status.HTTP_302_FOUND
+        assert answer_key_cache.get(lesson_test.pk) == {question.pk: 'Admin Answer'}
+
+    def test_shared_tier(self, lesson_test, question, answer):
+        first_process = AnswerKeyCache(shared_alias='default')
+        second_process = AnswerKeyCache(shared_alias='default')
+        assert first_process.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+
+        with CaptureQueriesContext(connection) as queries:
+            assert second_process.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+        assert len(queries) == 0
+
+        Answer.objects.filter(pk=answer.pk).update(text='Changed')
+        first_process.invalidate(lesson_test.pk)
+        assert second_process.get(lesson_test.pk) == {question.pk: 'Changed'}
+
+    def test_local_only_invalidated_by_token(self, lesson_test, question, answer):
+        # Оба экземпляра видят один кэш default, как процессы с общим кэшем токенов
+        first_process = AnswerKeyCache()
+        second_process = AnswerKeyCache()
+        assert second_process.get(lesson_test.pk) == {question.pk: 'Test Answer'}
+
+        Answer.objects.filter(pk=answer.pk).update(text='Changed')
+        first_process.invalidate(lesson_test.pk)
+        assert second_process.get(lesson_test.pk) == {question.pk: 'Changed'}
+
+
+@pytest.mark.django_db
+class TestCheckAnswersBatch:
+
+    def test_batch(self, authenticated_client, lesson, lesson_test, question, answer):
+        other_test = LessonTest.objects.create(title='Other', lesson=lesson)
+        other_questions = create_questions(other_test, 3)
+        url = reverse('courses:lesson_test-check_answers_batch')
+        data = {'submissions': [
+            {'test_id': other_test.pk, 'answers': {str(q.pk): 'Верно' for q in other_questions[:2]}},
+            {'test_id': 0, 'answers': {}},
+            {'test_id': lesson_test.pk, 'answers': {str(question.pk): 'Test Answer'}},
+            {'test_id': lesson_test.pk, 'answers': 'invalid_format'},
+            {'answers': {}},
+            {'test_id': other_test.pk, 'answers': {}},
+        ]}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
+        assert response.data['results'] == [
+            {'test_id': other_test.pk, 'correct_answers': 2, 'total_questions': 3},
+            {'test_id': 0, 'detail': 'Тест не найден.'},
+            {'test_id': lesson_test.pk, 'correct_answers': 1, 'total_questions': 1},
+            {'test_id': lesson_test.pk, 'detail': 'Неверный формат для ответов. Должен быть словарь..'},
+            {'test_id': None, 'detail': 'Не указан идентификатор теста.'},
+            {'test_id': other_test.pk, 'correct_answers': 0, 'total_questions': 3},
+        ]
+
+    @pytest.mark.parametrize('submissions', ['invalid_format', None, [{}] * 1001])
+    def test_batch_invalid(self, authenticated_client, submissions):
+        url = reverse('courses:lesson_test-check_answers_batch')
+        response = authenticated_client.post(url, {'submissions': submissions}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
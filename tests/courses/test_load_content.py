@@ -0,0 +1,79 @@
+import io
+import json
+import pytest
+from django.core.management import call_command, CommandError
+from courses.management.commands.load_content import iter_json_array, copy_value
+from courses.models import Course, Lesson, Question, Answer
+from users.models import User
+
+FIXTURES = ['fixtures/01_users.json', 'fixtures/02_courses.json']
+
+
+@pytest.mark.django_db
+class TestLoadContentCommand:
+
+    def test_loads_fixtures(self, capsys):
+        call_command('load_content', *FIXTURES, '--batch-size', '5')
+
+        output = capsys.readouterr().out
+        assert 'courses.Answer: 12 строк' in output
+        assert 'строк/с' in output
+        assert User.objects.count() == 4
+        assert Answer.objects.count() == 12
+        course = Course.objects.get()
+        assert course.created_at.isoformat().startswith('2024-08-23T02:40:08')
+        # Денормализованные поля, которых нет в старом дампе, заполнены по родителям
+        assert set(Answer.objects.values_list('course_id', 'owner_id')) == {(course.pk, course.owner_id)}
+        assert Lesson.objects.get().updated_at is not None
+
+    def test_keeps_fixture_values(self):
+        expected = [
+            {'pk': record['pk'], 'text': record['fields']['text'], 'lesson_test_id': record['fields']['lesson_test']}
+            for record in json.load(open(FIXTURES[1], encoding='utf-8')) if record['model'] == 'courses.question'
+        ]
+
+        call_command('load_content', *FIXTURES)
+
+        assert list(Question.objects.order_by('pk').values('pk', 'text', 'lesson_test_id')) == expected
+
+    def test_jsonl_in_any_order(self, tmp_path):
+        records = [record for path in reversed(FIXTURES) for record in json.load(open(path, encoding='utf-8'))]
+        path = tmp_path / 'dump.jsonl'
+        path.write_text('\n'.join(json.dumps(record, ensure_ascii=False) for record in records), encoding='utf-8')
+
+        call_command('load_content', str(path))
+
+        assert Question.objects.count() == 3
+        assert User.objects.get(pk=1).email == 'admin@example.com'
+
+    def test_unknown_model(self, tmp_path):
+        path = tmp_path / 'dump.jsonl'
+        path.write_text(json.dumps({'model': 'auth.group', 'pk': 1, 'fields': {}}), encoding='utf-8')
+
+        with pytest.raises(CommandError):
+            call_command('load_content', str(path))
+
+    def test_rolls_back_on_error(self, tmp_path):
+        path = tmp_path / 'dump.jsonl'
+        path.write_text(json.dumps({'model': 'courses.course', 'fields': {'title': 'Без pk'}}), encoding='utf-8')
+
+        with pytest.raises(CommandError):
+            call_command('load_content', str(path))
+        assert not Course.objects.exists()
+
+
+def test_iter_json_array_reads_in_chunks():
+    records = [{'pk': i, 'text': 'Текст, [с] {скобками} ' * i} for i in range(50)]
+
+    assert list(iter_json_array(io.StringIO(json.dumps(records, indent=2)), chunk_size=16)) == records
+
+
+def test_iter_json_array_truncated():
+    with pytest.raises(CommandError):
+        list(iter_json_array(io.StringIO('[{"pk": 1}, {"pk"'), chunk_size=4))
+
+
+def test_copy_value_escapes():
+    assert copy_value(None) == r'\N'
+    assert copy_value(True) == 't'
+    assert copy_value('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from courses.models import Question, Answer
+from courses.views import QuestionViewSet
+
+
+@pytest.fixture
+def answers(question):
+    """Ответы с повторяющимся текстом: сортировка по text неуникальна"""
+    return Answer.objects.bulk_create(
+        Answer(question=question, text=f'Ответ {i % 4}') for i in range(23)
+    )
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walk_forward_and_back(self, authenticated_client, answers):
+        expected = list(Answer.objects.order_by('text', 'pk').values_list('pk', flat=True))
+        url = reverse('courses:answer-list') + '?pagination=keyset&page_size=5'
+
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            assert not any('COUNT(' in query['sql'] for query in queries)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data['next']
+            previous = response.data['previous']
+
+        assert [pk for page in pages for pk in page] == expected
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+        back = []
+        url = previous
+        while url:
+            response = authenticated_client.get(url)
+            back.insert(0, [item['id'] for item in response.data['results']])
+            url = response.data['previous']
+        assert back == pages[:-1]
+
+    def test_long_text_ordered_by_prefix(self, authenticated_client, question):
+        prefix = 'Текст ' * 60
+        long_answers = Answer.objects.bulk_create(
+            Answer(question=question, text=prefix + suffix) for suffix in ('в' * 4000, 'б', 'а')
+        )
+        url = reverse('courses:answer-list') + '?pagination=keyset&page_size=2'
+
+        pages = []
+        while url:
+            response = authenticated_client.get(url)
+            pages += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        # Тексты с общим префиксом индекса упорядочены по pk
+        assert pages == [answer.pk for answer in long_answers]
+
+    def test_default_mode_is_page_number(self, authenticated_client, answers):
+        response = authenticated_client.get(reverse('courses:answer-list'))
+        assert response.data['count'] == len(answers)
+
+    def test_view_pagination_mode(self, monkeypatch, authenticated_client, question):
+        monkeypatch.setattr(QuestionViewSet, 'pagination_mode', 'keyset', raising=False)
+        Question.objects.bulk_create(Question(text='Вопрос', lesson_test=question.lesson_test) for _ in range(7))
+
+        response = authenticated_client.get(reverse('courses:question-list'))
+        assert 'count' not in response.data
+        assert response.data['next'] is not None
+
+        response = authenticated_client.get(reverse('courses:question-list') + '?pagination=page')
+        assert response.data['count'] == 8
+
+    def test_invalid_cursor(self, authenticated_client, answers):
+        response = authenticated_client.get(reverse('courses:answer-list') + '?cursor=invalid')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_users_list(self, api_client, user_admin, users_list):
+        api_client.force_authenticate(user=user_admin)
+        response = api_client.get(reverse('users:user_list') + '?pagination=keyset&page_size=2')
+        assert [item['id'] for item in response.data['results']] == [user.pk for user in users_list[:2]]
+
+        response = api_client.get(response.data['next'])
+        assert [item['id'] for item in response.data['results']] == [users_list[2].pk]
+        assert response.data['next'] is None
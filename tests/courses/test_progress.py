@@ -0,0 +1,179 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from courses.models import Course, Module, Lesson, LessonCompletion, CourseProgress, Enrollment
+
+
+@pytest.fixture
+def student_client(api_client, user_student, course):
+    Enrollment.objects.create(user=user_student, course=course)
+    api_client.force_authenticate(user_student)
+    return api_client
+
+
+@pytest.fixture
+def second_lesson(module):
+    return Lesson.objects.create(title='Второй урок', content='Контент', module=module)
+
+
+def complete(client, lesson):
+    return client.post(reverse('courses:lesson-complete', args=[lesson.pk]))
+
+
+@pytest.mark.django_db
+class TestLessonCompletion:
+
+    def test_complete_creates_progress(self, student_client, user_student, course, lesson, second_lesson):
+        response = complete(student_client, lesson)
+
+        assert response.status_code == 200
+        assert response.data['course'] == course.pk
+        assert (response.data['completed_lessons'], response.data['total_lessons'], response.data['percent']) == \
+            (1, 2, 50)
+        assert LessonCompletion.objects.filter(user=user_student, lesson=lesson).exists()
+
+    def test_complete_increments_counter(self, student_client, user_student, lesson, second_lesson):
+        complete(student_client, lesson)
+
+        response = complete(student_client, second_lesson)
+
+        assert (response.data['completed_lessons'], response.data['percent']) == (2, 100)
+
+    def test_repeated_completion_is_idempotent(self, student_client, user_student, lesson):
+        complete(student_client, lesson)
+
+        response = complete(student_client, lesson)
+
+        assert response.data['completed_lessons'] == 1
+        assert LessonCompletion.objects.count() == 1
+
+    def test_complete_missing_lesson(self, student_client):
+        assert student_client.post(reverse('courses:lesson-complete', args=[0])).status_code == 404
+
+    def test_anonymous_forbidden(self, api_client, lesson):
+        assert complete(api_client, lesson).status_code == 401
+
+
+@pytest.mark.django_db
+class TestProgressRead:
+
+    def test_progress_is_single_row_lookup(self, student_client, course, lesson):
+        complete(student_client, lesson)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = student_client.get(reverse('courses:course-progress', args=[course.pk]))
+
+        assert response.data['completed_lessons'] == 1
+        assert not any('courses_lesson' in query['sql'] for query in queries)
+
+    def test_progress_without_completions(self, student_client, course, lesson):
+        response = student_client.get(reverse('courses:course-progress', args=[course.pk]))
+
+        assert (response.data['completed_lessons'], response.data['total_lessons']) == (0, 1)
+
+    def test_progress_list_only_own(self, student_client, user_professor, course, lesson):
+        complete(student_client, lesson)
+        CourseProgress.objects.create(user=user_professor, course=course)
+
+        response = student_client.get(reverse('courses:progress'))
+
+        assert [item['course'] for item in response.data['results']] == [course.pk]
+
+    def test_progress_with_jwt(self, api_client, user_student, course, lesson):
+        Enrollment.objects.create(user=user_student, course=course)
+        login = api_client.post(reverse('users:login'), {'email': user_student.email, 'password': 'password'},
+                                format='json')
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login.json()["access"]}')
+
+        assert complete(api_client, lesson).status_code == 200
+        response = api_client.get(reverse('courses:progress'))
+
+        assert response.status_code == 200
+        assert [item['completed_lessons'] for item in response.data['results']] == [1]
+        assert api_client.get(reverse('courses:course-progress', args=[course.pk])).data['completed_lessons'] == 1
+
+    def test_non_numeric_pk(self, student_client):
+        assert student_client.get(reverse('courses:course-progress', args=['abc'])).status_code == 404
+        assert student_client.post(reverse('courses:lesson-complete', args=['abc'])).status_code == 404
+
+
+@pytest.mark.django_db
+class TestProgressMaintenance:
+
+    def test_new_lesson_increments_total(self, student_client, course, module, lesson):
+        complete(student_client, lesson)
+
+        Lesson.objects.create(title='Новый урок', content='Контент', module=module)
+
+        assert CourseProgress.objects.get().total_lessons == 2
+
+    def test_deleted_lesson_recalculates(self, student_client, lesson, second_lesson):
+        complete(student_client, lesson)
+        complete(student_client, second_lesson)
+
+        lesson.delete()
+
+        progress = CourseProgress.objects.get()
+        assert (progress.completed_lessons, progress.total_lessons) == (1, 1)
+
+    def test_moved_module_recalculates_both_courses(self, student_client, user_student, user, course, module,
+                                                    lesson):
+        complete(student_client, lesson)
+        other = Course.objects.create(title='Другой курс', description='Описание', owner=user)
+        Enrollment.objects.create(user=user_student, course=other)
+        Lesson.objects.create(title='Урок', content='Контент',
+                              module=Module.objects.create(title='Модуль', course=other))
+        complete(student_client, Lesson.objects.get(course=other))
+
+        module.course = other
+        module.save()
+
+        progress = dict(CourseProgress.objects.values_list('course_id', 'completed_lessons'))
+        assert progress == {course.pk: 0, other.pk: 2}
+        assert CourseProgress.objects.get(course=other).total_lessons == 2
+
+    def test_module_deletion_recalculates(self, student_client, user, course, module, lesson):
+        complete(student_client, lesson)
+        Lesson.objects.create(title='Урок', content='Контент',
+                              module=Module.objects.create(title='Модуль', course=course))
+        student_client.force_authenticate(user)
+
+        student_client.delete(reverse('courses:module-detail', args=[module.pk]))
+
+        progress = CourseProgress.objects.get()
+        assert (progress.completed_lessons, progress.total_lessons) == (0, 1)
+        assert not LessonCompletion.objects.exists()
+
+    def test_course_deletion_removes_progress(self, student_client, user, course, lesson):
+        complete(student_client, lesson)
+        student_client.force_authenticate(user)
+
+        student_client.delete(reverse('courses:course-detail', args=[course.pk]))
+
+        assert not CourseProgress.objects.exists()
+        assert not LessonCompletion.objects.exists()
+
+
+@pytest.mark.django_db
+class TestReconcileProgressCommand:
+
+    def test_repairs_drift_and_missing_rows(self, capsys, user_student, user_professor, course, lesson, second_lesson):
+        LessonCompletion.objects.create(user=user_student, lesson=lesson)
+        LessonCompletion.objects.create(user=user_professor, lesson=lesson)
+        CourseProgress.objects.create(user=user_student, course=course, completed_lessons=5, total_lessons=7)
+
+        call_command('reconcile_progress')
+
+        assert capsys.readouterr().out == 'Создано строк прогресса: 1, исправлено: 2\n'
+        assert set(CourseProgress.objects.values_list('user_id', 'completed_lessons', 'total_lessons')) == {
+            (user_student.pk, 1, 2), (user_professor.pk, 1, 2),
+        }
+
+    def test_consistent_rows_untouched(self, capsys, student_client, lesson):
+        complete(student_client, lesson)
+
+        call_command('reconcile_progress', '--course', str(lesson.course_id))
+
+        assert capsys.readouterr().out == 'Создано строк прогресса: 0, исправлено: 0\n'
@@ -0,0 +1,128 @@
+import json
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory
+from courses.denormalization import DENORMALIZED_OWNERS, repair
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer
+from courses.paginations import KeysetPagination
+from courses.views import CourseViewSet, ModuleViewSet, LessonViewSet, LessonTestViewSet, QuestionViewSet, \
+    AnswerViewSet
+from tests.conftest import UserFactory
+from users.models import User
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'postgresql',
+                                reason='Проверка планов запросов выполняется только на PostgreSQL')
+
+# Последовательное чтение или сортировка большего числа строк считается регрессией
+ROWS_THRESHOLD = 1000
+VIEWSETS = [CourseViewSet, ModuleViewSet, LessonViewSet, LessonTestViewSet, QuestionViewSet, AnswerViewSet]
+
+
+# Объемы таблиц: заметно больше порога, но достаточно малы, чтобы набор создавался быстро
+ROWS = {Course: 2000, Module: 2000, Lesson: 3000, LessonTest: 3000, Question: 4000, Answer: 6000}
+
+
+@pytest.fixture(scope='module')
+def dataset(django_db_setup, django_db_blocker):
+    """
+    Набор данных, на котором планировщик предпочитает индексы последовательному чтению.
+
+    Создается один раз на модуль вне транзакций тестов и удаляется после них.
+    """
+    with django_db_blocker.unblock():
+        owners = [UserFactory.create(is_staff=False) for _ in range(5)]
+        courses = Course.objects.bulk_create(
+            Course(title=f'Курс {i:05}', description='Описание', owner=owners[i % len(owners)])
+            for i in range(ROWS[Course])
+        )
+        modules = Module.objects.bulk_create(
+            Module(title=f'Модуль {i:05}', course=courses[i % len(courses)]) for i in range(ROWS[Module])
+        )
+        lessons = Lesson.objects.bulk_create(
+            Lesson(title=f'Урок {i:05}', content='Контент', module=modules[i % len(modules)])
+            for i in range(ROWS[Lesson])
+        )
+        tests = LessonTest.objects.bulk_create(
+            LessonTest(title=f'Тест {i:05}', lesson=lessons[i % len(lessons)]) for i in range(ROWS[LessonTest])
+        )
+        questions = Question.objects.bulk_create(
+            Question(text=f'Вопрос {i:05}', lesson_test=tests[i % len(tests)]) for i in range(ROWS[Question])
+        )
+        Answer.objects.bulk_create(
+            Answer(text=f'Ответ {i:05}', question=questions[i % len(questions)], is_correct=i % 4 == 0)
+            for i in range(ROWS[Answer])
+        )
+        # bulk_create не отправляет сигналы, денормализованные курс и владелец заполняются отдельно
+        for model in DENORMALIZED_OWNERS:
+            repair(model)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        yield owners
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {", ".join(model._meta.db_table for model in ROWS)} CASCADE')
+        User.objects.filter(pk__in=[owner.pk for owner in owners]).delete()
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [table])
+        return cursor.fetchone()[0]
+
+
+def assert_indexed(queryset):
+    """Проверка, что в плане нет последовательного чтения и явной сортировки больших объемов"""
+    plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+    for node in plan_nodes(plan):
+        if node['Node Type'] == 'Seq Scan':
+            assert table_rows(node['Relation Name']) <= ROWS_THRESHOLD, \
+                f'Seq Scan по {node["Relation Name"]}: {queryset.query}'
+        if node['Node Type'] in ('Sort', 'Incremental Sort'):
+            assert node['Plans'][0]['Plan Rows'] <= ROWS_THRESHOLD, f'Сортировка: {queryset.query}'
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.mark.parametrize('viewset', VIEWSETS)
+    def test_list_first_page(self, dataset, viewset):
+        assert_indexed(viewset.queryset.all()[:10])
+
+    @pytest.mark.parametrize('viewset', VIEWSETS)
+    def test_list_deep_keyset_page(self, dataset, viewset):
+        queryset = viewset.queryset.all()
+        ordering = KeysetPagination.get_ordering(queryset)
+        middle = queryset.order_by(*ordering)[queryset.count() // 2]
+        position = [getattr(middle, field.lstrip('-')) for field in ordering]
+        page = queryset.order_by(*ordering).filter(KeysetPagination.get_position_filter(ordering, position))
+        assert_indexed(page[:10])
+
+    @pytest.mark.parametrize('viewset', VIEWSETS)
+    def test_detail(self, dataset, viewset):
+        pk = viewset.queryset.model.objects.order_by('-pk').values_list('pk', flat=True).first()
+        assert_indexed(viewset.queryset.filter(pk=pk))
+
+    @pytest.mark.parametrize('model', [Course, Module, Lesson, LessonTest, Question, Answer])
+    @pytest.mark.parametrize('is_staff', [True, False])
+    def test_admin_changelist(self, dataset, model, is_staff):
+        request = RequestFactory().get('/admin/')
+        request.user = dataset[0]
+        request.user.is_staff = is_staff
+        model_admin = admin.site._registry[model]
+        queryset = model_admin.get_queryset(request).order_by('-pk')
+        assert_indexed(queryset[:model_admin.list_per_page])
+
+
+@pytest.mark.django_db
+def test_long_text_fits_index(lesson_test):
+    question = Question.objects.create(text='Вопрос ' * 1000, lesson_test=lesson_test)
+    Answer.objects.create(text='Ответ ' * 1000, question=question)
+    assert_indexed(QuestionViewSet.queryset.all()[:10])
@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from courses.models import Lesson, Module
+from courses.serializers import LessonSerializer
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_list_hit(self, monkeypatch, authenticated_client, lesson):
+        url = reverse('courses:lesson-list')
+        response = authenticated_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Сериализатор не должен вызываться')
+
+        with monkeypatch.context() as patch, CaptureQueriesContext(connection) as queries:
+            patch.setattr(LessonSerializer, 'to_representation', fail)
+            cached = authenticated_client.get(url)
+        assert cached.status_code == status.HTTP_200_OK
+        assert cached['X-Cache'] == 'HIT'
+        assert cached.json() == response.json()
+        assert cached['ETag'] == response['ETag']
+        assert len(queries) == 0
+
+    def test_key_includes_query_params(self, authenticated_client, lesson):
+        url = reverse('courses:lesson-list')
+        authenticated_client.get(url, {'page': 1, 'page_size': 2})
+        assert authenticated_client.get(url, {'page_size': 2, 'page': 1})['X-Cache'] == 'HIT'
+        assert authenticated_client.get(url, {'page': 1, 'page_size': 3})['X-Cache'] == 'MISS'
+
+    def test_key_includes_role(self, api_client, user_admin, user, lesson):
+        url = reverse('courses:lesson-detail', args=[lesson.id])
+        api_client.force_authenticate(user=user_admin)
+        assert api_client.get(url)['X-Cache'] == 'MISS'
+        api_client.force_authenticate(user=user)
+        assert api_client.get(url)['X-Cache'] == 'MISS'
+        assert api_client.get(url)['X-Cache'] == 'HIT'
+
+    def test_invalidated_on_save_and_delete(self, authenticated_client, module, lesson):
+        url = reverse('courses:lesson-list')
+        authenticated_client.get(url)
+
+        other = Lesson.objects.create(title='Другой урок', content='Контент', module=module)
+        response = authenticated_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+        other.delete()
+        response = authenticated_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
+
+    def test_other_models_not_invalidated(self, authenticated_client, course, lesson):
+        url = reverse('courses:lesson-detail', args=[lesson.id])
+        authenticated_client.get(url)
+        Module.objects.create(title='Другой модуль', course=course)
+        assert authenticated_client.get(url)['X-Cache'] == 'HIT'
+
+    def test_conditional_hit(self, authenticated_client, lesson):
+        url = reverse('courses:lesson-detail', args=[lesson.id])
+        etag = authenticated_client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['X-Cache'] == 'HIT'
+        assert len(queries) == 0
+
+    def test_not_found_not_cached(self, authenticated_client):
+        url = reverse('courses:lesson-detail', args=[0])
+        authenticated_client.get(url)
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert 'X-Cache' not in response
+
+    def test_stats(self, authenticated_client, lesson):
+        url = reverse('courses:lesson-list')
+        authenticated_client.get(url)
+        authenticated_client.get(url)
+        authenticated_client.get(url)
+
+        response = authenticated_client.get(reverse('courses:cache_stats'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3}
+
+    def test_stats_forbidden(self, api_client, user_student):
+        api_client.force_authenticate(user=user_student)
+        response = api_client.get(reverse('courses:cache_stats'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from courses.models import Course, Lesson, Question, Enrollment
+
+postgresql_only = pytest.mark.skipif(connection.vendor != 'postgresql',
+                                     reason='Полнотекстовый поиск работает только на PostgreSQL')
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    @postgresql_only
+    def test_search_ranked(self, authenticated_client, course, module, lesson_test):
+        Course.objects.filter(pk=course.pk).update(title='Программирование на Python')
+        lesson = Lesson.objects.create(title='Коллекции', content='Словари в программировании на Python',
+                                       module=module)
+        question = Question.objects.create(text='Что такое словарь?', lesson_test=lesson_test)
+
+        response = authenticated_client.get(reverse('courses:search'), {'q': 'программирования'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [(item['type'], item['id']) for item in response.data['results']] == \
+               [('course', course.id), ('lesson', lesson.id)]
+        assert all(item['course_id'] == course.id for item in response.data['results'])
+
+        response = authenticated_client.get(reverse('courses:search'), {'q': 'словари'})
+        assert {(item['type'], item['id']) for item in response.data['results']} == \
+               {('lesson', lesson.id), ('question', question.id)}
+
+    @postgresql_only
+    def test_search_vector_follows_updates(self, authenticated_client, lesson):
+        lesson.content = 'Декораторы и замыкания'
+        lesson.save()
+
+        response = authenticated_client.get(reverse('courses:search'), {'q': 'декоратор'})
+        assert [item['id'] for item in response.data['results']] == [lesson.id]
+
+    @postgresql_only
+    def test_search_scoped_to_enrollments(self, api_client, user_student, user, lesson):
+        lesson.content = 'Декораторы и замыкания'
+        lesson.save()
+        other = Course.objects.create(title='Декораторы', description='Описание', owner=user)
+        api_client.force_authenticate(user_student)
+
+        assert api_client.get(reverse('courses:search'), {'q': 'декоратор'}).data['results'] == []
+
+        Enrollment.objects.create(user=user_student, course=lesson.course)
+        response = api_client.get(reverse('courses:search'), {'q': 'декоратор'})
+        assert [(item['type'], item['id']) for item in response.data['results']] == [('lesson', lesson.id)]
+        assert other.id not in [item['course_id'] for item in response.data['results']]
+
+    def test_search_requires_query(self, authenticated_client):
+        response = authenticated_client.get(reverse('courses:search'))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,100 @@
+import posixpath
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from courses.models import Course, Module
+from courses.storage import content_storage
+from courses.thumbnails import variant_name
+from courses.views import serve_content
+from tests.courses.test_thumbnails import make_image
+
+
+@pytest.mark.django_db
+class TestContentStorage:
+
+    def test_deduplicated(self, course, module):
+        course.preview.save('banner.png', make_image())
+        module.preview.save('other-name.PNG', make_image())
+        assert course.preview.name == module.preview.name
+        assert course.preview.name.startswith('courses/cas/')
+        assert course.preview.name.endswith('.png')
+        assert content_storage.listdir(posixpath.dirname(course.preview.name))[1] == [
+            posixpath.basename(course.preview.name)]
+
+    def test_different_content(self, course, module):
+        course.preview.save('banner.png', make_image(100, 100))
+        module.preview.save('banner.png', make_image(200, 100))
+        assert course.preview.name != module.preview.name
+
+    def test_released_with_last_reference(self, django_capture_on_commit_callbacks, course, module):
+        with django_capture_on_commit_callbacks(execute=True):
+            course.preview.save('banner.png', make_image())
+            module.preview.save('banner.png', make_image())
+        name = course.preview.name
+        assert default_storage.exists(variant_name(name, 160, 'webp'))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            course.preview = 'courses/course/course_example.jpg'
+            course.save()
+        assert content_storage.exists(name)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            module.delete()
+        assert not content_storage.exists(name)
+        assert not default_storage.exists(variant_name(name, 160, 'webp'))
+
+    def test_default_not_deleted(self, django_capture_on_commit_callbacks, course):
+        name = 'courses/course/course_example.jpg'
+        default_storage.save(name, make_image(mode='RGB', fmt='JPEG'))
+        Course.objects.exclude(pk=course.pk).delete()
+        with django_capture_on_commit_callbacks(execute=True):
+            course.delete()
+        assert not Course.objects.exists()
+        assert content_storage.exists(name)
+
+    def test_serve_immutable(self, rf, course):
+        course.preview.save('banner.png', make_image())
+        path = course.preview.name.removeprefix(f'{content_storage.prefix}/')
+        response = serve_content(rf.get(f'/media/{course.preview.name}'), path)
+        assert response.status_code == 200
+        assert 'immutable' in response['Cache-Control']
+        assert 'max-age=31536000' in response['Cache-Control']
+        with pytest.raises(Http404):
+            serve_content(rf.get('/media/courses/cas/00/missing.png'), '00/missing.png')
+
+    def test_served_by_django_only_in_debug(self, client, course):
+        course.preview.save('banner.png', make_image())
+        assert client.get(f'/media/{course.preview.name}').status_code == 404
+
+    def test_dedupe_media(self, django_capture_on_commit_callbacks, course, module, capsys):
+        first = default_storage.save('courses/course/a.png', make_image())
+        second = default_storage.save('courses/module/b.png', make_image())
+        Course.objects.filter(pk=course.pk).update(preview=first)
+        Module.objects.filter(pk=module.pk).update(preview=second)
+        updated_at = Course.objects.get(pk=course.pk).updated_at
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('dedupe_media')
+        assert 'Перенесено превью: 2' in capsys.readouterr().out
+        course.refresh_from_db()
+        module.refresh_from_db()
+        assert course.preview.name == module.preview.name
+        assert course.updated_at > updated_at
+        assert content_storage.exists(course.preview.name)
+        assert not default_storage.exists(first)
+        assert not default_storage.exists(second)
+
+    def test_referenced_not_deleted(self, course):
+        assert not content_storage.delete('')
+        Course.objects.filter(pk=course.pk).update(preview='courses/cas/00/referenced.png')
+        assert not content_storage.delete('courses/cas/00/referenced.png')
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql',
+                        reason='Рекомендательные блокировки есть только в PostgreSQL')
+    def test_save_locks_name_until_commit(self, course):
+        course.preview.save('banner.png', make_image())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()")
+            assert cursor.fetchone()[0] == 1
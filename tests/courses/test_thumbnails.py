@@ -0,0 +1,103 @@
+import io
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+from courses.models import Course, Module
+from courses import thumbnails
+from courses.thumbnails import generate_variants, variant_name
+
+
+def make_image(width=1000, height=500, mode='RGBA', fmt='PNG'):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), (255, 0, 0, 128) if mode == 'RGBA' else 'red').save(buffer, format=fmt)
+    return ContentFile(buffer.getvalue())
+
+
+def open_variant(name, width, fmt):
+    with default_storage.open(variant_name(name, width, fmt)) as file, Image.open(file) as image:
+        return image.format, image.size
+
+
+@pytest.mark.django_db
+class TestThumbnails:
+
+    def test_generate_variants(self, settings):
+        name = default_storage.save('courses/course/preview.png', make_image())
+        created = generate_variants(name)
+        assert len(created) == len(settings.THUMBNAIL_WIDTHS) * len(settings.THUMBNAIL_FORMATS)
+        assert open_variant(name, 320, 'webp') == ('WEBP', (320, 160))
+        assert open_variant(name, 160, 'jpeg') == ('JPEG', (160, 80))
+        assert generate_variants(name) == []
+
+    def test_no_upscale(self):
+        name = default_storage.save('courses/course/small.jpg', make_image(200, 100, 'RGB', 'JPEG'))
+        generate_variants(name)
+        assert open_variant(name, 640, 'jpeg') == ('JPEG', (200, 100))
+
+    def test_broken_image(self):
+        name = default_storage.save('courses/course/broken.jpg', ContentFile(b'not an image'))
+        assert generate_variants(name) == []
+        assert generate_variants('courses/course/missing.jpg') == []
+
+    def test_generated_on_upload(self, django_capture_on_commit_callbacks, user):
+        with django_capture_on_commit_callbacks(execute=True):
+            course = Course.objects.create(title='Курс', description='Описание', owner=user)
+            course.preview.save('upload.png', make_image())
+        assert default_storage.exists(variant_name(course.preview.name, 160, 'webp'))
+
+    def test_serializer_variants(self, authenticated_client, course):
+        course.preview = default_storage.save('courses/course/lazy.png', make_image())
+        Course.objects.filter(pk=course.pk).update(preview=course.preview)
+        url = reverse('courses:course-detail', args=[course.id])
+
+        # Отсутствующие копии заменяются оригиналом и создаются при первом обращении
+        response = authenticated_client.get(url)
+        variants = response.json()['preview_variants']
+        assert variants['webp']['320'].endswith('/media/courses/course/lazy.png')
+        assert default_storage.exists(variant_name('courses/course/lazy.png', 320, 'webp'))
+
+        # Создание копий сбрасывает кэш ответа и меняет ETag
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert (response.status_code, response['X-Cache']) == (200, 'MISS')
+        variants = response.json()['preview_variants']
+        assert variants['webp']['320'] == 'http://testserver/media/courses/course/thumbnails/lazy-320.webp'
+        assert set(variants['jpeg']) == {'160', '320', '640'}
+
+    def test_variants_refresh_course_tree(self, authenticated_client, course, module):
+        Module.objects.filter(pk=module.pk).update(preview=default_storage.save('courses/module/lazy.png',
+                                                                                make_image()))
+        url = reverse('courses:course-tree', args=[course.id])
+
+        variants = authenticated_client.get(url).json()['modules'][0]['preview_variants']
+        assert variants['webp']['160'].endswith('/media/courses/module/lazy.png')
+
+        variants = authenticated_client.get(url).json()['modules'][0]['preview_variants']
+        assert variants['webp']['160'].endswith('/media/courses/module/thumbnails/lazy-160.webp')
+
+    def test_broken_preview_not_retried(self, monkeypatch, caplog):
+        name = default_storage.save('courses/course/broken.png', ContentFile(b'not an image'))
+
+        for _ in range(3):
+            assert thumbnails.variant_urls(name)['webp']['160'].endswith('/media/courses/course/broken.png')
+        assert len(caplog.records) == 1
+
+        # После истечения паузы оригинал снова ставится в очередь
+        monkeypatch.setattr(thumbnails._failed, 'timeout', 0)
+        thumbnails._failed.set(name, True)
+        thumbnails.variant_urls(name)
+        assert len(caplog.records) == 2
+
+    def test_backfill_command(self, capsys):
+        default_storage.save('courses/course/a.png', make_image())
+        default_storage.save('courses/lesson/b.jpg', make_image(mode='RGB', fmt='JPEG'))
+        default_storage.save('courses/lesson/notes.txt', ContentFile(b'text'))
+
+        call_command('generate_thumbnails')
+        assert 'Обработано изображений: 2, создано копий: 12' in capsys.readouterr().out
+        assert default_storage.exists(variant_name('courses/lesson/b.jpg', 640, 'webp'))
+
+        call_command('generate_thumbnails')
+        assert 'создано копий: 0' in capsys.readouterr().out
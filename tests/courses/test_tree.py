@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from courses.models import Course, Module, Lesson, LessonTest, Question, Answer, Enrollment
+
+
+def create_tree(course, size):
+    """Создание дерева курса: size модулей, уроков, тестов, вопросов и ответов на каждом уровне"""
+    for i in range(size):
+        module = Module.objects.create(title=f'Модуль {i}', course=course)
+        for j in range(size):
+            lesson = Lesson.objects.create(title=f'Урок {j}', content='Контент', module=module)
+            lesson_test = LessonTest.objects.create(title=f'Тест {j}', lesson=lesson)
+            for k in range(size):
+                question = Question.objects.create(text=f'Вопрос {k}', lesson_test=lesson_test)
+                Answer.objects.create(text='Верно', question=question, is_correct=True)
+
+
+@pytest.mark.django_db
+class TestCourseTree:
+
+    def test_tree(self, authenticated_client, course, module, lesson, lesson_test, question, answer):
+        url = reverse('courses:course-tree', args=[course.id])
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['title'] == course.title
+        lesson_data = response.data['modules'][0]['lessons'][0]
+        assert lesson_data['title'] == lesson.title
+        question_data = lesson_data['tests'][0]['questions'][0]
+        assert question_data['text'] == question.text
+        assert question_data['answers'] == [{'id': answer.id, 'text': answer.text, 'is_correct': True}]
+
+    def test_tree_hides_correct_answers_for_students(self, api_client, user_student, course, answer):
+        Enrollment.objects.create(user=user_student, course=course)
+        api_client.force_authenticate(user=user_student)
+        url = reverse('courses:course-tree', args=[course.id])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        answer_data = response.data['modules'][0]['lessons'][0]['tests'][0]['questions'][0]['answers'][0]
+        assert answer_data == {'id': answer.id, 'text': answer.text}
+
+    def test_tree_requires_enrollment(self, api_client, user_student, course):
+        api_client.force_authenticate(user=user_student)
+        url = reverse('courses:course-tree', args=[course.id])
+
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('size', [1, 3])
+    def test_tree_constant_queries(self, authenticated_client, course, size):
+        create_tree(course, size)
+        url = reverse('courses:course-tree', args=[course.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 6
+
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_client.get(url)
+        assert len(queries) == 0
+
+    def test_tree_invalidation(self, authenticated_client, course, module, lesson, lesson_test, question, answer):
+        url = reverse('courses:course-tree', args=[course.id])
+        authenticated_client.get(url)
+
+        answer.text = 'Changed'
+        answer.save()
+        response = authenticated_client.get(url)
+        assert response.data['modules'][0]['lessons'][0]['tests'][0]['questions'][0]['answers'][0]['text'] == \
+               'Changed'
+
+        lesson.delete()
+        response = authenticated_client.get(url)
+        assert response.data['modules'][0]['lessons'] == []
+
+    def test_tree_module_move_invalidates_both_courses(self, authenticated_client, user, course, module):
+        other_course = Course.objects.create(title='Other', description='Other', owner=user)
+        authenticated_client.get(reverse('courses:course-tree', args=[course.id]))
+        authenticated_client.get(reverse('courses:course-tree', args=[other_course.id]))
+
+        module.course = other_course
+        module.save()
+
+        response = authenticated_client.get(reverse('courses:course-tree', args=[course.id]))
+        assert response.data['modules'] == []
+        response = authenticated_client.get(reverse('courses:course-tree', args=[other_course.id]))
+        assert [item['id'] for item in response.data['modules']] == [module.id]
+
+    def test_tree_not_found(self, authenticated_client):
+        response = authenticated_client.get(reverse('courses:course-tree', args=[0]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,94 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import ClaimsUser
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def login(api_client, user):
+    response = api_client.post(reverse('users:login'), {'email': user.email, 'password': 'password'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def user_queries(queries):
+    return [query['sql'] for query in queries if 'users_user' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+
+    def test_login_claims(self, api_client, user_professor):
+        token = AccessToken(login(api_client, user_professor)['access'])
+        assert token['role'] == User.UsersRolesChoices.PROFESSOR
+        assert token['is_staff'] is True
+        assert token['is_superuser'] is False
+
+    def test_no_user_lookup(self, api_client, user_professor):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login(api_client, user_professor)["access"]}')
+        url = reverse('courses:course-list')
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert user_queries(queries) == []
+
+    def test_permissions(self, api_client, user_student, user_professor):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login(api_client, user_student)["access"]}')
+        assert api_client.post(reverse('courses:course-list'), {}).status_code == status.HTTP_403_FORBIDDEN
+        assert api_client.get(reverse('users:user_detail', args=[user_student.pk])).status_code == status.HTTP_200_OK
+        assert api_client.get(reverse('users:user_detail', args=[user_professor.pk])).status_code == \
+               status.HTTP_403_FORBIDDEN
+
+    def test_deactivation(self, api_client, user_professor):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {login(api_client, user_professor)["access"]}')
+        url = reverse('courses:course-list')
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        # Изменение в обход сигналов действует после истечения кэша
+        User.objects.filter(pk=user_professor.pk).update(is_active=False)
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        cache.clear()
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+        user_professor.is_active = True
+        user_professor.save()
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        user_professor.is_active = False
+        user_professor.save()
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_updates_claims(self, api_client, user_student):
+        tokens = login(api_client, user_student)
+        user_student.role = User.UsersRolesChoices.PROFESSOR
+        user_student.is_staff = True
+        user_student.save()
+
+        response = api_client.post(reverse('users:token_refresh'), {'refresh': tokens['refresh']}, format='json')
+        token = AccessToken(response.json()['access'])
+        assert token['role'] == User.UsersRolesChoices.PROFESSOR
+        assert token['is_staff'] is True
+
+    def test_token_without_claims(self, api_client, user_admin):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user_admin)}')
+        assert api_client.get(reverse('courses:course-list')).status_code == status.HTTP_200_OK
+
+    def test_claims_user_full_row(self, user_student):
+        token = AccessToken(str(AccessToken.for_user(user_student)))
+        token['role'], token['is_staff'], token['is_superuser'] = 'student', False, False
+        claims_user = ClaimsUser(token)
+        assert claims_user == user_student
+        assert claims_user.pk == user_student.pk
+        assert claims_user.role == 'student'
+        assert claims_user.email == user_student.email
+        assert str(claims_user) == user_student.email
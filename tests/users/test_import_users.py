@@ -0,0 +1,58 @@
+import json
+import pytest
+from django.core.management import call_command
+from users.models import User
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'users.csv'
+    path.write_text(
+        'email,user_name,first_name,last_name,role,password\n'
+        'admin@example.com,admin,Админ,Админов,admin,secret123\n'
+        'prof@example.com,prof,Иван,Иванов,professor,secret123\n'
+        'student@example.com,student,Петр,Петров,,secret123\n'
+        'student@example.com,student2,Петр,Петров,student,secret123\n'
+        'bad@example.com,bad,Bad,Role,guest,secret123\n',
+        encoding='utf-8',
+    )
+    return path
+
+
+@pytest.mark.django_db
+class TestImportUsers:
+
+    def test_import_csv(self, csv_file, capsys):
+        call_command('import_users', str(csv_file), '--workers', '2', '--chunk-size', '2')
+        output = capsys.readouterr()
+        assert 'Обработано: 5, создано: 3, пропущено: 1, ошибок: 1' in output.out
+        assert 'Строка 6: неизвестная роль guest' in output.err
+
+        admin = User.objects.get(email='admin@example.com')
+        assert (admin.is_staff, admin.is_superuser) == (True, True)
+        professor = User.objects.get(email='prof@example.com')
+        assert (professor.is_staff, professor.is_superuser) == (True, False)
+        student = User.objects.get(email='student@example.com')
+        assert student.role == User.UsersRolesChoices.STUDENT
+        assert (student.is_staff, student.is_superuser) == (False, False)
+        assert student.check_password('secret123')
+
+    def test_import_jsonl_skips_existing(self, tmp_path, user_student, capsys):
+        path = tmp_path / 'users.jsonl'
+        records = [
+            {'email': user_student.email, 'user_name': 'other', 'first_name': 'A', 'last_name': 'B'},
+            {'email': 'new@example.com', 'user_name': user_student.user_name, 'first_name': 'A', 'last_name': 'B'},
+            {'email': 'new2@example.com', 'user_name': 'new2', 'first_name': 'A', 'last_name': 'B'},
+        ]
+        path.write_text('\n'.join(json.dumps(record) for record in records) + '\n[]\n', encoding='utf-8')
+
+        call_command('import_users', str(path), '--workers', '1')
+        assert 'Обработано: 4, создано: 1, пропущено: 2, ошибок: 1' in capsys.readouterr().out
+        user = User.objects.get(email='new2@example.com')
+        assert not user.has_usable_password()
+
+    def test_matches_registration(self):
+        for role, expected in [('admin', (True, True)), ('professor', (True, False)), ('student', (False, False))]:
+            user = User(role=role)
+            user.apply_role()
+            assert (user.is_staff, user.is_superuser) == expected
@@ -0,0 +1,68 @@
+import datetime
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from users import last_login
+from users.last_login import LastLoginBuffer, write_last_logins
+from users.models import User
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """Буфер без фонового потока: в тестах записи сбрасываются явно"""
+    buffer = LastLoginBuffer(flush_interval=60, max_pending=100, background=False)
+    monkeypatch.setattr(last_login, 'last_login_buffer', buffer)
+    return buffer
+
+
+@pytest.mark.django_db
+class TestLastLogin:
+
+    def test_login_buffered(self, api_client, buffer, user_student):
+        response = api_client.post(reverse('users:login'), {'email': user_student.email, 'password': 'password'},
+                                   format='json')
+        assert response.status_code == status.HTTP_200_OK
+        user_student.refresh_from_db()
+        assert user_student.last_login is None
+        assert len(buffer) == 1
+
+        assert buffer.flush() == 1
+        user_student.refresh_from_db()
+        assert user_student.last_login is not None
+
+    def test_single_update(self, buffer, users_list):
+        now = timezone.now()
+        for user in users_list:
+            buffer.add(user.pk, now)
+            buffer.add(user.pk, now - datetime.timedelta(minutes=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            assert buffer.flush() == len(users_list)
+        assert len(queries) == 1
+        assert list(User.objects.values_list('last_login', flat=True).distinct()) == [now]
+
+    def test_never_moves_back(self, user_student):
+        now = timezone.now()
+        User.objects.filter(pk=user_student.pk).update(last_login=now)
+        write_last_logins({user_student.pk: now - datetime.timedelta(hours=1)})
+        user_student.refresh_from_db()
+        assert user_student.last_login == now
+
+    def test_flush_by_staleness(self, buffer, user_student):
+        buffer.flush_interval = 0
+        buffer.add(user_student.pk)
+        assert len(buffer) == 0
+        user_student.refresh_from_db()
+        assert user_student.last_login is not None
+
+    def test_failed_flush_kept(self, monkeypatch, buffer, user_student):
+        def fail(last_logins):
+            raise RuntimeError('database is down')
+
+        buffer.add(user_student.pk)
+        monkeypatch.setattr(last_login, 'write_last_logins', fail)
+        assert buffer.flush() == 0
+        assert len(buffer) == 1
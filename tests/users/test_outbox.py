@@ -0,0 +1,104 @@
+import datetime
+import pytest
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from users import outbox
+from users.models import OutgoingEmail
+from users.outbox import queue_email, send_batch
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Учет SMTP-соединений, открытых при отправке"""
+    opened = []
+    get_connection = outbox.get_connection
+
+    def counting_get_connection(*args, **kwargs):
+        connection = get_connection(*args, **kwargs)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(outbox, 'get_connection', counting_get_connection)
+    return opened
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_password_reset_queued(self, api_client, user_student):
+        response = api_client.post(reverse('users:password_reset'), data={'email': user_student.email})
+        assert response.status_code == 200
+        assert mail.outbox == []
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == [user_student.email]
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == 'Сброс пароля'
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.body) == (OutgoingEmail.StatusChoices.SENT, '')
+
+    def test_one_connection_per_batch(self, connections):
+        for i in range(5):
+            queue_email(f'Письмо {i}', 'Текст', [f'user{i}@example.com'])
+
+        assert send_batch(batch_size=3) == (3, 0)
+        assert send_batch(batch_size=3) == (2, 0)
+        assert send_batch(batch_size=3) == (0, 0)
+        assert len(connections) == 2
+        assert [message.subject for message in mail.outbox] == [f'Письмо {i}' for i in range(5)]
+
+    def test_retry_with_backoff(self, monkeypatch, settings):
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        email = queue_email('Письмо', 'Текст', ['user@example.com'])
+
+        def fail(self, *args, **kwargs):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(outbox.EmailMessage, 'send', fail)
+        assert send_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.StatusChoices.PENDING
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at > timezone.now() + datetime.timedelta(seconds=settings.OUTBOX_RETRY_DELAY - 5)
+
+        # До наступления времени повтора письмо не берется
+        assert send_batch() == (0, 0)
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert send_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.StatusChoices.FAILED
+
+    def test_connection_failure(self, monkeypatch):
+        queue_email('Письмо', 'Текст', ['user@example.com'])
+
+        def fail(self):
+            raise OSError('handshake')
+
+        monkeypatch.setattr(locmem.EmailBackend, 'open', fail)
+        assert send_batch() == (0, 1)
+        assert OutgoingEmail.objects.get().attempts == 1
+
+    def test_purge_old_emails(self, settings):
+        old = timezone.now() - datetime.timedelta(seconds=settings.OUTBOX_RETENTION + 1)
+        for status in OutgoingEmail.StatusChoices:
+            email = queue_email(f'Письмо {status}', 'Текст', ['user@example.com'])
+            OutgoingEmail.objects.filter(pk=email.pk).update(status=status, created_at=old,
+                                                             next_attempt_at=timezone.now() + outbox.retry_delay(1))
+        queue_email('Новое письмо', 'Текст', ['user@example.com'])
+        OutgoingEmail.objects.filter(subject='Новое письмо').update(status=OutgoingEmail.StatusChoices.SENT)
+
+        call_command('send_outbox')
+
+        assert sorted(OutgoingEmail.objects.values_list('subject', flat=True)) == \
+               ['Новое письмо', 'Письмо pending']
+
+    def test_retry_delay_capped(self, settings):
+        assert outbox.retry_delay(1) == datetime.timedelta(seconds=settings.OUTBOX_RETRY_DELAY)
+        assert outbox.retry_delay(3) == datetime.timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 4)
+        assert outbox.retry_delay(50) == datetime.timedelta(seconds=settings.OUTBOX_MAX_DELAY)
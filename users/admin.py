@@ -1,5 +1,5 @@
 from django.contrib import admin
-from users.models import User
+from users.models import User, OutgoingEmail
 
 
 @admin.register(User)
@@ -7,3 +7,10 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user_name', 'first_name', 'last_name', 'email', 'phone', 'role', 'is_active',)
     list_filter = ('is_active', 'role',)
     search_fields = ('email', 'phone', 'user_name',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at',)
+    list_filter = ('status',)
+    search_fields = ('subject',)
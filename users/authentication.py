@@ -0,0 +1,178 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Утверждения токена, по которым проверяются права без чтения пользователя из базы
+USER_CLAIMS = ('role', 'is_staff', 'is_superuser')
+USER_CACHE_KEY = 'auth_user:{}'
+USER_STATE_KEY = 'auth_user:state:{}'
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def user_queryset():
+    # Хэш пароля не кэшируется, при обращении к нему поле дочитывается из базы
+    return get_user_model().objects.defer('password')
+
+
+def get_cached_user(user_id):
+    """Пользователь из кэша с коротким временем жизни, None если пользователя нет"""
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = user_queryset().filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+async def aget_cached_user(user_id):
+    key = USER_CACHE_KEY.format(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await user_queryset().filter(pk=user_id).afirst()
+        if user is not None:
+            await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def get_user_state(user_id):
+    """Признаки (существует, активен) пользователя из кэша с коротким временем жизни"""
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        is_active = get_user_model().objects.filter(pk=user_id).values_list('is_active', flat=True).first()
+        state = (is_active is not None, bool(is_active))
+        cache.set(key, state, settings.AUTH_USER_CACHE_TIMEOUT)
+    return state
+
+
+async def aget_user_state(user_id):
+    key = USER_STATE_KEY.format(user_id)
+    state = await cache.aget(key)
+    if state is None:
+        is_active = await get_user_model().objects.filter(pk=user_id).values_list('is_active', flat=True).afirst()
+        state = (is_active is not None, bool(is_active))
+        await cache.aset(key, state, settings.AUTH_USER_CACHE_TIMEOUT)
+    return state
+
+
+def forget_user(user_id):
+    """Сброс закэшированных сведений о пользователе после его изменения"""
+    cache.delete_many([USER_CACHE_KEY.format(user_id), USER_STATE_KEY.format(user_id)])
+
+
+class ClaimsUser(TokenUser):
+    """
+    Пользователь, восстановленный из утверждений токена.
+
+    id, role, is_staff и is_superuser читаются из токена, остальные поля - из закэшированной
+    записи пользователя, поэтому представления, которым нужна полная запись, продолжают работать.
+    """
+
+    def __str__(self):
+        return str(self.instance)
+
+    @cached_property
+    def id(self):
+        # Идентификатор хранится в токене строкой
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def instance(self):
+        return get_cached_user(self.id)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr == 'token':
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, get_user_model())):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без чтения пользователя из базы на каждый запрос.
+
+    Для токенов с утверждениями USER_CLAIMS пользователь строится из токена, а проверяется
+    только закэшированный признак активности: деактивация вступает в силу сразу после
+    сохранения пользователя (кэш сбрасывается сигналом), а при изменении в обход сигналов -
+    не позже чем через AUTH_USER_CACHE_TIMEOUT секунд. Токены без утверждений и проверка
+    отзыва токена по паролю используют закэшированную запись пользователя.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def is_stateless(validated_token):
+        return not api_settings.CHECK_REVOKE_TOKEN and all(claim in validated_token for claim in USER_CLAIMS)
+
+    @staticmethod
+    def check_state(exists, is_active):
+        if not exists:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    def check_user(self, user, validated_token):
+        self.check_state(user is not None, user is not None and user.is_active)
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if self.is_stateless(validated_token):
+            self.check_state(*get_user_state(user_id))
+            return ClaimsUser(validated_token)
+        return self.check_user(get_cached_user(user_id), validated_token)
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """JWT-аутентификация для асинхронных представлений: сведения о пользователе читаются асинхронно"""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if self.is_stateless(validated_token):
+            self.check_state(*await aget_user_state(user_id))
+            return ClaimsUser(validated_token)
+        return self.check_user(await aget_cached_user(user_id), validated_token)
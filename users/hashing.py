@@ -0,0 +1,14 @@
+import os
+import django
+
+
+def init_worker(settings_module):
+    """Настройка Django в процессе пула, запущенном без fork"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def hash_passwords(passwords):
+    """Хэши паролей для пачки пользователей, пустой пароль дает непригодный для входа хэш"""
+    from django.contrib.auth.hashers import make_password
+    return [make_password(password or None) for password in passwords]
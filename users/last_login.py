@@ -0,0 +1,145 @@
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import connection, close_old_connections
+from django.db.models import Case, When, Value, Q
+from django.utils import timezone
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def write_last_logins(last_logins):
+    """
+    Запись времени входа {id пользователя: время} одним UPDATE.
+
+    Время не уменьшается: если в базе уже записан более поздний вход, он сохраняется.
+    Возвращает число обновленных строк.
+    """
+    if not last_logins:
+        return 0
+    items = sorted(last_logins.items())
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(User._meta.db_table)
+        pk = connection.ops.quote_name(User._meta.pk.column)
+        column = connection.ops.quote_name(User._meta.get_field('last_login').column)
+        values = ', '.join(['(%s, %s::timestamptz)'] * len(items))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} AS u SET {column} = v.last_login '
+                f'FROM (VALUES {values}) AS v(id, last_login) '
+                f'WHERE u.{pk} = v.id AND (u.{column} IS NULL OR u.{column} < v.last_login)',
+                [param for item in items for param in item],
+            )
+            return cursor.rowcount
+
+    condition = Q()
+    for user_id, last_login in items:
+        condition |= Q(pk=user_id) & (Q(last_login__isnull=True) | Q(last_login__lt=last_login))
+    return User.objects.filter(condition).update(
+        last_login=Case(*(When(pk=user_id, then=Value(last_login)) for user_id, last_login in items))
+    )
+
+
+class LastLoginBuffer:
+    """
+    Буфер времени последнего входа пользователей.
+
+    Повторные входы одного пользователя схлопываются в одну запись с последним временем,
+    буфер записывается в базу одним запросом не реже раза в flush_interval секунд
+    (максимальное отставание User.last_login) фоновым потоком, при завершении процесса
+    и синхронно, если в буфере max_pending пользователей. При background=False запись
+    выполняет вызывающий поток по истечении flush_interval.
+    """
+
+    def __init__(self, flush_interval=60.0, max_pending=10000, background=True):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.background = background
+        self._pending = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, user_id, when=None):
+        when = when or timezone.now()
+        now = timezone.now()
+        with self._lock:
+            if user_id not in self._pending or self._pending[user_id] < when:
+                self._pending[user_id] = when
+            if self._oldest is None:
+                self._oldest = now
+            pending = len(self._pending)
+            due = (now - self._oldest).total_seconds() >= self.flush_interval
+
+        if pending >= self.max_pending or (due and not self.background):
+            self.flush()
+        elif self.background:
+            self._ensure_thread()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending, self._oldest = self._pending, {}, None
+            return pending
+
+    def _restore(self, pending):
+        with self._lock:
+            for user_id, when in pending.items():
+                if user_id not in self._pending or self._pending[user_id] < when:
+                    self._pending[user_id] = when
+            self._oldest = self._oldest or timezone.now()
+
+    def flush(self):
+        """Запись накопленного времени входа, возвращает число пользователей в записанной пачке"""
+        with self._flush_lock:
+            pending = self._take()
+            if not pending:
+                return 0
+            try:
+                write_last_logins(pending)
+            except Exception:
+                logger.exception('Не удалось записать время входа %s пользователей', len(pending))
+                self._restore(pending)
+                return 0
+            return len(pending)
+
+    def _ensure_thread(self):
+        # После fork фоновый поток родителя в дочернем процессе не работает
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='last-login-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=settings.LAST_LOGIN_FLUSH_INTERVAL,
+    max_pending=settings.LAST_LOGIN_MAX_PENDING,
+    background=settings.LAST_LOGIN_BACKGROUND_FLUSH,
+)
+
+
+def record_login(user_id):
+    """Постановка времени входа пользователя в очередь на запись"""
+    last_login_buffer.add(user_id)
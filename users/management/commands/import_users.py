@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Q
+from users.hashing import hash_passwords, init_worker
+from users.models import User
+
+FIELDS = ('email', 'user_name', 'first_name', 'last_name', 'phone', 'city', 'role', 'password')
+
+
+def read_records(path, file_format):
+    """Построчное чтение пользователей из CSV (с заголовком) или JSONL: пары (номер строки, запись)"""
+    with open(path, encoding='utf-8', newline='') as file:
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    """
+    Массовый импорт пользователей из CSV или JSONL.
+
+    Пароли хэшируются в пуле процессов на всех ядрах, пока предыдущая пачка записывается
+    в базу через bulk_create. Пользователи с уже занятыми email или user_name пропускаются.
+    Права is_staff и is_superuser выставляются по роли так же, как при регистрации.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .csv или .jsonl')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Формат файла, по умолчанию по расширению')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--default-role', default=User.UsersRolesChoices.STUDENT,
+                            choices=User.UsersRolesChoices.values)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError('Неизвестный формат файла, укажите --format csv или --format jsonl')
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+
+        self.default_role = options['default_role']
+        self.workers = max(1, options['workers'])
+        self.seen_emails, self.seen_user_names = set(), set()
+        self.stats = {'total': 0, 'created': 0, 'skipped': 0, 'errors': 0}
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                 initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),)) as executor:
+            pending = None
+            for chunk in chunked(read_records(path, file_format), options['chunk_size']):
+                users, passwords = self.prepare(chunk)
+                # Хэширование следующей пачки идет параллельно с записью предыдущей
+                futures = [executor.submit(hash_passwords, part)
+                           for part in chunked(passwords, max(1, -(-len(passwords) // self.workers)))]
+                if pending is not None:
+                    self.write(*pending)
+                pending = users, futures
+            if pending is not None:
+                self.write(*pending)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Обработано: {self.stats["total"]}, создано: {self.stats["created"]}, '
+            f'пропущено: {self.stats["skipped"]}, ошибок: {self.stats["errors"]}, '
+            f'время: {elapsed:.1f} с, {self.stats["total"] / elapsed if elapsed else 0:.0f} пользователей/с'
+        )
+
+    def parse(self, raw):
+        record = json.loads(raw) if isinstance(raw, str) else raw
+        if not isinstance(record, dict):
+            raise ValueError('ожидается объект')
+        record = {field: (record.get(field) or '').strip() for field in FIELDS}
+        if not record['email'] or not record['user_name']:
+            raise ValueError('не указаны email или user_name')
+        record['role'] = record['role'] or self.default_role
+        if record['role'] not in User.UsersRolesChoices.values:
+            raise ValueError(f'неизвестная роль {record["role"]}')
+        return record
+
+    def prepare(self, chunk):
+        """Проверка записей пачки и отбор пользователей, которых еще нет в базе и в файле выше"""
+        records = []
+        for line_number, raw in chunk:
+            self.stats['total'] += 1
+            try:
+                records.append(self.parse(raw))
+            except (ValueError, AttributeError) as exc:
+                self.stats['errors'] += 1
+                self.stderr.write(f'Строка {line_number}: {exc}')
+
+        existing = User.objects.filter(
+            Q(email__in=[record['email'] for record in records]) |
+            Q(user_name__in=[record['user_name'] for record in records])
+        ).values_list('email', 'user_name')
+        for email, user_name in existing:
+            self.seen_emails.add(email)
+            self.seen_user_names.add(user_name)
+
+        users, passwords = [], []
+        for record in records:
+            if record['email'] in self.seen_emails or record['user_name'] in self.seen_user_names:
+                self.stats['skipped'] += 1
+                continue
+            self.seen_emails.add(record['email'])
+            self.seen_user_names.add(record['user_name'])
+            passwords.append(record.pop('password'))
+            record['phone'] = record['phone'] or None
+            record['city'] = record['city'] or None
+            user = User(**record, is_active=True)
+            user.apply_role()
+            users.append(user)
+        return users, passwords
+
+    def write(self, users, futures):
+        hashes = [password for future in futures for password in future.result()]
+        for user, password in zip(users, hashes):
+            user.password = password
+        # Конфликты возможны только с пользователями, созданными параллельно с импортом
+        User.objects.bulk_create(users, ignore_conflicts=True)
+        # Соль делает хэши уникальными, поэтому по ним считаются действительно вставленные строки
+        created = User.objects.filter(email__in=[user.email for user in users], password__in=hashes).count() \
+            if users else 0
+        self.stats['created'] += created
+        self.stats['skipped'] += len(users) - created
@@ -0,0 +1,34 @@
+import time
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+from users.outbox import purge_outbox, send_batch
+
+
+class Command(BaseCommand):
+    """
+    Отправка писем из очереди: однократно или в режиме обработчика (--loop).
+
+    Когда очередь пуста, удаляются письма старше OUTBOX_RETENTION (см. purge_outbox).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help='Пауза между опросами пустой очереди (секунды)')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent + failed:
+                continue
+            purge_outbox()
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
+        self.stdout.write(f'Отправлено писем: {total_sent}, ошибок: {total_failed}')
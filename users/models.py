@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 NULLABLE = {"blank": True, "null": True}
@@ -30,6 +31,42 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    def apply_role(self):
+        """Права доступа по роли: администратор - персонал и суперпользователь, преподаватель - персонал"""
+        self.is_staff = self.role in (self.UsersRolesChoices.ADMIN, self.UsersRolesChoices.PROFESSOR)
+        self.is_superuser = self.role == self.UsersRolesChoices.ADMIN
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (transactional outbox)"""
+
+    class StatusChoices(models.TextChoices):
+        PENDING = 'pending', _('Ожидает отправки')
+        SENT = 'sent', _('Отправлено')
+        FAILED = 'failed', _('Не отправлено')
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=255, **NULLABLE, verbose_name='Отправитель')
+    recipients = models.JSONField(default=list, verbose_name='Получатели')
+    status = models.CharField(max_length=10, choices=StatusChoices, default=StatusChoices.PENDING,
+                              verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Число попыток')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Следующая попытка')
+    last_error = models.TextField(**NULLABLE, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата и время создания')
+    sent_at = models.DateTimeField(**NULLABLE, verbose_name='Дата и время отправки')
+
+    def __str__(self):
+        return f'{self.subject} ({", ".join(self.recipients)})'
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
@@ -0,0 +1,99 @@
+import datetime
+import logging
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, recipients, from_email=None):
+    """
+    Постановка письма в очередь на отправку.
+
+    Письмо записывается в той же транзакции, что и изменения запроса, и отправляется
+    командой send_outbox, поэтому запрос не ждет SMTP-сервер.
+    """
+    return OutgoingEmail.objects.create(subject=subject, body=body, recipients=list(recipients),
+                                        from_email=from_email or settings.DEFAULT_FROM_EMAIL)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной отправкой"""
+    return datetime.timedelta(seconds=min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), settings.OUTBOX_MAX_DELAY))
+
+
+def claim_batch(batch_size):
+    """
+    Захват пачки писем, которые пора отправлять.
+
+    Захваченным письмам переносится время следующей попытки на OUTBOX_LEASE секунд вперед,
+    поэтому параллельные обработчики их не берут, а письма обработчика, упавшего во время
+    отправки, вернутся в очередь после истечения аренды.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutgoingEmail.StatusChoices.PENDING, next_attempt_at__lte=now,
+            ).order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=now + datetime.timedelta(seconds=settings.OUTBOX_LEASE),
+        )
+    return emails
+
+
+def send_batch(batch_size=None):
+    """Отправка пачки писем через одно SMTP-соединение, возвращает (отправлено, ошибок)"""
+    emails = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.recipients,
+                                   connection=connection)
+            try:
+                message.send()
+            except Exception as exc:
+                failed.append((email, exc))
+            else:
+                sent.append(email)
+    except Exception as exc:
+        # Не удалось подключиться: все неотправленные письма пачки откладываются
+        done = {email.pk for email in sent} | {email.pk for email, _ in failed}
+        failed += [(email, exc) for email in emails if email.pk not in done]
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    if sent:
+        # Текст отправленного письма больше не нужен, а в нем могут быть ссылки сброса пароля
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in sent]).update(
+            status=OutgoingEmail.StatusChoices.SENT, sent_at=now, last_error=None, body='',
+        )
+    for email, exc in failed:
+        email.attempts += 1
+        email.last_error = repr(exc)
+        if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            email.status = OutgoingEmail.StatusChoices.FAILED
+            logger.error('Письмо %s не отправлено после %s попыток: %r', email.pk, email.attempts, exc)
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+    return len(sent), len(failed)
+
+
+def purge_outbox():
+    """Удаление отправленных и не отправленных писем старше OUTBOX_RETENTION секунд, возвращает число удаленных"""
+    deadline = timezone.now() - datetime.timedelta(seconds=settings.OUTBOX_RETENTION)
+    deleted, _ = OutgoingEmail.objects.filter(
+        status__in=[OutgoingEmail.StatusChoices.SENT, OutgoingEmail.StatusChoices.FAILED], created_at__lt=deadline,
+    ).delete()
+    return deleted
@@ -1,10 +1,14 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from config import settings
+from users.authentication import get_cached_user, set_user_claims
+from users.last_login import record_login
 from users.models import User
+from users.outbox import queue_email
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -33,11 +37,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         )
 
         user.is_active = True
-        if user.role == User.UsersRolesChoices.ADMIN:
-            user.is_staff = True
-            user.is_superuser = True
-        elif user.role == User.UsersRolesChoices.PROFESSOR:
-            user.is_staff = True
+        user.apply_role()
         user.set_password(password)
         user.save()
         return user
@@ -67,11 +67,11 @@ class UserPasswordResetSerializer(serializers.Serializer):
         token = default_token_generator.make_token(user)
 
         reset_link = settings.PASSWORD_RESET_CONFIRM_URL.format(uid=uid, token=token)
-        send_mail(
+        queue_email(
             'Сброс пароля',
             f'Перейдите по следующей ссылке, чтобы сбросить пароль: {reset_link}',
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
+            settings.DEFAULT_FROM_EMAIL,
         )
 
 
@@ -103,3 +103,32 @@ class UserPasswordResetConfirmSerializer(serializers.Serializer):
         user = User.objects.get(pk=user_id)
         user.set_password(new_password)
         user.save()
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Класс сериализатор входа: роль и права пользователя добавляются в токены.
+
+    Время входа записывается в базу пачками через буфер last_login_buffer.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return set_user_claims(super().get_token(user), user)
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_login(self.user.pk)
+        return data
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Класс сериализатор обновления токена: роль и права в новом токене доступа берутся из текущей записи"""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(attrs['refresh'])
+        user = get_cached_user(refresh.payload.get(api_settings.USER_ID_CLAIM))
+        if user is not None:
+            data['access'] = str(set_user_claims(refresh.access_token, user))
+        return data
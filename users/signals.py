@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from users.authentication import forget_user
+from users.models import User
+
+
+def user_changed(sender, instance, **kwargs):
+    """Сброс закэшированных сведений о пользователе, чтобы деактивация и смена роли действовали сразу"""
+    forget_user(instance.pk)
+
+
+post_save.connect(user_changed, sender=User)
+post_delete.connect(user_changed, sender=User)
@@ -1,8 +1,8 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from users.apps import UsersConfig
-from users.views import UserListAPIView, UserRegistrationAPIView, UserRetrieveAPIView, UserUpdateAPIView, \
-    UserDestroyAPIView, UserPasswordResetAPIView, UserPasswordResetConfirmAPIView
+from users.views import UserListAPIView, UserExportAPIView, UserRegistrationAPIView, UserRetrieveAPIView, \
+    UserUpdateAPIView, UserDestroyAPIView, UserPasswordResetAPIView, UserPasswordResetConfirmAPIView
 
 app_name = UsersConfig.name
 
@@ -10,6 +10,7 @@ urlpatterns = [
     path('login/', TokenObtainPairView.as_view(), name='login'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('', UserListAPIView.as_view(), name='user_list'),
+    path('export/', UserExportAPIView.as_view(), name='user_export'),
     path('register/', UserRegistrationAPIView.as_view(), name='user_register'),
     path('detail/<int:pk>/', UserRetrieveAPIView.as_view(), name='user_detail'),
     path('update/<int:pk>/', UserUpdateAPIView.as_view(), name='user_update'),
@@ -1,6 +1,8 @@
 from rest_framework import generics, response, status
 from rest_framework.permissions import AllowAny, IsAdminUser
-from courses.paginations import CustomPagination
+from rest_framework.views import APIView
+from courses.export import export_response, get_export_format
+from courses.paginations import SelectablePagination
 from users.models import User
 from users.permissions import IsOwnerOrAdmin
 from users.serializers import UserRegistrationSerializer, UserSerializer, UserPasswordResetSerializer, \
@@ -12,7 +14,15 @@ class UserListAPIView(generics.ListAPIView):
     serializer_class = UserSerializer
     queryset = User.objects.order_by('id')
     permission_classes = [IsAdminUser]
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
+
+
+class UserExportAPIView(APIView):
+    """Потоковая выгрузка всех пользователей в NDJSON или CSV без хэшей паролей"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return export_response([User.objects.all()], get_export_format(request), 'users')
 
 
 class UserRegistrationAPIView(generics.CreateAPIView):